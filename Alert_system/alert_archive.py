@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Alert Archive - Every Fired Alert as a Structured, Indexed SQLite Record
+========================================================================
+
+The .log files are written for people: box-drawn blocks, one per alert.
+Questions like "did match X alert yesterday" or "how many alerts did
+competition Y get this week" need the alerts as records. Next to the text
+block, every fired alert is also written to one SQLite archive shared by
+all alerts (Alert_system/alert_archive.db):
+
+    alerts(id, alert, alert_number, found_at, ts, found_date, match_id,
+           competition_id, competition, country, home_team, away_team,
+           score, status_id, lines, match, source)
+
+    alert           alert name ("ou_3", "ou_3_no_score")
+    alert_number    the daily running number shown in the log ("ALERT #12")
+    found_at        the "Found:" time exactly as logged; ts is the same
+                    instant in epoch seconds, found_date its local day
+    lines           qualifying O/U lines ("3.0|3.5"), like the dedup key
+    match           the full match dict as JSON (NULL for imported logs)
+    source          "alert" for live alerts, the log path for imports
+
+INDEXES:
+match_id, competition_id and alert (each with ts), ts alone, and an FTS5
+index over home_team / away_team. (alert, match_id, found_at) is unique, so
+re-importing a log or re-running a cycle never duplicates an alert.
+
+WRITING:
+Alerts hand every cycle's alerts over in one transaction right after the
+text block (archive_alerts()), only when they persist state (not in
+replays) and "archive": {"enabled": true} in their config. The connection
+is kept per archive path for the life of the process.
+
+IMPORTING:
+The existing text logs - in every block format the alerts have written -
+are parsed into the same records:
+
+    python3 alert_archive.py import ou_3/ou_3.log ou_3_no_score/ou_3_no_score.log
+
+QUERYING:
+    python3 alert_archive.py query --match y39mp1hzgn5xmoj --since 2025-05-27
+    python3 alert_archive.py query --team "portland" --alert ou_3
+    python3 alert_archive.py count --competition kn54qllhg2qvy9d --since 2025-05-26 --by day
+
+--since / --until take "YYYY-MM-DD" or "YYYY-MM-DD HH:MM" in the alerts'
+time zone (America/New_York); --team is a full-text match on team names
+(prefixes work: "portl").
+"""
+
+import argparse
+import atexit
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from match_view import as_view, coerce_status
+from metrics import fetch_timestamp
+
+ARCHIVE_FILE = Path(__file__).parent / "alert_archive.db"
+TZ = ZoneInfo("America/New_York")
+
+COLUMNS = ("alert", "alert_number", "found_at", "ts", "found_date", "match_id", "competition_id",
+           "competition", "country", "home_team", "away_team", "score", "status_id", "lines",
+           "match", "source")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY,
+    alert TEXT NOT NULL,
+    alert_number INTEGER,
+    found_at TEXT NOT NULL,
+    ts REAL,
+    found_date TEXT,
+    match_id TEXT,
+    competition_id TEXT,
+    competition TEXT,
+    country TEXT,
+    home_team TEXT,
+    away_team TEXT,
+    score TEXT,
+    status_id INTEGER,
+    lines TEXT,
+    match TEXT,
+    source TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS alerts_unique ON alerts(alert, match_id, found_at);
+CREATE INDEX IF NOT EXISTS alerts_match ON alerts(match_id, ts);
+CREATE INDEX IF NOT EXISTS alerts_competition ON alerts(competition_id, ts);
+CREATE INDEX IF NOT EXISTS alerts_alert ON alerts(alert, ts);
+CREATE INDEX IF NOT EXISTS alerts_ts ON alerts(ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS alerts_fts USING fts5(
+    home_team, away_team, content='alerts', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS alerts_fts_insert AFTER INSERT ON alerts BEGIN
+    INSERT INTO alerts_fts(rowid, home_team, away_team) VALUES (new.id, new.home_team, new.away_team);
+END;
+CREATE TRIGGER IF NOT EXISTS alerts_fts_delete AFTER DELETE ON alerts BEGIN
+    INSERT INTO alerts_fts(alerts_fts, rowid, home_team, away_team)
+    VALUES ('delete', old.id, old.home_team, old.away_team);
+END;
+"""
+
+# Values the log prints for missing fields
+MISSING_TEXT = {"", "N/A", "None"}
+
+# Groupings for count --by
+COUNT_GROUPS = {"alert": "alert", "competition": "competition_id", "match": "match_id", "day": "found_date"}
+
+def _text(value):
+    """Column text for a match field (None for missing)"""
+    if value is None:
+        return None
+    value = str(value)
+    return None if value in MISSING_TEXT else value
+
+def _integer(value):
+    """Column int for an alert number (None when not a number)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _match_dict(match):
+    """Plain match dict of a dict, MatchView or CompactMatch"""
+    if hasattr(match, "to_dict"):
+        return match.to_dict()
+    return as_view(match).match
+
+def alert_record(alert, alert_number, match, found_at, lines=None, tz=TZ, source="alert", store_match=True):
+    """One archive row (COLUMNS order) for a fired alert (match: dict, MatchView or CompactMatch)"""
+    ts = fetch_timestamp(found_at, tz)
+    found_date = datetime.fromtimestamp(ts, tz).strftime("%Y-%m-%d") if ts is not None else None
+    match_json = json.dumps(_match_dict(match), ensure_ascii=False, default=str) if store_match else None
+    return (
+        alert, _integer(alert_number), found_at, ts, found_date, _text(match.get("match_id")),
+        _text(match.get("competition_id")), _text(match.get("competition")), _text(match.get("country")),
+        _text(match.get("home_team")), _text(match.get("away_team")), _text(match.get("score")),
+        coerce_status(match.get("status_id")), lines, match_json, source,
+    )
+
+def parse_since(value, tz=TZ):
+    """Epoch seconds of "YYYY-MM-DD" / "YYYY-MM-DD HH:MM" in the alerts' time zone"""
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=tz).timestamp()
+        except ValueError:
+            continue
+    raise ValueError(f"expected YYYY-MM-DD or YYYY-MM-DD HH:MM, got {value!r}")
+
+def fts_query(text):
+    """FTS5 query matching every word of text as a prefix"""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+class AlertArchive:
+    """One SQLite archive file (safe to share between alert threads)"""
+
+    def __init__(self, path=ARCHIVE_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+
+    def add(self, records):
+        """Insert alert rows in one transaction; returns how many were new"""
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._lock, self.conn:
+            cursor = self.conn.executemany(
+                f"INSERT OR IGNORE INTO alerts ({', '.join(COLUMNS)}) VALUES ({placeholders})", records)
+            return cursor.rowcount
+
+    def _where(self, match_id=None, competition_id=None, alert=None, team=None, since=None, until=None):
+        """(WHERE clause, parameters) for the query filters"""
+        clauses, params = [], []
+        for column, value in (("match_id", match_id), ("competition_id", competition_id), ("alert", alert)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if team:
+            clauses.append("id IN (SELECT rowid FROM alerts_fts WHERE alerts_fts MATCH ?)")
+            params.append(fts_query(team))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit=None, **filters):
+        """Matching alerts oldest first, as dicts (without the match JSON)"""
+        where, params = self._where(**filters)
+        columns = ", ".join(column for column in COLUMNS if column != "match")
+        sql = f"SELECT {columns} FROM alerts{where} ORDER BY ts, id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def count(self, by=None, **filters):
+        """Number of matching alerts, or [(group, count), ...] when grouped by alert / competition / match / day"""
+        where, params = self._where(**filters)
+        with self._lock:
+            if by is None:
+                return self.conn.execute(f"SELECT COUNT(*) FROM alerts{where}", params).fetchone()[0]
+            column = COUNT_GROUPS[by]
+            rows = self.conn.execute(
+                f"SELECT {column}, COUNT(*) FROM alerts{where} GROUP BY {column} ORDER BY COUNT(*) DESC, {column}",
+                params)
+            return [tuple(row) for row in rows]
+
+    def match_json(self, alert, match_id, found_at):
+        """The archived match dict of one alert, None if it was imported from a log"""
+        with self._lock:
+            row = self.conn.execute("SELECT match FROM alerts WHERE alert = ? AND match_id = ? AND found_at = ?",
+                                    (alert, match_id, found_at)).fetchone()
+        return json.loads(row[0]) if row is not None and row[0] is not None else None
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+_open_archives = {}
+_open_lock = threading.Lock()
+
+def open_archive(path=ARCHIVE_FILE):
+    """Shared AlertArchive for a path (one connection per process)"""
+    key = str(Path(path).resolve())
+    with _open_lock:
+        archive = _open_archives.get(key)
+        if archive is None:
+            archive = _open_archives[key] = AlertArchive(path)
+        return archive
+
+def archive_alerts(records, path=ARCHIVE_FILE):
+    """Write one cycle's alert rows (see alert_record) to the archive; returns how many were new"""
+    if not records:
+        return 0
+    return open_archive(path).add(records)
+
+def close_archives():
+    """Close every shared connection"""
+    with _open_lock:
+        for archive in _open_archives.values():
+            archive.close()
+        _open_archives.clear()
+
+atexit.register(close_archives)
+
+# "OU 3.0+ ALERT #12", "OU 3.0+ SCORELESS HALF TIME ALERT #3", "OU 3.0+ MATCH 2 of 6"
+_NUMBER_PATTERN = re.compile(r"#(\d+)|MATCH (\d+) of \d+")
+_LINE_PATTERN = re.compile(r"Line: (-?\d+(?:\.\d+)?)")
+_STATUS_PATTERN = re.compile(r"\(ID: (-?\d+)\)\s*$")
+
+def parse_alert_log(text):
+    """
+    Alerts in a text alert log as dicts (found_at, alert_number, match_id,
+    competition_id, competition, country, home_team, away_team, score,
+    status_id, lines). Every block starts with a title line followed by
+    "Found: <time>"; cycle headers are skipped.
+    """
+    alerts = []
+    current = None
+    previous = ""
+    in_ou_section = False
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if line.startswith("Found: "):
+            number = _NUMBER_PATTERN.search(previous)
+            current = {"found_at": line[len("Found: "):], "starred": [], "listed": [],
+                       "alert_number": (number.group(1) or number.group(2)) if number else None}
+            alerts.append(current)
+            in_ou_section = False
+        elif current is not None:
+            for label, key in (("Match ID: ", "match_id"), ("Competition ID: ", "competition_id"),
+                               ("Score: ", "score")):
+                if line.startswith(label):
+                    current[key] = line[len(label):]
+            if line.startswith("Competition: "):
+                name, _, country = line[len("Competition: "):].rpartition(" (")
+                current["competition"], current["country"] = (name, country.rstrip(")")) if name else (country, None)
+            elif line.startswith("Match: "):
+                home, _, away = line[len("Match: "):].partition(" vs ")
+                current["home_team"], current["away_team"] = home, away
+            elif line.startswith("Status: "):
+                status = _STATUS_PATTERN.search(line)
+                current["status_id"] = status.group(1) if status else None
+            elif line.startswith("---"):
+                in_ou_section = "OVER/UNDER" in line
+            elif line.startswith("│"):
+                line_value = _LINE_PATTERN.search(line)
+                if line_value:
+                    if line.endswith("★"):
+                        current["starred"].append(str(float(line_value.group(1))))
+                    elif in_ou_section:
+                        current["listed"].append(str(float(line_value.group(1))))
+        if line:
+            previous = line
+
+    for alert in alerts:
+        # Newer blocks star the qualifying lines, older ones only listed them
+        starred, listed = alert.pop("starred"), alert.pop("listed")
+        alert["lines"] = "|".join(sorted(starred or listed)) or None
+    return alerts
+
+def import_log(archive, log_path, alert=None, tz=TZ):
+    """Archive every alert of a text log (alert name defaults to the file stem); returns (added, found)"""
+    log_path = Path(log_path)
+    alert = alert or log_path.stem
+    # Imported rows leave the match JSON empty - the log only held part of the match
+    records = [
+        alert_record(alert, fields["alert_number"], fields, fields["found_at"], fields["lines"], tz,
+                     source=str(log_path), store_match=False)
+        for fields in parse_alert_log(log_path.read_text(encoding="utf-8", errors="replace"))
+    ]
+    return archive.add(records), len(records)
+
+def add_filter_arguments(parser):
+    """--match / --competition / --alert / --team / --since / --until"""
+    parser.add_argument("--match", dest="match_id", help="match_id")
+    parser.add_argument("--competition", dest="competition_id", help="competition_id")
+    parser.add_argument("--alert", help="alert name (ou_3, ou_3_no_score)")
+    parser.add_argument("--team", help="words of a home / away team name (full-text, prefixes match)")
+    parser.add_argument("--since", help="from this local time (YYYY-MM-DD [HH:MM])")
+    parser.add_argument("--until", help="before this local time (YYYY-MM-DD [HH:MM])")
+
+def filters_from_args(args):
+    """AlertArchive.query() / count() keyword arguments from parsed arguments"""
+    return {
+        "match_id": args.match_id, "competition_id": args.competition_id, "alert": args.alert, "team": args.team,
+        "since": parse_since(args.since) if args.since else None,
+        "until": parse_since(args.until) if args.until else None,
+    }
+
+def format_alert(row):
+    """One line per archived alert for the query command"""
+    return (f"{row['found_at']:<27} {row['alert']:<15} #{row['alert_number'] or '-':<5} {row['match_id'] or 'N/A':<16} "
+            f"{row['home_team']} vs {row['away_team']} | {row['competition']} | {row['score']} | "
+            f"lines {row['lines']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the SQLite alert archive")
+    parser.add_argument("--archive", type=Path, default=ARCHIVE_FILE, help="archive file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="archive the alerts of existing text logs (safe to repeat)")
+    importer.add_argument("logs", type=Path, nargs="+")
+    importer.add_argument("--alert", help="alert name (default: each log's file name)")
+    query = commands.add_parser("query", help="list matching alerts, oldest first")
+    add_filter_arguments(query)
+    query.add_argument("--limit", type=int)
+    count = commands.add_parser("count", help="count matching alerts")
+    add_filter_arguments(count)
+    count.add_argument("--by", choices=sorted(COUNT_GROUPS), help="count per group")
+    args = parser.parse_args(argv)
+
+    archive = AlertArchive(args.archive)
+    try:
+        if args.command == "import":
+            for log_path in args.logs:
+                added, found = import_log(archive, log_path, args.alert)
+                print(f"Alert Archive: Imported {added} of {found} alerts from {log_path} "
+                      f"({found - added} already archived)")
+        elif args.command == "query":
+            rows = archive.query(limit=args.limit, **filters_from_args(args))
+            for row in rows:
+                print(format_alert(row))
+            print(f"Alert Archive: {len(rows)} alerts")
+        else:
+            counted = archive.count(by=args.by, **filters_from_args(args))
+            if args.by is None:
+                print(f"Alert Archive: {counted} alerts")
+            else:
+                for group, number in counted:
+                    print(f"{str(group):<30} {number:>8}")
+    finally:
+        archive.close()
+
+if __name__ == "__main__":
+    main()
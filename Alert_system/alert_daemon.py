@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Alert Daemon - Resident, Event-Driven Alert Runner
+==================================================
+
+Long-running replacement for launching every alert as a fresh Python process.
+
+The daemon imports every alert once (via the Alert Manager), switches them
+into resident mode so their logger, config, daily count and dedup state stay
+in memory, then watches the step5 directory:
+
+1. inotify (Linux): wakes on IN_CLOSE_WRITE / IN_MOVED_TO for step5.json,
+   i.e. an in-place write finishing or an atomic rename landing
+2. Stat polling fallback: compares [inode, size, mtime_ns] every
+   --poll-interval seconds where inotify is unavailable
+
+Each wake-up runs one Alert Manager cycle and prints the latency from the
+file event to the cycle's alert blocks being on disk (the daemon waits for
+the log listeners to flush before taking the timestamp). Fired alerts are handed to
+the async dispatcher (dispatcher.py, when enabled in dispatch.json), which
+delivers them from its own thread so HTTP never delays the next cycle.
+With --profile one in every
+--profile-every cycles runs under cProfile + tracemalloc (profiling.py).
+
+Usage:
+    python3 alert_daemon.py
+    python3 alert_daemon.py --watcher poll --poll-interval 0.25
+    python3 alert_daemon.py --profile --profile-every 50
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+import struct
+import time
+from pathlib import Path
+
+from alert_log import flush_alert_listeners
+from alert_manager import STEP5_JSON, discover_alerts, load_alert_module, run_cycle
+from dispatcher import DispatcherThread, create_dispatcher, load_dispatch_config
+from profiling import CycleProfiler, add_profile_arguments, profiler_from_args
+from step5_reader import stat_fingerprint, watch_target
+
+# inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+# struct inotify_event header: wd, mask, cookie, len
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+# After the first event, wait this long for the writer's follow-up events
+EVENT_SETTLE_SECONDS = 0.005
+
+class InotifyWatcher:
+    """Wait for step5.json to be written or renamed into place using inotify"""
+
+    def __init__(self, target_path):
+        self.target_path = Path(target_path)
+        self.target_name = os.fsencode(self.target_path.name)
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = libc.inotify_init1(IN_CLOEXEC | IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watch = libc.inotify_add_watch(
+            self.fd, os.fsencode(self.target_path.parent), IN_CLOSE_WRITE | IN_MOVED_TO
+        )
+        if watch < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {self.target_path.parent}")
+
+    def _drain(self):
+        """Read all pending events, True if any concerned step5.json"""
+        hit = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return hit
+            offset = 0
+            while offset < len(data):
+                _, mask, _, name_len = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+                offset += INOTIFY_EVENT_HEADER.size
+                name = data[offset:offset + name_len].rstrip(b"\0")
+                offset += name_len
+                if name == self.target_name and mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    hit = True
+
+    def wait(self, timeout=None):
+        """Block until step5.json changes; returns the event time or None on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return None
+            event_time = time.perf_counter()
+            if self._drain():
+                # Writers often close and rename back to back - absorb the burst
+                time.sleep(EVENT_SETTLE_SECONDS)
+                self._drain()
+                return event_time
+
+    def close(self):
+        """Release the inotify descriptor"""
+        os.close(self.fd)
+
+class StatPoller:
+    """Fallback watcher: poll the step5.json stat fingerprint"""
+
+    def __init__(self, target_path, interval=0.5):
+        self.target_path = Path(target_path)
+        self.interval = interval
+        self.last_stat = self._fingerprint()
+
+    def _fingerprint(self):
+        """Current fingerprint, or None while the file is missing"""
+        try:
+            return stat_fingerprint(self.target_path)
+        except FileNotFoundError:
+            return None
+
+    def wait(self, timeout=None):
+        """Block until the fingerprint changes; returns the detection time or None on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            current = self._fingerprint()
+            if current is not None and current != self.last_stat:
+                self.last_stat = current
+                return time.perf_counter()
+            time.sleep(self.interval)
+        return None
+
+    def close(self):
+        """Nothing to release"""
+
+def create_watcher(target_path, kind="auto", poll_interval=0.5):
+    """Build an inotify watcher, falling back to stat polling"""
+    if kind in ("auto", "inotify"):
+        try:
+            return InotifyWatcher(target_path)
+        except (OSError, AttributeError) as e:
+            if kind == "inotify":
+                raise
+            print(f"Alert Daemon: inotify unavailable ({e}) - falling back to stat polling")
+    return StatPoller(target_path, poll_interval)
+
+def load_resident_alerts(console_echo=False):
+    """Discover alerts and switch each one into resident mode"""
+    alerts = discover_alerts()
+    for name, module_path in alerts.items():
+        module = load_alert_module(module_path)
+        if hasattr(module, "enable_resident_mode"):
+            module.enable_resident_mode(console_echo=console_echo)
+        else:
+            print(f"Alert Daemon: {name} has no resident mode - state reloads every cycle")
+    return alerts
+
+def run_daemon(step5_path=STEP5_JSON, watcher_kind="auto", poll_interval=0.5, executor=None, max_workers=None,
+               console_echo=False, profiler=None):
+    """Run alert cycles whenever step5.json changes until SIGINT/SIGTERM"""
+    profiler = profiler or CycleProfiler(None, "alert_daemon")
+    alerts = load_resident_alerts(console_echo)
+    print(f"Alert Daemon: Loaded {len(alerts)} resident alerts: {', '.join(alerts) or 'none'}")
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+
+    # Delivery runs on its own loop thread; alerts left in the outbox by a
+    # crash go out with the first drain
+    dispatcher = create_dispatcher(load_dispatch_config())
+    dispatch_thread = DispatcherThread(dispatcher).start() if dispatcher is not None else None
+    if dispatch_thread is not None:
+        print(f"Alert Daemon: Dispatching to {', '.join(dispatcher.endpoints)} "
+              f"({len(dispatcher.outbox)} alerts pending in outbox)")
+
+    # A snapshot store signals new fetches through its index file
+    watcher = create_watcher(watch_target(step5_path), watcher_kind, poll_interval)
+    print(f"Alert Daemon: Watching {step5_path} with {type(watcher).__name__}")
+
+    # Catch up on whatever landed while the daemon was down
+    if Path(step5_path).exists():
+        results = run_cycle(alerts, step5_path, executor, max_workers)
+        if dispatch_thread is not None:
+            dispatch_thread.submit(results)
+
+    try:
+        while not stopping:
+            event_time = watcher.wait(timeout=1.0)
+            if event_time is None:
+                continue
+            results = profiler.run(run_cycle, alerts, step5_path, executor, max_workers)
+            if dispatch_thread is not None:
+                dispatch_thread.submit(results)
+            # run_cycle returns once the blocks are queued; time the disk write
+            latency_ms = (flush_alert_listeners() - event_time) * 1000
+            fired = sum(len(result["matches"]) for name, result in results.items() if not name.startswith("_"))
+            print(f"Alert Daemon: alerts written {latency_ms:.1f} ms after step5.json write ({fired} alerts fired)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        if dispatch_thread is not None:
+            dispatch_thread.stop()
+        print("Alert Daemon: stopped")
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Resident, event-driven alert runner")
+    parser.add_argument("--step5", type=Path, default=STEP5_JSON, help="path to step5.json or a snapshot store directory")
+    parser.add_argument("--watcher", choices=["auto", "inotify", "poll"], default="auto")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="seconds between stat polls")
+    # Process pools are rebuilt per cycle and would lose resident state
+    parser.add_argument("--executor", choices=["thread"], default=None,
+                        help="run alerts in a thread pool instead of serially")
+    parser.add_argument("--workers", type=int, default=None, help="pool size")
+    parser.add_argument("--echo", action="store_true", help="also print alert blocks to stdout")
+    add_profile_arguments(parser, sampling=True)
+    args = parser.parse_args(argv)
+    run_daemon(args.step5, args.watcher, args.poll_interval, args.executor, args.workers, args.echo,
+               profiler_from_args(args, "alert_daemon"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Alert Log Writer - Batched, Off-Thread Alert Output
+===================================================
+
+The alert cycle used to call logger.info() + print() once per line - 25-35
+tiny synchronous writes per match. Alerts now build every line of a cycle
+in memory and hand the whole block over in one call:
+
+1. File logging goes through a QueueHandler; a QueueListener thread owns the
+   FileHandler, so the alert loop never blocks on disk
+2. The block is one log record, i.e. one write to the .log file with exactly
+   the same bytes as the old line-by-line output
+3. Console echo is optional (on for one-shot runs, off in daemon use)
+
+flush_alert_listeners() waits for everything queued so far to reach the file
+(the daemon times its cycles against that). Listeners are stopped (and their
+queues drained to disk) at interpreter exit, or explicitly with
+stop_alert_listeners().
+"""
+
+import atexit
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+
+# One listener thread per log file: log path -> (listener, queue)
+_listeners = {}
+
+class _FlushMarker(logging.Handler):
+    """Answers flush records once every record queued before them is written"""
+
+    def emit(self, record):
+        marker = getattr(record, "flush_marker", None)
+        if marker is not None:
+            written_at, done = marker
+            written_at.append(time.perf_counter())
+            done.set()
+
+def _not_a_marker(record):
+    """File handler filter: flush records are never written"""
+    return not hasattr(record, "flush_marker")
+
+def _listener_queue(log_file):
+    """Return the queue feeding log_file's listener, starting it if needed"""
+    log_file = Path(log_file).resolve()
+    if log_file not in _listeners:
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setLevel(logging.INFO)
+        # Simple format (no timestamp prefix since alerts add their own)
+        file_handler.setFormatter(logging.Formatter('%(message)s'))
+        file_handler.addFilter(_not_a_marker)
+
+        log_queue = queue.SimpleQueue()
+        # The listener hands each record to the handlers in order, so the
+        # marker only sees a flush record after the file handler wrote it
+        listener = QueueListener(log_queue, file_handler, _FlushMarker())
+        listener.start()
+        _listeners[log_file] = (listener, log_queue)
+    return _listeners[log_file][1]
+
+def setup_queued_logger(name, log_file):
+    """Logger whose records are written to log_file by a background listener"""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+
+    # Clear any existing handlers
+    logger.handlers.clear()
+    logger.addHandler(QueueHandler(_listener_queue(log_file)))
+    return logger
+
+def setup_null_logger(name):
+    """Logger that discards every record (replays and other dry runs)"""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.handlers.clear()
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    return logger
+
+def emit_alert_block(logger, lines, console_echo=True):
+    """Emit a whole alert block - lines or one rendered text - as one log record (and one console write)"""
+    if not lines:
+        return
+    block = lines if isinstance(lines, str) else "\n".join(lines)
+    logger.info(block)
+    if console_echo:
+        sys.stdout.write(block + "\n")
+
+def flush_alert_listeners(timeout=5.0):
+    """Wait until every record queued so far is written; returns the perf_counter() of the last write"""
+    pending = []
+    for _, log_queue in list(_listeners.values()):
+        written_at, done = [], threading.Event()
+        record = logging.makeLogRecord({"msg": "", "flush_marker": (written_at, done)})
+        log_queue.put_nowait(record)
+        pending.append((written_at, done))
+    deadline = time.perf_counter() + timeout
+    for written_at, done in pending:
+        done.wait(max(0.0, deadline - time.perf_counter()))
+    # A listener that missed the deadline counts as writing now
+    now = time.perf_counter()
+    return max((written_at[0] if written_at else now for written_at, _ in pending), default=now)
+
+def stop_alert_listeners():
+    """Drain every queue to disk and stop the listener threads"""
+    for listener, _ in _listeners.values():
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    _listeners.clear()
+
+atexit.register(stop_alert_listeners)
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Alert Manager - Run Every Alert Off One Parsed Snapshot
+=======================================================
+
+Discovers the alerts under Alert_system/ and runs them all against a
+single parsed step5 snapshot.
+
+DISCOVERY:
+Every directory `Alert_system/<name>/` containing a `<name>.json` with a
+"criteria" block is an alert, run by alert_runner.AlertRunner. An alert
+that needs its own code ships `<name>.py` with a
+`check_<name>_alert(snapshot=None)` function and no criteria config. A
+`<name>.py` next to a criteria config is only its entry script (ou_3.py
+wraps the same runner) and is not imported. Nothing has to be registered -
+dropping a new alert directory in place is enough.
+
+PER CYCLE:
+1. step5.json is stat'ed and parsed ONCE (latest fetch only), and one
+   normalized MatchView per match is built (match_view.py)
+2. Every match is hashed once and compared with the previous cycle (see
+   delta_engine.py); only new and changed matches go through the rules
+3. The same snapshot is handed to every alert (serially, or through a
+   thread / process pool)
+4. Wall time per alert is reported
+5. Fired alerts are pushed to the endpoints in dispatch.json, if enabled
+   (see dispatcher.py)
+
+With 20+ alerts a cycle costs one parse plus the alerts' own filters,
+instead of one parse per alert.
+
+COLUMNAR MODE (--columnar, needs NumPy):
+The snapshot is converted to NumPy arrays once and every rule runs as
+vectorized masks (see columnar.py). Worth it for feeds with thousands of
+matches; without NumPy the dict loop is used.
+
+Usage:
+    python3 alert_manager.py                      # serial
+    python3 alert_manager.py --executor thread    # thread pool
+    python3 alert_manager.py --executor process --workers 4
+    python3 alert_manager.py --columnar           # vectorized rule filter
+    python3 alert_manager.py --json-backend json  # force the stdlib decoder
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from alert_runner import AlertRunner, get_runner, is_alert_config, read_alert_config
+from columnar import HAVE_NUMPY, evaluate_rules_columnar
+from delta_engine import compute_delta, delta_views, format_delta
+from dispatcher import dispatch_results
+from json_backend import available_backends, set_backend
+from match_view import build_match_views
+from odds_tracker import create_tracker, load_tracker_config
+from profiling import add_profile_arguments, profiler_from_args
+from rule_engine import evaluate_rules
+from step5_reader import load_snapshot
+
+# Path constants
+BASE_DIR = Path(__file__).parent
+
+# Step5 data location
+STEP5_JSON = Path("/root/CascadeProjects/Football_bot/step5/step5.json")
+
+# Alert modules imported / AlertRunners built in this process (by file path)
+_loaded_modules = {}
+
+# Match hashes of the previous cycle in this process (empty = evaluate all)
+_previous_hashes = {}
+
+# Per-match odds history of this process (odds_tracker.json), created on first use
+_odds_tracker = None
+_odds_tracker_loaded = False
+
+# Feed key -> match_id of the matches fed to the odds tracker, which tracks
+# by match_id while the delta reports removed matches by feed key
+_tracked_match_ids = {}
+
+def load_alert_module(module_path):
+    """Import an alert module, or build the AlertRunner of a <name>.json alert, from its file path (cached per process)"""
+    module_path = Path(module_path)
+    module = _loaded_modules.get(module_path)
+    if module is None and module_path.suffix == ".json":
+        module = _loaded_modules[module_path] = get_runner(module_path)
+    elif module is None:
+        spec = importlib.util.spec_from_file_location(module_path.stem, module_path)
+        module = importlib.util.module_from_spec(spec)
+        # Alerts import their siblings and shared helpers by plain name
+        sys.path.append(str(module_path.parent))
+        spec.loader.exec_module(module)
+        _loaded_modules[module_path] = module
+    return module
+
+def check_function(name, module):
+    """The cycle function of an alert: AlertRunner.check_alert or the module's check_<name>_alert"""
+    if isinstance(module, AlertRunner):
+        return module.check_alert
+    return getattr(module, f"check_{name}_alert", None)
+
+def discover_alerts(alert_dir=BASE_DIR):
+    """Find every <name>/<name>.json alert config or <name>/<name>.py exposing check_<name>_alert, keyed by name"""
+    alerts = {}
+    for subdir in sorted(Path(alert_dir).iterdir()):
+        if not subdir.is_dir() or subdir.name.startswith(("_", ".")):
+            continue
+        config_path = subdir / f"{subdir.name}.json"
+        if config_path.exists():
+            try:
+                if is_alert_config(read_alert_config(config_path)):
+                    load_alert_module(config_path)
+                    alerts[subdir.name] = config_path
+                    continue
+            except Exception as e:
+                print(f"Alert Manager: Error loading {config_path}: {e}")
+                continue
+        module_path = subdir / f"{subdir.name}.py"
+        if not module_path.exists():
+            continue
+        try:
+            module = load_alert_module(module_path)
+        except Exception as e:
+            print(f"Alert Manager: Error importing {module_path}: {e}")
+            continue
+        if callable(check_function(subdir.name, module)):
+            alerts[subdir.name] = module_path
+    return alerts
+
+def collect_rules(alerts):
+    """Compiled rules of every alert that exposes get_alert_rule()"""
+    rules = []
+    for name, module_path in alerts.items():
+        module = load_alert_module(module_path)
+        if not hasattr(module, "get_alert_rule"):
+            continue
+        try:
+            rules.append(module.get_alert_rule())
+        except Exception as e:
+            print(f"Alert Manager: {name} rule could not be compiled: {e}")
+    return rules
+
+def run_alert(name, module_path, snapshot):
+    """Run one alert against the shared snapshot, returning (matches, seconds)"""
+    check_func = check_function(name, load_alert_module(module_path))
+    start = time.perf_counter()
+    try:
+        matches = check_func(snapshot=snapshot)
+    except Exception as e:
+        print(f"Alert Manager: {name} failed: {e}")
+        matches = []
+    return matches, time.perf_counter() - start
+
+def get_odds_tracker():
+    """This process's OddsTracker, None when disabled in odds_tracker.json"""
+    global _odds_tracker, _odds_tracker_loaded
+    if not _odds_tracker_loaded:
+        _odds_tracker = create_tracker(load_tracker_config())
+        _odds_tracker_loaded = True
+    return _odds_tracker
+
+def run_cycle(alerts, step5_path=STEP5_JSON, executor=None, max_workers=None, columnar=False):
+    """
+    Parse step5.json once and run every alert against it.
+
+    executor: None (serial), "thread" or "process". Process workers import
+    each alert once and receive the snapshot pickled.
+    columnar: evaluate rules with NumPy masks (falls back if NumPy is missing).
+
+    Returns {name: {"matches": [...], "seconds": float}} plus "_load",
+    "_delta", "_odds" and "_filter" entries holding the parse, match delta,
+    odds tracker feed and single-pass rule evaluation times ("_load" also
+    carries the fetch's generated_at, "_delta" the delta).
+    """
+    load_start = time.perf_counter()
+    try:
+        snapshot = load_snapshot(step5_path)
+    except Exception as e:
+        print(f"Alert Manager: Error loading step5.json: {e}")
+        return {}
+    results = {"_load": {"matches": [], "seconds": time.perf_counter() - load_start,
+                         "generated_at": snapshot["generated_at"]}}
+
+    # Hash every match once; alerts reuse the hashes for their own delta
+    delta = compute_delta(snapshot["matches"], _previous_hashes)
+    snapshot["match_hashes"] = delta["hashes"]
+    results["_delta"] = {"matches": [], "seconds": delta["hash_seconds"] + delta["classify_seconds"], "delta": delta}
+    _previous_hashes.clear()
+    _previous_hashes.update(delta["hashes"])
+    
+    # Status gate + criteria for every rule-based alert in ONE pass over the
+    # new and changed matches; each alert then only dedups and formats its
+    # own candidates
+    filter_start = time.perf_counter()
+    snapshot["views"] = build_match_views(snapshot["matches"])
+    changed_views = delta_views(delta, snapshot["matches"], snapshot["views"])
+    snapshot["evaluated_views"] = set(changed_views)
+    evaluate = evaluate_rules_columnar if columnar and HAVE_NUMPY else evaluate_rules
+    snapshot["rule_results"] = evaluate(collect_rules(alerts), snapshot["matches"], changed_views)
+    results["_filter"] = {"matches": [], "seconds": time.perf_counter() - filter_start}
+
+    # Only new and changed matches can have moved; the tracker stays in this
+    # process, so process-pool alerts do not get it pickled every cycle
+    odds_start = time.perf_counter()
+    tracker = get_odds_tracker()
+    if tracker is not None:
+        for key in delta["new"] + delta["changed"]:
+            _tracked_match_ids[key] = snapshot["matches"][key].get("match_id")
+        removed = [_tracked_match_ids.pop(key, key) for key in delta["removed"]]
+        tracker.update(changed_views, snapshot["generated_at"], removed)
+    snapshot["odds_tracker"] = tracker if executor != "process" else None
+    results["_odds"] = {"matches": [], "seconds": time.perf_counter() - odds_start}
+
+    if executor is None:
+        for name, module_path in alerts.items():
+            matches, seconds = run_alert(name, module_path, snapshot)
+            results[name] = {"matches": matches, "seconds": seconds}
+        return results
+
+    pool_class = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+    with pool_class(max_workers=max_workers) as pool:
+        futures = {
+            name: pool.submit(run_alert, name, str(module_path), snapshot)
+            for name, module_path in alerts.items()
+        }
+        for name, future in futures.items():
+            matches, seconds = future.result()
+            results[name] = {"matches": matches, "seconds": seconds}
+    return results
+
+def print_cycle_report(results):
+    """Print per-alert wall time and fired counts for one cycle"""
+    print("\n" + "="*80)
+    print("ALERT MANAGER CYCLE REPORT".center(80))
+    print("="*80)
+    print(f"{'step5 load':<30} {results['_load']['seconds'] * 1000:>10.2f} ms")
+    print(f"{'match delta':<30} {results['_delta']['seconds'] * 1000:>10.2f} ms   "
+          f"{format_delta(results['_delta']['delta'])}")
+    print(f"{'rule filter (all alerts)':<30} {results['_filter']['seconds'] * 1000:>10.2f} ms")
+    for name, result in results.items():
+        if name.startswith("_"):
+            continue
+        print(f"{name:<30} {result['seconds'] * 1000:>10.2f} ms   {len(result['matches'])} fired")
+    total = sum(result["seconds"] for result in results.values())
+    print(f"{'total':<30} {total * 1000:>10.2f} ms")
+
+def main(argv=None):
+    """Command line entry point: discover alerts and run one cycle"""
+    parser = argparse.ArgumentParser(description="Run every alert off one parsed step5 snapshot")
+    parser.add_argument("--step5", type=Path, default=STEP5_JSON, help="path to step5.json or a snapshot store directory")
+    parser.add_argument("--executor", choices=["thread", "process"], default=None,
+                        help="run alerts in a pool instead of serially")
+    parser.add_argument("--workers", type=int, default=None, help="pool size")
+    parser.add_argument("--columnar", action="store_true", help="vectorized NumPy rule filter")
+    parser.add_argument("--json-backend", choices=available_backends(), default=None,
+                        help="step5 JSON decoder (default: fastest installed)")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.json_backend:
+        # Through the environment too, so pool workers decode the same way
+        os.environ["STEP5_JSON_BACKEND"] = args.json_backend
+        set_backend(args.json_backend)
+
+    if args.columnar and not HAVE_NUMPY:
+        print("Alert Manager: NumPy not installed, using the dict rule filter")
+
+    alerts = discover_alerts()
+    print(f"Alert Manager: Discovered {len(alerts)} alerts: {', '.join(alerts) or 'none'}")
+
+    # Pool workers are not covered by the profile - profile serial cycles
+    profiler = profiler_from_args(args, "alert_manager")
+    results = profiler.run(run_cycle, alerts, args.step5, args.executor, args.workers, args.columnar)
+    if results:
+        print_cycle_report(results)
+        summary = dispatch_results(results)
+        if summary is not None:
+            print(f"Alert Manager: Dispatched {summary['delivered']} alerts "
+                  f"({summary['deferred']} kept in outbox, {summary['dead']} dropped) in {summary['seconds'] * 1000:.1f} ms")
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Alert Render - Precompiled Alert Templates, One Call per Cycle
+==============================================================
+
+The alerts used to build every alert line by line with f-strings and
+.center(80), about 25 list appends per alert. The renderer compiles each
+alert's templates once and renders a whole cycle's alerts in one call, in
+the format named by "log_format" in the alert config:
+
+    step6_style   the boxed step6 blocks, byte for byte what the alerts
+                  always wrote (default)
+    compact       one line per alert: time | title #n | match id |
+                  competition | teams | score | status | qualifying lines
+    jsonl         one JSON object per alert (alert, alert_number, found_at,
+                  match and competition fields, status, odds, environment)
+    html          an escaped HTML fragment: one <section> per cycle, one
+                  <article> per alert with the odds as a table
+
+Only step6_style carries the cycle header; compact and jsonl are one
+record per alert so the logs stay grep- and jq-friendly. alert_archive.py
+imports step6_style logs only.
+
+TEMPLATES:
+Per-alert wording is passed in once (alert name, title, cycle title,
+found label, the line value that earns a star, the status description
+function) and baked into the templates: the centered cycle title, the
+per-cycle "Found:" line, and one O/U row template per distinct line value
+(its padded value and star included - float formatting is the costliest
+part of a row). get_renderer() keeps one compiled renderer per
+combination; unknown formats fall back to step6_style with a message.
+"""
+
+import html
+import json
+from collections.abc import Mapping
+
+from match_view import MatchView, as_view
+
+FORMATS = ("step6_style", "compact", "jsonl", "html")
+DEFAULT_FORMAT = "step6_style"
+
+WIDTH = 80
+RULE = "=" * WIDTH
+SEPARATOR = "\n" + "-" * WIDTH
+
+# Odds rows of the step6 block
+ML_ROW = "│ ML:     │ Home: {0:<4} │ Draw: {1:<5} │ Away: {2:<5} │ (@{3}')"
+SPREAD_ROW = "│ Spread: │ Home: {0:<4} │ Hcap: {1:<5} │ Away: {2:<5} │ (@{3}')"
+OU_ROW = "│ O/U:    │ Over: {0:<4} │ Line: {1:<5} │ Under: {2:<4} │ (@{3}'){4}"
+
+def fields(view):
+    """The match dict behind a view, read without the view's get() (compact matches answer get() themselves)"""
+    return view.match if isinstance(view, MatchView) else view
+
+def odds_rows(view, highlight_line):
+    """
+    (money line, spread, [O/U rows]) of a match view; the money line /
+    spread are None when they have no odds, O/U rows are (line, over,
+    under, time, qualifying) sorted by line value.
+    """
+    match = fields(view)
+    ml = None
+    ftr = match.get("full_time_result", {})
+    if ftr and isinstance(ftr, Mapping):
+        odds = (ftr.get("home", "N/A"), ftr.get("draw", "N/A"), ftr.get("away", "N/A"))
+        if any(value != "N/A" for value in odds):
+            ml = odds + (ftr.get("time", "N/A"),)
+
+    spread_row = None
+    spread = match.get("spread", {})
+    if spread and isinstance(spread, Mapping):
+        home, away = spread.get("home", "N/A"), spread.get("away", "N/A")
+        if home != "N/A" or away != "N/A":
+            spread_row = (home, spread.get("handicap", "N/A"), away, spread.get("time", "N/A"))
+
+    ou = [(line_value, line_data.get("over", "N/A"), line_data.get("under", "N/A"), line_data.get("time", "N/A"),
+           line_value >= highlight_line)
+          for line_value, line_data in view.lines]
+    return ml, spread_row, ou
+
+def environment_lines(match):
+    """Environment lines of an alert (summary first, step5 environment fields as fallback)"""
+    env_summary = match.get("environment_summary", [])
+    environment = match.get("environment", {})
+    if env_summary:
+        # Weather is often missing from environment_summary
+        weather = environment.get("weather_description") if environment else None
+        return ([f"Weather: {weather}"] if weather else []) + list(env_summary)
+    if environment:
+        return [
+            f"Weather: {environment.get('weather_description', 'Unknown')}",
+            f"Temperature: {environment.get('temperature', 'None')}",
+            f"Wind: {environment.get('wind_description', 'Calm')}, "
+            f"{environment.get('wind_value', 'None')} {environment.get('wind_unit', 'None')}",
+        ]
+    return ["No environment data available"]
+
+def escape(value):
+    """HTML-escaped text of any value"""
+    return html.escape(str(value))
+
+def literal(text):
+    """Text baked into a format string (braces doubled)"""
+    return text.replace("{", "{{").replace("}", "}}")
+
+class AlertRenderer:
+    """One alert's templates compiled for one output format"""
+
+    def __init__(self, log_format=DEFAULT_FORMAT, alert="alert", title="ALERT", cycle_title="ALERT CYCLE",
+                 found_label="NEW Matches Found", highlight_line=3.0, describe_status=None):
+        if log_format not in FORMATS:
+            raise ValueError(f"unknown log_format {log_format!r} (expected one of {', '.join(FORMATS)})")
+        self.log_format = log_format
+        self.alert = alert
+        self.title = title
+        self.highlight_line = highlight_line
+        self.describe_status = describe_status or (lambda status_id: f"Unknown Status ({status_id})")
+        self._render_match = getattr(self, f"_match_{log_format}")
+        self.ou_rows = {}  # (type, line value) -> compiled O/U row
+
+        # step6_style: the rules, the centered cycle title and the per-cycle
+        # lines are built once; each alert is then a single f-string.
+        # Centered values use {:^80} (same as .center(80) at an even width)
+        self.step6_header = "\n".join([
+            "\n" + RULE,
+            literal(cycle_title.center(WIDTH)),
+            "{alert_time:^80}",
+            "{found:^80}",
+            RULE,
+        ])
+        self.step6_found_label = found_label
+        self.compact_match = (f"{{found_time}} | {literal(title)} #{{number}} | {{match_id}} | {{competition}} ({{country}}) | "
+                              "{home_team} vs {away_team} | {score} | {status} | O/U {lines}")
+        self.html_header = (f'<section class="alert-cycle" data-alert="{literal(escape(alert))}">\n'
+                            f"<h2>{literal(escape(cycle_title))}</h2>\n"
+                            f"<p>Alert Time: {{alert_time}} - {literal(escape(found_label))}: {{found}} of {{scanned}} scanned</p>")
+
+    def compile_ou_row(self, line_value):
+        """O/U row template with the line value and its star baked in (a few distinct lines per feed)"""
+        star = " ★" if line_value >= self.highlight_line else ""
+        row = OU_ROW.format("{0:<4}", literal(format(line_value, "<5")), "{1:<4}", "{2}", star).format
+        self.ou_rows[(line_value.__class__, line_value)] = row
+        return row
+
+    def status(self, view):
+        """'Description (ID: n)' from the view's coerced status ID, or the match's own status text"""
+        status_id = view.status_id
+        if status_id is not None:
+            return f"{self.describe_status(status_id)} (ID: {status_id})"
+        return view.get("status", "Unknown")
+
+    def render_match(self, match, alert_number, found_time):
+        """One alert in the configured format"""
+        return self._render_match(match, alert_number, self.cycle_context(found_time))
+
+    def cycle_context(self, found_time):
+        """What every alert of a cycle shares: the found time as each format shows it"""
+        if self.log_format == "step6_style":
+            return f"{'Found: ' + str(found_time):^80}"
+        if self.log_format == "html":
+            return escape(found_time)
+        return found_time
+
+    def render_cycle(self, alerts, found_time, total_scanned):
+        """
+        A whole cycle's alerts - [(alert_number, match), ...] - as one block
+        of text, ready for emit_alert_block().
+        """
+        render, context = self._render_match, self.cycle_context(found_time)
+        parts = [render(match, number, context) for number, match in alerts]
+        if self.log_format == "step6_style":
+            header = self.step6_header.format(alert_time=f"Alert Time: {found_time}",
+                                              found=f"{self.step6_found_label}: {len(alerts)} of {total_scanned} scanned")
+            return header + "\n" + f"\n{SEPARATOR}\n".join(parts)
+        if self.log_format == "html":
+            header = self.html_header.format(alert_time=context, found=len(alerts), scanned=total_scanned)
+            return "\n".join([header, *parts, "</section>"])
+        return "\n".join(parts)
+
+    def _match_step6_style(self, match, number, found_line):
+        view = as_view(match)
+        match = fields(view)
+        get = match.get
+        odds = []
+        ftr = get("full_time_result", {})
+        if ftr and isinstance(ftr, Mapping):
+            home, draw, away = ftr.get("home", "N/A"), ftr.get("draw", "N/A"), ftr.get("away", "N/A")
+            if home != "N/A" or draw != "N/A" or away != "N/A":
+                odds.append(ML_ROW.format(home, draw, away, ftr.get("time", "N/A")))
+        spread = get("spread", {})
+        if spread and isinstance(spread, Mapping):
+            home, away = spread.get("home", "N/A"), spread.get("away", "N/A")
+            if home != "N/A" or away != "N/A":
+                odds.append(SPREAD_ROW.format(home, spread.get("handicap", "N/A"), away, spread.get("time", "N/A")))
+        ou_rows = self.ou_rows
+        for line_value, line_data in view.lines:
+            # int 3 and float 3.0 print differently, so the type is part of the key
+            row = ou_rows.get((line_value.__class__, line_value))
+            if row is None:
+                row = self.compile_ou_row(line_value)
+            odds.append(row(line_data.get("over", "N/A"), line_data.get("under", "N/A"), line_data.get("time", "N/A")))
+
+        heading = f"{self.title} #{number}"
+        match_id = f"Match ID: {get('match_id', 'N/A')}"
+        competition_id = f"Competition ID: {get('competition_id', 'N/A')}"
+        odds = "\n".join(odds) if odds else "No betting odds available"
+        environment = "\n".join(environment_lines(match))
+        return (f"\n{RULE}\n{heading:^80}\n{found_line}\n{match_id:^80}\n{competition_id:^80}\n{RULE}\n\n"
+                f"Competition: {get('competition')} ({get('country')})\n"
+                f"Match: {get('home_team')} vs {get('away_team')}\n"
+                f"Score: {get('score', 'N/A')}\n"
+                f"Status: {self.status(view)}\n"
+                f"\n--- MATCH BETTING ODDS ---\n{odds}\n"
+                f"\n--- MATCH ENVIRONMENT ---\n{environment}")
+
+    def _match_compact(self, match, number, found_time):
+        view = as_view(match)
+        match = fields(view)
+        _, _, ou = odds_rows(view, self.highlight_line)
+        lines = " ".join(f"{line_value} o{over}/u{under}" for line_value, over, under, _, qualifying in ou if qualifying)
+        return self.compact_match.format(
+            found_time=found_time, number=number, match_id=match.get("match_id", "N/A"),
+            competition=match.get("competition"), country=match.get("country"),
+            home_team=match.get("home_team"), away_team=match.get("away_team"),
+            score=match.get("score", "N/A"), status=self.status(view), lines=lines or "-",
+        )
+
+    def _match_jsonl(self, match, number, found_time):
+        view = as_view(match)
+        match = fields(view)
+        ml, spread, ou = odds_rows(view, self.highlight_line)
+        record = {
+            "alert": self.alert, "alert_number": number, "found_at": found_time,
+            "match_id": match.get("match_id"), "competition_id": match.get("competition_id"),
+            "competition": match.get("competition"), "country": match.get("country"),
+            "home_team": match.get("home_team"), "away_team": match.get("away_team"),
+            "score": match.get("score"), "status_id": view.status_id, "status": self.status(view),
+            "odds": {
+                "ml": dict(zip(("home", "draw", "away", "time"), ml)) if ml else None,
+                "spread": dict(zip(("home", "handicap", "away", "time"), spread)) if spread else None,
+                "over_under": [dict(zip(("line", "over", "under", "time", "qualifying"), row)) for row in ou],
+            },
+            "environment": environment_lines(match),
+        }
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+
+    def _match_html(self, match, number, found_html):
+        view = as_view(match)
+        match = fields(view)
+        ml, spread, ou = odds_rows(view, self.highlight_line)
+        rows = []
+        if ml is not None:
+            rows.append(f"<tr><th>ML</th><td>Home {escape(ml[0])}</td><td>Draw {escape(ml[1])}</td>"
+                        f"<td>Away {escape(ml[2])}</td><td>@{escape(ml[3])}'</td></tr>")
+        if spread is not None:
+            rows.append(f"<tr><th>Spread</th><td>Home {escape(spread[0])}</td><td>Hcap {escape(spread[1])}</td>"
+                        f"<td>Away {escape(spread[2])}</td><td>@{escape(spread[3])}'</td></tr>")
+        for line_value, over, under, time, qualifying in ou:
+            css = ' class="qualifying"' if qualifying else ""
+            rows.append(f"<tr{css}><th>O/U</th><td>Over {escape(over)}</td><td>Line {escape(line_value)}</td>"
+                        f"<td>Under {escape(under)}</td><td>@{escape(time)}'</td></tr>")
+        odds = f'<table class="odds">{"".join(rows)}</table>' if rows else "<p>No betting odds available</p>"
+        environment = "".join(f"<li>{escape(line)}</li>" for line in environment_lines(match))
+        return (f'<article class="alert" data-match-id="{escape(match.get("match_id", "N/A"))}">'
+                f"<h3>{escape(self.title)} #{number}</h3><p>Found: {found_html}</p>"
+                f"<p>{escape(match.get('competition'))} ({escape(match.get('country'))}) - "
+                f"{escape(match.get('home_team'))} vs {escape(match.get('away_team'))}</p>"
+                f"<p>Score: {escape(match.get('score', 'N/A'))} - Status: {escape(self.status(view))}</p>"
+                f'{odds}<ul class="environment">{environment}</ul></article>')
+
+# Compiled renderers: (log_format, wording) -> AlertRenderer
+_renderers = {}
+
+def get_renderer(log_format=None, **labels):
+    """Shared compiled renderer for a log_format and an alert's wording"""
+    log_format = log_format or DEFAULT_FORMAT
+    if log_format not in FORMATS:
+        print(f"Alert Render: unknown log_format {log_format!r} - using {DEFAULT_FORMAT}")
+        log_format = DEFAULT_FORMAT
+    key = (log_format, tuple(sorted(labels.items())))
+    renderer = _renderers.get(key)
+    if renderer is None:
+        renderer = _renderers[key] = AlertRenderer(log_format, **labels)
+    return renderer
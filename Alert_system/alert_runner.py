@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+Alert Runner - One Config-Driven Cycle for Every Alert
+======================================================
+
+An alert is a directory `Alert_system/<name>/` holding `<name>.json`. The
+runner reads that config and does everything else the same way for every
+alert: fetch-change pre-check, catch-up of missed fetches, delta against
+the last fetch, the compiled rule (rule_engine.py), dedup, daily numbering,
+rendering (alert_render.py), archive, metrics and state. A new alert is a
+new JSON file - no code to copy.
+
+CONFIG (<name>.json):
+    "criteria"          rule_engine criteria - the only required block
+    "display"           the alert's wording:
+        "title"         alert block title ("OU 3.0+ ALERT" -> "OU 3.0+ ALERT #7")
+        "cycle_title"   cycle header title
+        "found_label"   cycle header count label ("NEW Matches Found")
+        "log_prefix"    prefix of every console line ("OU3 Alert")
+        "monitoring"    what the start line says is monitored
+        "scanning"      what the scan looks for, one item per line
+                        ({min_line} is filled in)
+        "found"         what the found line calls a fired match
+        "rejected"      what the skipped line calls a status-rejected match
+    "enabled", "dedup_ttl_hours", "catch_up", "metrics", "archive",
+    "log_format", "log_file", "timezone"
+
+The config is re-read every cycle (once when resident); the wording is read
+when the runner is built.
+
+STATE (next to the config):
+    <log_file>                  alert log (default <name>.log)
+    processed_matches.jsonl     dedup keys, fetch state, delta hashes and
+                                daily counter (dedup_store.py); legacy
+                                processed_matches.json / daily_alert_count.json
+                                are migrated on first run
+    ../alert_archive.db         archive shared by every alert
+
+The paths are attributes of the runner (log_file, dedup_store_file, ...)
+so tests and replays can point them elsewhere.
+
+One runner is built per config file and process (get_runner), so the
+Alert Manager, the daemon and the per-alert entry scripts (ou_3/ou_3.py,
+which keep `python3 ou_3.py` and check_ou_3_alert() working) share the
+same resident state. Replays build runners of their own with fetch_clock
+set, so dedup TTL and the daily count follow the replayed fetch times.
+
+Usage:
+    python3 alert_runner.py ou_3                  # one cycle of one alert
+    python3 alert_runner.py ou_3_no_score --profile --profile-dir /tmp/profiles
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from alert_archive import alert_record, archive_alerts
+from alert_log import emit_alert_block, setup_null_logger, setup_queued_logger
+from alert_render import get_renderer
+from dedup_store import DedupStore, open_dedup_store
+from delta_engine import compute_delta, criteria_fingerprint, evaluate_delta, format_delta
+from match_view import build_match_views
+from metrics import NULL_METRICS, fetch_timestamp, open_cycle_metrics
+from profiling import add_profile_arguments, profiler_from_args
+from rule_engine import compile_rule, validate_criteria
+from step5_reader import peek_generated_at, read_history_since, read_latest_snapshot, stat_fingerprint
+
+# Path constants
+BASE_DIR = Path(__file__).parent
+ARCHIVE_FILE = BASE_DIR / "alert_archive.db"  # shared by every alert
+
+# Step5 data location
+STEP5_JSON = Path("/root/CascadeProjects/Football_bot/step5/step5.json")
+
+# Use Eastern timezone (same as step6) unless the config names another
+TZ = ZoneInfo("America/New_York")
+
+# Dedup keys older than this are dropped (overridable via "dedup_ttl_hours")
+DEFAULT_DEDUP_TTL_HOURS = 24
+
+# Most missed fetches processed by one catch-up (overridable via "catch_up")
+DEFAULT_MAX_BACKLOG = 12
+
+# Status descriptions (corrected mapping)
+STATUS_DESCRIPTIONS = {
+    1: "Not started",
+    2: "First half",
+    3: "Half-time break",
+    4: "Second half",
+    5: "Extra time",
+    6: "Penalty shootout",
+    7: "Finished",
+    8: "Finished",
+    9: "Postponed",
+    10: "Canceled",
+    11: "To be announced",
+    12: "Interrupted",
+    13: "Abandoned",
+    14: "Suspended"
+}
+
+def get_status_description(status_id):
+    """Get status description from ID (corrected mapping)"""
+    return STATUS_DESCRIPTIONS.get(status_id, f"Unknown Status ({status_id})")
+
+def default_display(name):
+    """Wording for an alert whose config has no "display" block"""
+    title = f"{name.upper()} ALERT"
+    return {
+        "title": title,
+        "cycle_title": f"{title} CYCLE",
+        "found_label": "NEW Matches Found",
+        "log_prefix": f"{name} alert",
+        "monitoring": name,
+        "scanning": ["O/U lines >= {min_line}"],
+        "found": "matches",
+        "rejected": "status-rejected matches",
+    }
+
+def read_alert_config(config_path):
+    """Parsed <name>.json (raises on a missing or invalid file, or criteria that cannot compile)"""
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    if is_alert_config(config):
+        validate_criteria(config["criteria"])
+    return config
+
+def is_alert_config(config):
+    """True for a parsed config that defines an alert (a "criteria" block)"""
+    return isinstance(config, dict) and isinstance(config.get("criteria"), dict)
+
+class AlertRunner:
+    """One alert's cycle, driven by its <name>.json"""
+
+    def __init__(self, config_path):
+        self.config_path = Path(config_path)
+        self.name = self.config_path.stem
+        self.base_dir = self.config_path.parent
+        self.config = read_alert_config(self.config_path)  # last good config
+        self.display = {**default_display(self.name), **(self.config.get("display") or {})}
+        self.prefix = self.display["log_prefix"]
+        self.tz = ZoneInfo(self.config["timezone"]) if self.config.get("timezone") else TZ
+
+        self.step5_json = STEP5_JSON
+        self.log_file = self.base_dir / self.config.get("log_file", f"{self.name}.log")
+        self.archive_file = ARCHIVE_FILE
+        self.dedup_store_file = self.base_dir / "processed_matches.jsonl"
+        self.processed_matches_file = self.base_dir / "processed_matches.json"  # legacy, migrated
+        self.daily_counter_file = self.base_dir / "daily_alert_count.json"  # legacy, migrated
+
+        # Resident mode (alert daemon / worker): logger, config, rule and
+        # state stay in memory between cycles instead of being rebuilt
+        self.resident = False
+        self._resident = {}
+        # Write state and the alert log to disk - off for replays
+        self.persist_state = True
+        # Echo alert blocks to stdout (off by default in daemon use)
+        self.console_echo = True
+        # Read "now" (dedup TTL, daily count) from the fetch's generated_at
+        # instead of the wall clock - on for replays
+        self.fetch_clock = False
+
+    def __repr__(self):
+        return f"AlertRunner({str(self.config_path)!r})"
+
+    def enable_resident_mode(self, console_echo=False, persist_state=True):
+        """Keep logger, config and alert state in memory between cycles (persist_state=False: never touch disk)"""
+        self.resident = True
+        self.console_echo = console_echo
+        self.persist_state = persist_state
+        self._resident.clear()
+
+    def _resident_cached(self, name, loader):
+        """Return loader(), cached between cycles when running resident"""
+        if not self.resident:
+            return loader()
+        if name not in self._resident:
+            self._resident[name] = loader()
+        return self._resident[name]
+
+    def load_config(self):
+        """Re-read <name>.json, keeping the last good config if it cannot be read"""
+        try:
+            self.config = read_alert_config(self.config_path)
+        except Exception as e:
+            print(f"{self.prefix}: Error loading config: {e}")
+        return self.config
+
+    def get_alert_rule(self, config=None):
+        """Compile this alert's criteria from its config (cached when resident)"""
+        def compile_from_config():
+            return compile_rule(self.name, config or self._resident_cached("config", self.load_config))
+        return self._resident_cached("rule", compile_from_config)
+
+    def get_alert_renderer(self, config):
+        """Compiled templates for the configured log_format and this alert's wording"""
+        display = self.display
+        return get_renderer(config.get("log_format"), alert=self.name, title=display["title"],
+                            cycle_title=display["cycle_title"], found_label=display["found_label"],
+                            describe_status=get_status_description)
+
+    def get_eastern_time(self):
+        """Current time in the alert's time zone, formatted like step6"""
+        return datetime.now(self.tz).strftime("%m/%d/%Y %I:%M:%S %p %Z")
+
+    def cycle_clock(self, fetch_time):
+        """The cycle's "now" in the alert's time zone - the fetch's generated_at with fetch_clock set"""
+        if self.fetch_clock:
+            timestamp = fetch_timestamp(fetch_time, self.tz)
+            if timestamp is not None:
+                return datetime.fromtimestamp(timestamp, self.tz)
+        return datetime.now(self.tz)
+
+    def setup_logging(self):
+        """Logger that writes to the alert log from a background thread"""
+        if not self.persist_state:
+            return setup_null_logger(f"{self.name}_alert.replay")
+        return setup_queued_logger(f"{self.name}_alert", self.log_file)
+
+    def get_and_increment_daily_count(self, processed_matches, now=None):
+        """Get current daily alert count from the alert state store and increment for each new alert"""
+        today = (now or datetime.now(self.tz)).strftime("%Y-%m-%d")
+        data = processed_matches.meta.get("daily_count") or {}
+
+        # Reset count if it's a new day
+        if data.get("date") != today:
+            return 0, today
+
+        return data.get("count", 0), today
+
+    def save_daily_count(self, processed_matches, count, date):
+        """Record the updated daily count - written with the rest of the alert state at the end of the cycle"""
+        processed_matches.set_meta(daily_count={"date": date, "count": count})
+
+    def load_processed_matches(self):
+        """Load the alert state store (migrating the legacy JSON files once), last fetch time and stat fingerprint"""
+        if not self.persist_state:
+            store = DedupStore(None)  # in-memory only
+        else:
+            store = open_dedup_store(self.dedup_store_file, self.processed_matches_file, self.daily_counter_file,
+                                     self.get_alert_rule().key_suffix)
+        return store, store.meta.get("last_fetch_time", ""), store.meta.get("last_fetch_stat")
+
+    def save_processed_matches(self, processed_matches, fetch_time, fetch_stat=None):
+        """Append new dedup keys, daily count and fetch state to the store in one fsynced write (nothing if unchanged)"""
+        if self.resident:
+            self._resident["processed_matches"] = (processed_matches, fetch_time, fetch_stat)
+
+        try:
+            processed_matches.set_meta(last_fetch_time=fetch_time, last_fetch_stat=fetch_stat)
+            processed_matches.flush()
+        except Exception as e:
+            print(f"{self.prefix}: Error saving processed matches: {e}")
+
+    def catch_up_missed_fetches(self, step5_path, last_fetch_time, current_fetch_time, config):
+        """Run the alert over fetches between the last processed one and the current one; returns (fired, processed)"""
+        catch_up = config.get("catch_up", {})
+        if not catch_up.get("enabled", False) or not last_fetch_time:
+            return [], 0
+        max_backlog = catch_up.get("max_backlog", DEFAULT_MAX_BACKLOG)
+
+        # Only entries newer than last_fetch_time are decoded (+1 for the current one)
+        try:
+            entries, skipped = read_history_since(step5_path, last_fetch_time, max_backlog + 1)
+        except Exception as e:
+            print(f"{self.prefix}: Error reading missed fetches: {e}")
+            return [], 0
+
+        missed = []
+        for entry in entries:
+            if entry.get("generated_at") == current_fetch_time:
+                break
+            missed.append(entry)
+        if not missed:
+            return [], 0
+
+        if skipped:
+            print(f"{self.prefix}: Backlog larger than {max_backlog} fetches - {skipped} older fetches skipped")
+        print(f"{self.prefix}: Catching up on {len(missed)} missed fetches since {last_fetch_time}")
+        fired = []
+        for entry in missed:
+            fired.extend(self.check_alert(snapshot={
+                "matches": entry.get("matches", {}),
+                "generated_at": entry.get("generated_at", "Unknown"),
+                "fetch_stat": None,  # not the file's current state
+                "catch_up": False,
+                "found_at": entry.get("generated_at"),  # stamped with the missed fetch's time, not now
+            }))
+        return fired, len(missed)
+
+    def check_alert(self, snapshot=None):
+        """
+        One alert cycle (fresh fetch only, no duplicates); returns the fired match dicts.
+
+        snapshot: optional pre-parsed step5 data from step5_reader.load_snapshot().
+        The Alert Manager parses step5.json once and passes the same snapshot to
+        every alert; when omitted the runner reads step5_json itself. Fetches
+        missed since the last run are caught up first when "catch_up" is enabled.
+        """
+        prefix, display = self.prefix, self.display
+        print(f"{prefix}: Starting {display['monitoring']} monitoring...")
+        cycle_start = time.perf_counter()
+
+        # Load step5 data
+        if snapshot is None and not self.step5_json.exists():
+            print(f"{prefix}: Error - step5.json not found")
+            return []
+
+        # Load previously processed matches, last fetch time and file fingerprint
+        processed_matches, last_fetch_time, last_fetch_stat = self._resident_cached(
+            "processed_matches", self.load_processed_matches)
+
+        # Cheap pre-check before any JSON parsing: untouched file means same fetch
+        fetch_stat = snapshot["fetch_stat"] if snapshot is not None else stat_fingerprint(self.step5_json)
+        if fetch_stat is not None and fetch_stat == last_fetch_stat:
+            print(f"{prefix}: step5.json unchanged since last run ({last_fetch_time}) - skipping")
+            return []
+
+        # File was rewritten - peek at the tail before paying for a parse
+        if snapshot is None and peek_generated_at(self.step5_json) == last_fetch_time:
+            print(f"{prefix}: Same fetch time as last run ({last_fetch_time}) - skipping to avoid duplicates")
+            self.save_processed_matches(processed_matches, last_fetch_time, fetch_stat)
+            return []
+
+        logger = self._resident_cached("logger", self.setup_logging)
+
+        config = self._resident_cached("config", self.load_config)
+        if not config.get("enabled", True):
+            print(f"{prefix}: Alert disabled in config")
+            return []
+
+        rule = self.get_alert_rule(config)
+        min_line = rule.min_line
+
+        # Get ONLY the latest/freshest data (no history) - only the newest
+        # history entry is decoded, the rest of the file is never parsed
+        if snapshot is not None:
+            matches, current_fetch_time = snapshot["matches"], snapshot["generated_at"]
+        else:
+            try:
+                matches, current_fetch_time = read_latest_snapshot(self.step5_json)
+            except Exception as e:
+                print(f"{prefix}: Error loading step5.json: {e}")
+                return []
+
+        # Check if this is a new fetch
+        if current_fetch_time == last_fetch_time:
+            print(f"{prefix}: Same fetch time as last run ({current_fetch_time}) - skipping to avoid duplicates")
+            self.save_processed_matches(processed_matches, current_fetch_time, fetch_stat)
+            return []
+
+        # A caught-up fetch keeps its own time in the log, archive and metrics
+        found_at = snapshot.get("found_at") if snapshot is not None else None
+
+        # Per-cycle stage timings and counters (no-ops unless enabled in the config)
+        metrics = NULL_METRICS
+        if self.persist_state:
+            metrics = open_cycle_metrics(self.name, config, self.base_dir, current_fetch_time, self.tz, cycle_start,
+                                         caught_up=found_at is not None)
+        metrics.lap("load")
+
+        # Fetches that landed after the last processed one are handled first,
+        # oldest first; the state they updated is then reloaded
+        caught_up = []
+        if snapshot is None or snapshot.get("catch_up", True):
+            step5_path = snapshot.get("path", self.step5_json) if snapshot is not None else self.step5_json
+            caught_up, processed = self.catch_up_missed_fetches(step5_path, last_fetch_time, current_fetch_time, config)
+            if processed:
+                processed_matches, last_fetch_time, last_fetch_stat = self._resident_cached(
+                    "processed_matches", self.load_processed_matches)
+        metrics.lap("catch_up")
+
+        print(f"{prefix}: New fetch detected - {current_fetch_time}")
+        print(f"{prefix}: Last processed fetch was - {last_fetch_time}")
+
+        total_matches = len(matches)
+        matching_matches = []
+        skipped_matches = 0
+        now = self.cycle_clock(current_fetch_time)
+
+        scanning = [item.format(min_line=min_line) for item in display["scanning"]]
+        if len(scanning) == 1:
+            print(f"{prefix}: Scanning {total_matches} matches for {scanning[0]}")
+        else:
+            print(f"{prefix}: Scanning {total_matches} matches for:")
+            for number, item in enumerate(scanning, 1):
+                print(f"  {number}. {item}")
+
+        # Delta against the last processed fetch: unchanged matches give the same
+        # result as last time, so only new and changed ones are evaluated
+        views = snapshot.get("views") if snapshot is not None else None
+        if views is None:
+            views = build_match_views(matches)
+        fingerprint = criteria_fingerprint(rule)
+        previous_hashes = {}
+        if processed_matches.meta.get("delta_criteria") == fingerprint:
+            previous_hashes = processed_matches.match_hashes  # criteria changed = everything is new
+        delta = compute_delta(matches, previous_hashes, snapshot.get("match_hashes") if snapshot is not None else None)
+        print(f"{prefix}: Delta - {format_delta(delta)}")
+
+        # Stages 1-2 (status gate + compiled criteria) - reuse the Alert Manager's
+        # single-pass evaluation when it already covers the changed matches
+        evaluation = evaluate_delta(rule, matches, views, delta, snapshot)
+        rejected_matches = evaluation["status_rejected"]
+        finished_match_ids = evaluation["finished_match_ids"]
+        metrics.lap("filter")
+
+        # Candidates are match views: the key below and the renderer reuse their
+        # precomputed lines instead of walking over_under again
+        for view in evaluation["candidates"]:
+            # Stage 3: Have we already processed this match?
+            match_key = rule.match_key(view)
+            if match_key in processed_matches:
+                skipped_matches += 1
+                print(f"{prefix}: Skipping duplicate - {view.get('home_team')} vs {view.get('away_team')}")
+                continue
+
+            # Match qualifies - add to results and mark as processed
+            matching_matches.append(view)
+            processed_matches.add(match_key, view.match_id, now.timestamp())
+
+        metrics.lap("dedup")
+
+        num_found = len(matching_matches)
+        print(f"{prefix}: Found {num_found} NEW {display['found']} with O/U lines >= {min_line}")
+        print(f"{prefix}: Skipped {skipped_matches} duplicates, {rejected_matches} {display['rejected']}")
+
+        if num_found > 0:
+            # Get current daily count
+            current_count, today = self.get_and_increment_daily_count(processed_matches, now)
+
+            # Number each qualifying match with the daily running count
+            cycle_time = found_at or self.get_eastern_time()
+            archiving = self.persist_state and (config.get("archive") or {}).get("enabled", False)
+            numbered = []
+            archive_records = []
+            for match in matching_matches:
+                current_count += 1  # Increment for each match
+                numbered.append((current_count, match))
+                if archiving:
+                    archive_records.append(alert_record(self.name, current_count, match, cycle_time,
+                                                        rule.signature(match), self.tz))
+
+            # Render the whole cycle in one call (log_format) - one timestamp,
+            # one write, handed to the background log writer
+            renderer = self.get_alert_renderer(config)
+            emit_alert_block(logger, renderer.render_cycle(numbered, cycle_time, total_matches), self.console_echo)
+            metrics.alert_written()
+            metrics.lap("format")
+
+            # The same alerts as structured records for querying (alert_archive.py)
+            try:
+                archive_alerts(archive_records, self.archive_file)
+            except Exception as e:
+                print(f"{prefix}: Error archiving alerts: {e}")
+            metrics.lap("archive")
+
+            # Save the updated daily count
+            self.save_daily_count(processed_matches, current_count, today)
+
+        # Drop dedup keys for finished matches and keys past their TTL
+        ttl_hours = config.get("dedup_ttl_hours", DEFAULT_DEDUP_TTL_HOURS)
+        processed_matches.evict(finished_match_ids, ttl_hours * 3600 if ttl_hours is not None else None,
+                                now.timestamp())
+
+        # Remember this fetch's match hashes for the next delta
+        processed_matches.set_match_hashes(delta["hashes"])
+        processed_matches.set_meta(delta_criteria=fingerprint)
+
+        # Save updated processed matches with current fetch time
+        state_bytes = processed_matches.bytes_written
+        self.save_processed_matches(processed_matches, current_fetch_time, fetch_stat)
+
+        metrics.lap("persist")
+
+        metrics.count("scanned", total_matches)
+        metrics.count("changed", len(delta["new"]) + len(delta["changed"]))
+        metrics.count("non_live", rejected_matches)
+        metrics.count("duplicates", skipped_matches)
+        metrics.count("fired", num_found)
+        metrics.count("state_bytes_written", processed_matches.bytes_written - state_bytes)
+        if metrics.enabled:
+            metrics.count("state_bytes_full_rewrite", processed_matches.full_size())
+        try:
+            metrics.finish()
+        except Exception as e:
+            print(f"{prefix}: Error writing metrics: {e}")
+
+        return caught_up + [view.match for view in matching_matches]
+
+def alert_config_path(name, alert_dir=BASE_DIR):
+    """Config file of the alert called name"""
+    return Path(alert_dir) / name / f"{name}.json"
+
+# AlertRunners built in this process (by resolved config path)
+_runners = {}
+
+def get_runner(config_path):
+    """The AlertRunner of a config file - one per process, shared by every caller"""
+    config_path = Path(config_path).resolve()
+    runner = _runners.get(config_path)
+    if runner is None:
+        runner = _runners[config_path] = AlertRunner(config_path)
+    return runner
+
+def main(argv=None, alert=None):
+    """Run one alert cycle from the command line (alert: fixed by an entry script, else the first argument)"""
+    parser = argparse.ArgumentParser(description=f"Run one {alert or 'alert'} cycle")
+    if alert is None:
+        parser.add_argument("alert", help="alert name (directory holding <name>.json)")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    runner = get_runner(alert_config_path(alert or args.alert))
+    # --profile wraps the cycle in cProfile + tracemalloc
+    matches = profiler_from_args(args, runner.name).run(runner.check_alert)
+    print(f"{runner.prefix} completed: {len(matches)} qualifying matches found")
+    return matches
+
+if __name__ == "__main__":
+    main()
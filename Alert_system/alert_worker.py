@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Alert Worker - Warm Alert Runner Behind a Unix Domain Socket
+============================================================
+
+For pipelines that call the alerts after every fetch instead of letting
+alert_daemon.py watch step5.json. Launching a Python process per alert pays
+for interpreter startup, the imports and rebuilding loggers, config and
+dedup state every time - more than the alert logic itself. The worker
+imports every alert once, keeps them resident (like the daemon) and waits
+on a Unix socket for the pipeline to say a fetch landed:
+
+    request   {"step5": "/path/step5.json", "generated_at": "05/28/2025 11:05:04 PM EDT"}
+    reply     {"ok": true, "generated_at": <requested>, "processed_generated_at": <newest fetch read>,
+               "fired": {"ou_3": [match, ...], "ou_3_no_score": [...]}, "seconds": <cycle time>}
+
+    request   {"command": "ping"}
+    reply     {"ok": true, "alerts": [...], "cycles": <cycles run>}
+
+Both directions are one JSON object per line; a connection may carry any
+number of requests. "step5" may be a legacy step5.json or a snapshot store
+and defaults to --step5. The cycle always processes the newest fetch (plus
+any missed ones the alerts catch up on), so a late request loses nothing;
+"processed_generated_at" says which fetch that was. Errors come back as
+{"ok": false, "error": "..."}.
+
+Every connection gets its own thread, so a client that keeps its
+connection open never blocks other clients or stop(). Cycles still never
+overlap: a lock lets one fetch request run at a time, and the others wait
+for it (pings are answered right away). stop() closes the open
+connections as well. Fired alerts are also handed to the async dispatcher
+when it is enabled in dispatch.json.
+alert_worker_client.py makes the call from the pipeline side.
+
+Usage:
+    python3 alert_worker.py                            # listens on Alert_system/alert_worker.sock
+    python3 alert_worker.py --socket /run/alerts.sock --step5 /path/step5.json
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+
+from alert_daemon import load_resident_alerts
+from alert_manager import STEP5_JSON, run_cycle
+from dispatcher import DispatcherThread, create_dispatcher, load_dispatch_config
+
+BASE_DIR = Path(__file__).parent
+SOCKET_FILE = BASE_DIR / "alert_worker.sock"
+
+# How often the serve loop checks whether it should stop
+POLL_SECONDS = 0.2
+
+def remove_stale_socket(socket_path):
+    """Unlink a socket file left by a worker that is gone (error if one is still listening)"""
+    socket_path = Path(socket_path)
+    if not socket_path.exists():
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(socket_path))
+    except (ConnectionRefusedError, FileNotFoundError):
+        socket_path.unlink(missing_ok=True)
+    else:
+        raise RuntimeError(f"another alert worker is listening on {socket_path}")
+    finally:
+        probe.close()
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answer every request line of one connection (one thread per connection)"""
+
+    def setup(self):
+        super().setup()
+        self.server.worker.track_connection(self.connection)
+
+    def finish(self):
+        self.server.worker.untrack_connection(self.connection)
+        try:
+            super().finish()
+        except OSError:
+            pass  # connection shut down by close()
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                reply = {"ok": False, "error": f"bad request: {e}"}
+            else:
+                reply = self.server.worker.handle(request)
+            self.wfile.write(json.dumps(reply, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+class _WorkerServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server with a daemon thread per connection"""
+
+    daemon_threads = True
+
+class AlertWorker:
+    """Resident alerts answering new-fetch requests on a Unix socket"""
+
+    def __init__(self, socket_path=SOCKET_FILE, step5_path=STEP5_JSON, executor=None, max_workers=None,
+                 console_echo=False, dispatch=True):
+        self.socket_path = Path(socket_path)
+        self.step5_path = Path(step5_path)
+        self.executor = executor
+        self.max_workers = max_workers
+        self.alerts = load_resident_alerts(console_echo)
+        self.cycles = 0
+        self.dispatch_thread = None
+        if dispatch:
+            dispatcher = create_dispatcher(load_dispatch_config())
+            if dispatcher is not None:
+                self.dispatch_thread = DispatcherThread(dispatcher).start()
+        self.server = None
+        self._stopping = False
+        self._cycle_lock = threading.Lock()  # one cycle at a time across connections
+        self._connections = set()
+        self._connections_lock = threading.Lock()
+
+    def handle(self, request):
+        """Reply for one request (see the module docstring)"""
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "request must be a JSON object"}
+        if request.get("command") == "ping":
+            return {"ok": True, "alerts": list(self.alerts), "cycles": self.cycles}
+        if request.get("command", "fetch") != "fetch":
+            return {"ok": False, "error": f"unknown command {request['command']!r}"}
+
+        step5_path = Path(request.get("step5") or self.step5_path)
+        with self._cycle_lock:
+            start = time.perf_counter()
+            try:
+                results = run_cycle(self.alerts, step5_path, self.executor, self.max_workers)
+            except Exception as e:
+                return {"ok": False, "error": f"cycle failed: {e}"}
+            if not results:
+                return {"ok": False, "error": f"could not load {step5_path}"}
+            self.cycles += 1
+            if self.dispatch_thread is not None:
+                self.dispatch_thread.submit(results)
+        return {
+            "ok": True,
+            "generated_at": request.get("generated_at"),
+            "processed_generated_at": results["_load"]["generated_at"],
+            "fired": {name: result["matches"] for name, result in results.items() if not name.startswith("_")},
+            "seconds": time.perf_counter() - start,
+        }
+
+    def bind(self):
+        """Create the listening socket (owner-only permissions)"""
+        remove_stale_socket(self.socket_path)
+        self.server = _WorkerServer(str(self.socket_path), _RequestHandler)
+        self.server.worker = self
+        self.server.timeout = POLL_SECONDS
+        os.chmod(self.socket_path, 0o600)
+        return self
+
+    def serve(self):
+        """Answer requests until stop() / SIGTERM / Ctrl-C, then clean up"""
+        if self.server is None:
+            self.bind()
+        try:
+            while not self._stopping:
+                self.server.handle_request()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def stop(self):
+        """Make serve() return within POLL_SECONDS, whatever the clients do"""
+        self._stopping = True
+
+    def track_connection(self, connection):
+        """Remember an open client connection so close() can end it"""
+        with self._connections_lock:
+            self._connections.add(connection)
+
+    def untrack_connection(self, connection):
+        """Forget a client connection that finished"""
+        with self._connections_lock:
+            self._connections.discard(connection)
+
+    def close(self):
+        """Remove the socket, end open connections and stop the dispatcher"""
+        if self.server is not None:
+            self.server.server_close()
+            self.server = None
+            self.socket_path.unlink(missing_ok=True)
+        # A cycle in progress finishes saving its state first
+        with self._cycle_lock, self._connections_lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.dispatch_thread is not None:
+            self.dispatch_thread.stop()
+            self.dispatch_thread = None
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Warm alert worker on a Unix domain socket")
+    parser.add_argument("--socket", type=Path, default=SOCKET_FILE, help="socket path")
+    parser.add_argument("--step5", type=Path, default=STEP5_JSON,
+                        help="step5.json or snapshot store used when a request names none")
+    # Process pools are rebuilt per cycle and would lose resident state
+    parser.add_argument("--executor", choices=["thread"], default=None,
+                        help="run alerts in a thread pool instead of serially")
+    parser.add_argument("--workers", type=int, default=None, help="pool size")
+    parser.add_argument("--echo", action="store_true", help="also print alert blocks to stdout")
+    args = parser.parse_args(argv)
+
+    worker = AlertWorker(args.socket, args.step5, args.executor, args.workers, args.echo).bind()
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    print(f"Alert Worker: {len(worker.alerts)} resident alerts ({', '.join(worker.alerts) or 'none'}) "
+          f"listening on {args.socket}", flush=True)
+    worker.serve()
+    print(f"Alert Worker: stopped after {worker.cycles} cycles")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Alert Worker Client - Tell the Warm Alert Worker a Fetch Landed
+===============================================================
+
+The pipeline side of alert_worker.py. Standard library only, so calling it
+after a fetch costs a socket round trip instead of starting the alerts:
+
+    from alert_worker_client import send_fetch
+    reply = send_fetch("/path/step5.json", generated_at)
+    reply["fired"]   # {"ou_3": [match, ...], ...}
+
+Keep an AlertWorkerClient open to reuse one connection across fetches.
+
+Usage:
+    python3 alert_worker_client.py --step5 /path/step5.json --generated-at "05/28/2025 11:05:04 PM EDT"
+    python3 alert_worker_client.py --ping
+
+Prints the worker's reply as JSON. Exit status: 0 ok, 1 the worker
+reported an error, 2 no worker is listening.
+"""
+
+import argparse
+import json
+import socket
+import sys
+from pathlib import Path
+
+SOCKET_FILE = Path(__file__).parent / "alert_worker.sock"
+
+# A cycle over thousands of matches takes well under this
+DEFAULT_TIMEOUT = 60.0
+
+class AlertWorkerClient:
+    """One connection to the alert worker; requests are answered in order"""
+
+    def __init__(self, socket_path=SOCKET_FILE, timeout=DEFAULT_TIMEOUT):
+        self.socket_path = Path(socket_path)
+        self.timeout = timeout
+        self.sock = None
+        self.reader = None
+
+    def connect(self):
+        """Open the connection (raises OSError when no worker is listening)"""
+        if self.sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(str(self.socket_path))
+            except OSError:
+                sock.close()
+                raise
+            self.sock = sock
+            self.reader = sock.makefile("rb")
+        return self
+
+    def request(self, payload):
+        """Send one request object and return the worker's reply"""
+        self.connect()
+        self.sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        line = self.reader.readline()
+        if not line:
+            self.close()
+            raise ConnectionError("alert worker closed the connection")
+        return json.loads(line)
+
+    def new_fetch(self, step5_path=None, generated_at=None):
+        """Run the alerts on a new fetch; the reply carries the fired alerts"""
+        payload = {"command": "fetch", "generated_at": generated_at}
+        if step5_path is not None:
+            payload["step5"] = str(Path(step5_path).resolve())
+        return self.request(payload)
+
+    def ping(self):
+        """Resident alerts and cycle count of the worker"""
+        return self.request({"command": "ping"})
+
+    def close(self):
+        """Close the connection"""
+        if self.sock is not None:
+            self.reader.close()
+            self.sock.close()
+            self.sock = self.reader = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def send_fetch(step5_path=None, generated_at=None, socket_path=SOCKET_FILE, timeout=DEFAULT_TIMEOUT):
+    """One-shot new_fetch() over a fresh connection"""
+    with AlertWorkerClient(socket_path, timeout) as client:
+        return client.new_fetch(step5_path, generated_at)
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Notify the alert worker of a new fetch")
+    parser.add_argument("--socket", type=Path, default=SOCKET_FILE, help="worker socket path")
+    parser.add_argument("--step5", type=Path, default=None, help="step5.json or snapshot store (worker default if omitted)")
+    parser.add_argument("--generated-at", default=None, help="generated_at of the new fetch")
+    parser.add_argument("--ping", action="store_true", help="only check the worker is up")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds to wait for the reply")
+    args = parser.parse_args(argv)
+
+    try:
+        with AlertWorkerClient(args.socket, args.timeout) as client:
+            reply = client.ping() if args.ping else client.new_fetch(args.step5, args.generated_at)
+    except OSError as e:
+        print(f"Alert Worker Client: no worker on {args.socket} ({e})", file=sys.stderr)
+        return 2
+    print(json.dumps(reply, ensure_ascii=False))
+    return 0 if reply.get("ok") else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Per-Alert Emit Cost
+===============================
+
+Compares the cost of getting one formatted alert onto disk:
+
+1. legacy:  one logger.info() to a synchronous FileHandler plus one print()
+            per line (the old log_and_print path)
+2. batched: whole block built in memory, one record handed to the
+            QueueHandler, console echo on
+3. daemon:  same as batched with console echo off (daemon default)
+
+Output is redirected to a temporary directory and /dev/null so only the
+alert path itself is timed.
+
+Usage:
+    python3 benchmarks/bench_alert_emit.py --alerts 2000
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Shared alert helpers and the alert runner
+ALERT_SYSTEM_DIR = Path(__file__).parent.parent
+sys.path.append(str(ALERT_SYSTEM_DIR))
+
+from alert_log import emit_alert_block, setup_queued_logger, stop_alert_listeners
+from alert_runner import AlertRunner, alert_config_path
+
+ou_3 = AlertRunner(alert_config_path("ou_3", ALERT_SYSTEM_DIR))
+
+def sample_match():
+    """One live match shaped like a real step5 entry"""
+    return {
+        "match_id": "pxwrxlhyg538ryk",
+        "competition_id": "j1l4rjnhjg1m7vx",
+        "competition": "USA ULOC",
+        "country": "United States",
+        "home_team": "Monterey Bay FC",
+        "away_team": "Spokane Velocity",
+        "score": "1 - 0 (HT: 1 - 0)",
+        "status_id": 4,
+        "full_time_result": {"home": "-143", "draw": "+274", "away": "+347", "time": "6"},
+        "spread": {"home": "-108", "away": "-118", "handicap": -0.25, "time": "5"},
+        "over_under": {
+            "line_1": {"line": 2.5, "over": "-150", "under": "+120", "time": "6"},
+            "line_2": {"line": 3.0, "over": "-120", "under": "+100", "time": "6"},
+            "line_3": {"line": 3.5, "over": "-108", "under": "-119", "time": "6"},
+        },
+        "environment": {"weather_description": "Foggy"},
+        "environment_summary": ["Temperature: 57.2°F", "Wind: Light Breeze, 5.8 mph"],
+    }
+
+def legacy_logger(log_file):
+    """The original synchronous FileHandler setup"""
+    logger = logging.getLogger("bench_legacy")
+    logger.setLevel(logging.INFO)
+    logger.handlers.clear()
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(file_handler)
+    return logger
+
+def bench_legacy(match, num_alerts, log_file):
+    """One logger.info + print per line, clock re-read per alert"""
+    logger = legacy_logger(log_file)
+    renderer = ou_3.get_alert_renderer({})
+    start = time.perf_counter()
+    for n in range(num_alerts):
+        for line in renderer.render_match(match, n, ou_3.get_eastern_time()).split("\n"):
+            logger.info(line)
+            print(line)
+    for handler in logger.handlers:
+        handler.flush()
+    return time.perf_counter() - start
+
+def bench_batched(match, num_alerts, log_file, console_echo):
+    """Whole block per alert, one record to the queued writer"""
+    logger = setup_queued_logger(f"bench_batched_{console_echo}", log_file)
+    renderer = ou_3.get_alert_renderer({})
+    found_time = ou_3.get_eastern_time()
+    start = time.perf_counter()
+    for n in range(num_alerts):
+        emit_alert_block(logger, renderer.render_match(match, n, found_time), console_echo)
+    elapsed = time.perf_counter() - start
+    stop_alert_listeners()  # drained outside the timed region - that is the point
+    return elapsed
+
+def main(argv=None):
+    """Run all variants and print per-alert cost"""
+    parser = argparse.ArgumentParser(description="Per-alert emit cost, legacy vs batched")
+    parser.add_argument("--alerts", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    match = sample_match()
+    tmp_dir = Path(tempfile.mkdtemp())
+    results = {}
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        results["legacy (per-line log + print)"] = bench_legacy(match, args.alerts, tmp_dir / "legacy.log")
+        results["batched (queue, echo on)"] = bench_batched(match, args.alerts, tmp_dir / "batched.log", True)
+        results["daemon (queue, echo off)"] = bench_batched(match, args.alerts, tmp_dir / "daemon.log", False)
+
+    baseline = results["legacy (per-line log + print)"]
+    print(f"Per-alert emit cost over {args.alerts} alerts:")
+    for name, seconds in results.items():
+        per_alert_us = seconds / args.alerts * 1e6
+        print(f"  {name:<32} {per_alert_us:>9.1f} us/alert   {baseline / seconds:>5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Precompiled Render Templates per log_format
+=======================================================
+
+Renders one cycle of N alerts (generated matches, benchmarks/
+step5_generator.py, as the match views the alerts format) for the ou_3
+alert with alert_render.AlertRenderer.render_cycle():
+
+1. step6_style:   the default log block, the baseline of the table
+2. compact / jsonl / html: the other log_format choices, for reference
+
+Usage:
+    python3 benchmarks/bench_alert_render.py --alerts 1000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ALERT_SYSTEM_DIR = Path(__file__).parent.parent
+sys.path.append(str(ALERT_SYSTEM_DIR))
+
+from alert_render import FORMATS
+from alert_runner import AlertRunner, alert_config_path
+from match_view import build_match_views
+from step5_generator import generate_step5
+
+ou_3 = AlertRunner(alert_config_path("ou_3", ALERT_SYSTEM_DIR))
+
+FOUND = "05/28/2025 11:05:04 PM EDT"
+
+def best_ms(fn, repeat):
+    """Fastest of `repeat` calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompiled render templates, one cycle per log_format")
+    parser.add_argument("--alerts", type=int, default=1000, help="alerts in the rendered cycle")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (fastest is shown)")
+    args = parser.parse_args()
+
+    views = list(build_match_views(generate_step5(matches=args.alerts, history=1)["history"][-1]["matches"]))
+    numbered = list(enumerate(views, 1))
+    renderers = {log_format: ou_3.get_alert_renderer({"log_format": log_format}) for log_format in FORMATS}
+    timings = {log_format: best_ms(lambda: renderer.render_cycle(numbered, FOUND, len(views)), args.repeat)
+               for log_format, renderer in renderers.items()}
+    baseline = timings["step6_style"]
+    print(f"{len(numbered)} alerts in one cycle")
+    print(f"{'renderer':>14}{'ms':>10}{'alerts/s':>12}{'vs step6':>10}")
+    for log_format, ms in timings.items():
+        print(f"{log_format:>14}{ms:>10.2f}{len(numbered) / ms * 1000:>12.0f}{baseline / ms:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
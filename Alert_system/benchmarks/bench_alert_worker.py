@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Cold Subprocess per Fetch vs Warm Alert Worker
+==========================================================
+
+Feeds the same sequence of new fetches (benchmarks/step5_generator.py) to
+two copies of the alert system in a temporary directory, so both start
+from empty state and the real state files are never touched:
+
+1. cold:    python3 alert_manager.py --step5 <file> per fetch - interpreter
+            start, imports, loggers, config and dedup state every time
+2. warm:    one alert_worker.py process; per fetch a client round trip on
+            its Unix socket (alert_worker_client.send_fetch)
+
+Both paths are checked to fire the same number of alerts. Shown are the
+median and the slowest fetch-to-reply time in milliseconds.
+
+Usage:
+    python3 benchmarks/bench_alert_worker.py --fetches 20 --matches 1000
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ALERT_SYSTEM_DIR = Path(__file__).parent.parent
+sys.path.append(str(ALERT_SYSTEM_DIR))
+
+from alert_worker_client import AlertWorkerClient
+from step5_generator import add_generator_arguments, generate_step5, generator_params
+
+# State, logs and caches left by earlier runs stay behind
+COPY_IGNORE = shutil.ignore_patterns("__pycache__", ".pytest_cache", "benchmarks", "*.log", "*.db", "*.db-*",
+                                     "*.sock", "processed_matches.json*", "daily_alert_count.json", "outbox.jsonl")
+
+def copy_alert_system(target):
+    """Fresh copy of the alert system without state files"""
+    shutil.copytree(ALERT_SYSTEM_DIR, target, ignore=COPY_IGNORE)
+    return target
+
+def write_fetch(path, history, index):
+    """step5.json whose newest fetch is history[index] (previous fetch kept for catch-up), indented like the pipeline's"""
+    Path(path).write_text(json.dumps({"history": history[max(0, index - 1):index + 1]}, indent=2))
+
+def run_cold(alert_dir, history):
+    """Milliseconds per fetch for a fresh alert_manager.py process each time"""
+    step5 = alert_dir / "step5.json"
+    times = []
+    for index in range(len(history)):
+        write_fetch(step5, history, index)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(alert_dir / "alert_manager.py"), "--step5", str(step5)],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def fired_alerts(alert_dir):
+    """Alert blocks written to the copy's logs"""
+    return sum(log.read_text().count("Found:") for log in alert_dir.glob("*/*.log"))
+
+def start_worker(alert_dir, socket_path, step5):
+    """alert_worker.py subprocess, returned once it answers a ping"""
+    worker = subprocess.Popen([sys.executable, str(alert_dir / "alert_worker.py"), "--socket", str(socket_path),
+                               "--step5", str(step5)], stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with AlertWorkerClient(socket_path, timeout=5) as client:
+                client.ping()
+            return worker
+        except OSError:
+            if worker.poll() is not None:
+                raise SystemExit("alert worker exited during startup")
+            time.sleep(0.05)
+    worker.kill()
+    raise SystemExit("alert worker did not start listening")
+
+def run_warm(alert_dir, history):
+    """Milliseconds per fetch for a client round trip to a resident worker"""
+    step5 = alert_dir / "step5.json"
+    socket_path = alert_dir / "bench.sock"
+    write_fetch(step5, history, 0)
+    worker = start_worker(alert_dir, socket_path, step5)
+    times = []
+    try:
+        with AlertWorkerClient(socket_path) as client:
+            for index, entry in enumerate(history):
+                write_fetch(step5, history, index)
+                start = time.perf_counter()
+                reply = client.new_fetch(step5, entry["generated_at"])
+                times.append((time.perf_counter() - start) * 1000)
+                if not reply["ok"]:
+                    raise SystemExit(f"alert worker error: {reply['error']}")
+    finally:
+        worker.terminate()
+        worker.wait()
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold subprocess per fetch vs warm alert worker round trips")
+    parser.add_argument("--fetches", type=int, default=20, help="fetches fed to both paths")
+    add_generator_arguments(parser)
+    parser.set_defaults(matches=1000)
+    args = parser.parse_args()
+
+    params = {**generator_params(args), "history": args.fetches}
+    history = generate_step5(**params)["history"]
+    print(f"{args.fetches} fetches x {args.matches} matches")
+    print(f"{'path':>6}{'median ms':>12}{'max ms':>10}{'alerts':>9}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        rows = []
+        for name, runner in (("cold", run_cold), ("warm", run_warm)):
+            alert_dir = copy_alert_system(Path(work_dir) / name)
+            times = runner(alert_dir, history)
+            rows.append((name, times, fired_alerts(alert_dir)))
+        if rows[0][2] != rows[1][2]:
+            raise SystemExit(f"fired alerts differ: cold {rows[0][2]}, warm {rows[1][2]}")
+        for name, times, fired in rows:
+            print(f"{name:>6}{statistics.median(times):>12.1f}{max(times):>10.1f}{fired:>9}")
+        print(f"speedup {statistics.median(rows[0][1]) / statistics.median(rows[1][1]):.1f}x (median)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Dict Loop vs Columnar Rule Evaluation
+=================================================
+
+Evaluates the shipped ou_3 and ou_3_no_score rules, plus generated variants
+up to --rules alerts, over synthetic snapshots of 10k-100k matches:
+
+1. dict loop:  rule_engine.evaluate_rules() (one Python pass, per-line walk)
+2. columnar:   columnar.build_columns() + vectorized masks
+3. masks only: masks over prebuilt columns (the cost per extra rule)
+
+Both paths are checked to select the same matches before timings are shown.
+
+Usage:
+    python3 benchmarks/bench_columnar.py --sizes 10000 50000 100000 --rules 2 20
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ALERT_SYSTEM_DIR = Path(__file__).parent.parent
+sys.path.append(str(ALERT_SYSTEM_DIR))
+
+from columnar import HAVE_NUMPY, build_columns, evaluate_rules_columnar
+from rule_engine import compile_rule, evaluate_rules
+
+def synthetic_matches(count, seed=0):
+    """Matches shaped like step5 entries with random status, score and lines"""
+    rng = random.Random(seed)
+    matches = {}
+    for i in range(count):
+        match_id = f"m{i:07d}"
+        lines = sorted(rng.sample([1.5, 2.0, 2.25, 2.5, 2.75, 3.0, 3.25, 3.5, 4.0, 4.5], rng.randint(0, 4)))
+        matches[match_id] = {
+            "match_id": match_id,
+            "status_id": rng.choice([1, 2, 3, 4, 5, 7, 8]),
+            "home_score": rng.randint(0, 3),
+            "away_score": rng.randint(0, 3),
+            "full_time_result": {"home": f"{rng.randint(-300, 300):+d}", "draw": "+285", "away": "+363"},
+            "spread": {"home": "-108", "away": "-118", "handicap": -0.25},
+            "over_under": {
+                f"line_{n}": {"line": line, "over": f"{rng.randint(-150, 120):+d}", "under": "+100"}
+                for n, line in enumerate(lines, 1)
+            },
+        }
+    return matches
+
+def shipped_rules():
+    """Compiled rules for the alerts shipped in this repo"""
+    rules = []
+    for name in ("ou_3", "ou_3_no_score"):
+        config = json.loads((ALERT_SYSTEM_DIR / name / f"{name}.json").read_text())
+        rules.append(compile_rule(name, config))
+    return rules
+
+def variant_rules(count):
+    """Shipped rules padded with line / score / odds variants up to count"""
+    rules = shipped_rules()[:count]
+    for i in range(len(rules), count):
+        criteria = {"min_ou_line": 2.5 + 0.25 * (i % 7), "status_ids": [2, 3, 4][: 1 + i % 3]}
+        if i % 2:
+            criteria["score"] = {"max_total": 1 + i % 4}
+        if i % 3 == 0:
+            criteria["odds"] = [{"market": "full_time_result", "side": "home", "max": -100 + 10 * (i % 5)}]
+        if i % 4 == 0:
+            criteria.setdefault("odds", []).append({"market": "over_under", "side": "over", "max": -105})
+        rules.append(compile_rule(f"variant_{i}", {"criteria": criteria}))
+    return rules
+
+def best_of(func, repeat):
+    """Fastest of `repeat` runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def selected_ids(results):
+    """{rule name: [match_id, ...]} for comparing both paths"""
+    return {name: [m["match_id"] for m in result["candidates"]] for name, result in results.items()}
+
+def main(argv=None):
+    """Time both evaluation paths for each snapshot size"""
+    parser = argparse.ArgumentParser(description="Dict loop vs columnar rule evaluation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--rules", type=int, nargs="+", default=[2, 20], help="alert counts to time")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if not HAVE_NUMPY:
+        print("NumPy is not installed - columnar mode unavailable")
+        return
+
+    print(f"{'matches':>8} {'rules':>6} {'dict loop':>12} {'columnar':>12} {'masks only':>12} {'speedup':>8}")
+    for size in args.sizes:
+        matches = synthetic_matches(size)
+        for rule_count in args.rules:
+            rules = variant_rules(rule_count)
+            if selected_ids(evaluate_rules(rules, matches)) != selected_ids(evaluate_rules_columnar(rules, matches)):
+                raise SystemExit(f"columnar selection differs from dict loop at {size} matches")
+
+            columns = build_columns(matches)
+            evaluate_rules_columnar(rules, matches, columns=columns)  # parse lazy odds columns once
+            dict_seconds = best_of(lambda: evaluate_rules(rules, matches), args.repeat)
+            columnar_seconds = best_of(lambda: evaluate_rules_columnar(rules, matches), args.repeat)
+            masks_seconds = best_of(lambda: evaluate_rules_columnar(rules, matches, columns=columns), args.repeat)
+            print(f"{size:>8} {rule_count:>6} {dict_seconds * 1000:>9.1f} ms {columnar_seconds * 1000:>9.1f} ms "
+                  f"{masks_seconds * 1000:>9.1f} ms {dict_seconds / columnar_seconds:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
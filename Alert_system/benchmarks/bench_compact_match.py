@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Bytes per Match: Dicts vs Compact Matches
+=====================================================
+
+Keeps every fetch of a generated step5 history in memory, once as the
+decoded dicts (what json gives) and once as CompactMatch records
+(compact_match.py), and reports:
+
+1. bytes per match retained (tracemalloc) - dicts, MatchViews on top of
+   the dicts, and compact matches
+2. build time per match for views and compact matches
+3. rule evaluation time over one fetch for views vs compact matches (the
+   shipped ou_3 / ou_3_no_score rules), after checking both select the
+   same dedup keys
+
+Usage:
+    python3 benchmarks/bench_compact_match.py --matches 2000 --history 20
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ALERT_SYSTEM_DIR = Path(__file__).parent.parent
+sys.path.append(str(ALERT_SYSTEM_DIR))
+
+from compact_match import compact_matches
+from match_view import build_match_views
+from rule_engine import compile_rule, evaluate_rules
+from step5_generator import add_generator_arguments, generator_params, generate_step5
+
+def retained_bytes(build):
+    """Bytes still allocated once build() returned (its result kept alive)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        gc.collect()
+        current = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return current
+
+def best_ms(fn, repeat):
+    """Fastest of `repeat` calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def shipped_rules():
+    """Compiled rules for the alerts shipped in this repo"""
+    rules = []
+    for name in ("ou_3", "ou_3_no_score"):
+        config = json.loads((ALERT_SYSTEM_DIR / name / f"{name}.json").read_text())
+        rules.append(compile_rule(name, config))
+    return rules
+
+def candidate_keys(rules, views):
+    """{rule name: [dedup key, ...]} for one fetch"""
+    results = evaluate_rules(rules, None, views)
+    return {rule.name: [rule.match_key(view) for view in results[rule.name]["candidates"]] for rule in rules}
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per match of decoded dicts vs compact matches")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per timing (fastest is shown)")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    document = json.dumps(generate_step5(**generator_params(args)))
+    fetches = len(json.loads(document)["history"])
+    total = fetches * args.matches
+
+    def entries():
+        # Fresh decode per fetch, as the reader does - nothing shared between fetches
+        return (entry["matches"] for entry in json.loads(document)["history"])
+
+    dict_bytes = retained_bytes(lambda: list(entries()))
+    view_bytes = retained_bytes(lambda: [(matches, build_match_views(matches)) for matches in entries()])
+    compact_bytes = retained_bytes(lambda: [compact_matches(matches) for matches in entries()])
+
+    print(f"{fetches} fetches x {args.matches} matches = {total} matches kept in memory")
+    print(f"{'representation':<20}{'bytes/match':>14}{'vs dicts':>10}")
+    for name, retained in (("dicts", dict_bytes), ("dicts + views", view_bytes), ("compact", compact_bytes)):
+        print(f"{name:<20}{retained / total:>14.0f}{retained / dict_bytes:>10.2f}")
+
+    latest = json.loads(document)["history"][-1]["matches"]
+    views, compact = build_match_views(latest), compact_matches(latest)
+    rules = shipped_rules()
+    assert candidate_keys(rules, views) == candidate_keys(rules, compact), "compact matches select differently"
+
+    print(f"\n{'per fetch (ms)':<20}{'build':>10}{'rules':>10}")
+    print(f"{'views':<20}{best_ms(lambda: build_match_views(latest), args.repeat):>10.2f}"
+          f"{best_ms(lambda: evaluate_rules(rules, None, views), args.repeat):>10.2f}")
+    print(f"{'compact':<20}{best_ms(lambda: compact_matches(latest), args.repeat):>10.2f}"
+          f"{best_ms(lambda: evaluate_rules(rules, None, compact), args.repeat):>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Alert Dispatch Throughput
+=====================================
+
+Delivers N alerts to a local aiohttp stub endpoint through the dispatcher
+and reports alerts/sec for each batch size / concurrency combination,
+including the fsynced outbox writes.
+
+Usage:
+    python3 benchmarks/bench_dispatch.py --alerts 5000
+    python3 benchmarks/bench_dispatch.py --batch-sizes 1 20 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Shared alert helpers
+ALERT_SYSTEM_DIR = Path(__file__).parent.parent
+sys.path.append(str(ALERT_SYSTEM_DIR))
+
+from dispatcher import HAVE_AIOHTTP, AlertDispatcher, Outbox
+
+async def stub_endpoint():
+    """Local endpoint that accepts every batch -> (runner, url)"""
+    from aiohttp import web
+
+    async def accept(request):
+        await request.read()
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_post("/alerts", accept)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}/alerts"
+
+async def bench(num_alerts, batch_size, concurrency, work_dir):
+    """Enqueue + drain num_alerts -> seconds"""
+    runner, url = await stub_endpoint()
+    try:
+        outbox = Outbox(Path(work_dir) / f"outbox_{batch_size}_{concurrency}.jsonl").load()
+        matches = [{"match_id": f"m{i}", "home_team": "A", "away_team": "B"} for i in range(num_alerts)]
+        dispatcher = AlertDispatcher([{"name": "stub", "url": url}], outbox,
+                                     concurrency=concurrency, batch_size=batch_size)
+        async with dispatcher:
+            start = time.perf_counter()
+            summary = await dispatcher.dispatch({"ou_3": matches})
+            seconds = time.perf_counter() - start
+        assert summary["delivered"] == num_alerts, summary
+        return seconds
+    finally:
+        await runner.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert dispatch throughput against a local stub endpoint")
+    parser.add_argument("--alerts", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 20])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    if not HAVE_AIOHTTP:
+        sys.exit("aiohttp is not installed")
+
+    print(f"{'batch':>6}{'concurrency':>13}{'seconds':>10}{'alerts/sec':>13}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for batch_size in args.batch_sizes:
+            for concurrency in args.concurrency:
+                seconds = asyncio.run(bench(args.alerts, batch_size, concurrency, work_dir))
+                print(f"{batch_size:>6}{concurrency:>13}{seconds:>10.3f}{args.alerts / seconds:>13.0f}")
+
+if __name__ == "__main__":
+    main()
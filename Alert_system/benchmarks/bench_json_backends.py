@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark - step5 JSON Decoding per Backend
+===========================================
+
+Times every installed JSON backend (json_backend.py) on a step5.json -
+generated with benchmarks/step5_generator.py, or an existing file via
+--step5:
+
+1. tail entry:     decoding the newest history entry (what a cycle decodes)
+2. full document:  decoding the whole file (fallback / replay path)
+3. snapshot:       read_latest_snapshot() end to end with the backend selected
+
+Peak memory (tracemalloc) of the full-document decode is shown next to the
+timings. Every backend's output is checked against stdlib json first.
+
+Usage:
+    python3 benchmarks/bench_json_backends.py --matches 5000 --history 20
+    python3 benchmarks/bench_json_backends.py --step5 /path/to/step5.json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ALERT_SYSTEM_DIR = Path(__file__).parent.parent
+sys.path.append(str(ALERT_SYSTEM_DIR))
+
+import json_backend
+from step5_generator import add_generator_arguments, generator_params, write_step5
+from step5_reader import read_latest_snapshot
+
+def best_ms(fn, repeat):
+    """Fastest of `repeat` calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def peak_mb(fn):
+    """tracemalloc peak of one call, in MB"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+def bench(step5_path, repeat):
+    """Print one row per backend for the file at step5_path"""
+    document = step5_path.read_bytes()
+    expected = json.loads(document)
+    history = expected.get("history") or [expected]
+    tail = json.dumps(history[-1], ensure_ascii=False).encode()
+    expected_tail = json.loads(tail)
+
+    print(f"{step5_path.name}: {len(document) / 1e6:.1f} MB, {len(history)} fetches, "
+          f"{len(history[-1].get('matches', {}))} matches in the newest")
+    print(f"{'backend':<10}{'tail ms':>10}{'full ms':>10}{'snapshot ms':>13}{'full peak MB':>14}")
+    try:
+        for name in json_backend.available_backends():
+            loads = json_backend.backend_loads(name)
+            assert loads(document) == expected and loads(tail) == expected_tail, f"{name} decodes differently"
+            json_backend.set_backend(name)
+            tail_ms = best_ms(lambda: loads(tail), repeat)
+            full_ms = best_ms(lambda: loads(document), repeat)
+            snapshot_ms = best_ms(lambda: read_latest_snapshot(step5_path), repeat)
+            print(f"{name:<10}{tail_ms:>10.2f}{full_ms:>10.2f}{snapshot_ms:>13.2f}{peak_mb(lambda: loads(document)):>14.1f}")
+    finally:
+        json_backend.set_backend()
+
+def main():
+    parser = argparse.ArgumentParser(description="step5 decoding time and memory per JSON backend")
+    parser.add_argument("--step5", type=Path, default=None, help="existing step5.json (default: generate one)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (fastest is shown)")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    if args.step5 is not None:
+        bench(args.step5, args.repeat)
+        return
+    with tempfile.TemporaryDirectory() as work_dir:
+        step5_path = Path(work_dir) / "step5.json"
+        write_step5(step5_path, **generator_params(args))
+        bench(step5_path, args.repeat)
+
+if __name__ == "__main__":
+    main()
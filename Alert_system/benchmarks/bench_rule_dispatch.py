@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Every-Rule Loop vs Status / Line Indexed Dispatch
+=============================================================
+
+Evaluates 2 to 500 alert rules over one generated snapshot
+(benchmarks/step5_generator.py, default 5000 matches):
+
+1. every rule:  each match goes through every rule's status gate, then the
+                criteria of the rules it passes (the loop evaluate_rules()
+                used before the RuleIndex)
+2. indexed:     rule_engine.evaluate_rules() - each match only meets the
+                rules its status_id and O/U lines can satisfy
+
+Rules beyond the two shipped alerts are variants the way new alerts are
+written: a status ID (sometimes two), a min_ou_line and usually a narrow
+max_ou_line band, often a score or odds condition. Both paths are checked to
+give identical results before timings are shown. Per match, "met" is the
+average number of rules the index hands it to and "fired" the number it
+qualifies for - the work no dispatch can skip.
+
+Usage:
+    python3 benchmarks/bench_rule_dispatch.py --matches 5000 --rules 2 20 100 500
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ALERT_SYSTEM_DIR = Path(__file__).parent.parent
+sys.path.append(str(ALERT_SYSTEM_DIR))
+
+from match_view import build_match_views
+from rule_engine import FINISHED_STATUS_IDS, RuleIndex, compile_rule, evaluate_rules
+from step5_generator import add_generator_arguments, generate_step5, generator_params
+
+def evaluate_every_rule(rules, views):
+    """Reference loop: every rule's status gate on every match"""
+    results = {rule.name: {"candidates": [], "status_rejected": 0, "finished_match_ids": []} for rule in rules}
+    for view in views:
+        finished = view.status_id in FINISHED_STATUS_IDS
+        for rule in rules:
+            result = results[rule.name]
+            if not rule.status_matches(view):
+                result["status_rejected"] += 1
+                if finished:
+                    result["finished_match_ids"].append(view.match_id)
+                continue
+            if rule.criteria_match(view):
+                result["candidates"].append(view)
+    return results
+
+def shipped_rules():
+    """Compiled rules for the alerts shipped in this repo"""
+    return [compile_rule(name, json.loads((ALERT_SYSTEM_DIR / name / f"{name}.json").read_text()))
+            for name in ("ou_3", "ou_3_no_score")]
+
+def variant_rules(count, seed=0):
+    """Shipped rules padded with status / line band / score / odds variants up to count"""
+    rng = random.Random(seed)
+    rules = shipped_rules()[:count]
+    for i in range(len(rules), count):
+        min_line = rng.choice([2.5 + 0.25 * n for n in range(8)])
+        criteria = {"min_ou_line": min_line, "status_ids": rng.sample([1, 2, 3, 4, 5], 1 if rng.random() < 0.8 else 2)}
+        if rng.random() < 0.8:
+            criteria["max_ou_line"] = min_line + rng.choice([0, 0.25])
+        if rng.random() < 0.5:
+            criteria["score"] = {"home": rng.randint(0, 2), "away": rng.randint(0, 2)}
+        if rng.random() < 0.3:
+            criteria["odds"] = [{"market": "over_under", "side": "over", "max": rng.choice([-130, -110, -100])}]
+        rules.append(compile_rule(f"variant_{i}", {"criteria": criteria}))
+    return rules
+
+def best_ms(fn, repeat):
+    """Fastest of `repeat` calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def summary(results):
+    """Comparable form of evaluate results (candidate ids instead of views)"""
+    return {name: ([view.match_id for view in result["candidates"]], result["status_rejected"],
+                   result["finished_match_ids"]) for name, result in results.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Every-rule loop vs indexed rule dispatch")
+    parser.add_argument("--rules", type=int, nargs="+", default=[2, 20, 100, 500], help="rule counts to time")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (fastest is shown)")
+    add_generator_arguments(parser)
+    parser.set_defaults(matches=5000, history=1)
+    args = parser.parse_args()
+
+    matches = generate_step5(**generator_params(args))["history"][-1]["matches"]
+    views = build_match_views(matches)
+    print(f"{len(views)} matches")
+    print(f"{'rules':>6}{'every rule ms':>16}{'indexed ms':>14}{'speedup':>10}{'met':>8}{'fired':>8}")
+    for count in args.rules:
+        rules = variant_rules(count)
+        results = evaluate_rules(rules, matches, views)
+        if summary(evaluate_every_rule(rules, views)) != summary(results):
+            raise SystemExit(f"indexed dispatch differs from the every-rule loop at {count} rules")
+        fired = sum(len(result["candidates"]) for result in results.values()) / len(views)
+        index = RuleIndex(rules)
+        met = sum(len(index.rules_for(view)) for view in views) / len(views)
+        every_ms = best_ms(lambda: evaluate_every_rule(rules, views), args.repeat)
+        indexed_ms = best_ms(lambda: evaluate_rules(rules, matches, views), args.repeat)
+        print(f"{count:>6}{every_ms:>16.2f}{indexed_ms:>14.2f}{every_ms / indexed_ms:>9.1f}x{met:>8.1f}{fired:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Legacy step5.json vs Segmented Snapshot Store
+=========================================================
+
+Generates a step5.json history (benchmarks/step5_generator.py), converts it
+into a snapshot store (snapshot_store.py) and times the reads an alert
+cycle does, through step5_reader, on both:
+
+    latest      read_latest_snapshot() - the newest fetch
+    peek        peek_generated_at() - the same-fetch pre-check (legacy only
+                finds generated_at when it is inside the file's last 64 KB)
+    catch_up    read_history_since() of the previous fetch - one newer fetch
+    middle      read_fetch() of a fetch in the middle of the history
+    append      one more fetch: rewrite the whole document (legacy) vs
+                append one line + one index line (store, fsynced)
+
+Results are checked to be identical before timings are shown.
+
+Usage:
+    python3 benchmarks/bench_snapshot_store.py --matches 2000 --history 60
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ALERT_SYSTEM_DIR = Path(__file__).parent.parent
+sys.path.append(str(ALERT_SYSTEM_DIR))
+
+import step5_reader
+from snapshot_store import SnapshotStore, convert_step5
+from step5_generator import add_generator_arguments, generator_params, write_step5
+
+def best_ms(fn, repeat):
+    """Fastest of `repeat` calls, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="step5 reads: legacy history document vs snapshot store")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (fastest is shown)")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        legacy = Path(work_dir) / "step5.json"
+        step5_data = write_step5(legacy, **generator_params(args))
+        history = step5_data["history"]
+        store = Path(work_dir) / "store"
+        start = time.perf_counter()
+        convert_step5(legacy, store)
+        convert_seconds = time.perf_counter() - start
+
+        previous = history[-2]["generated_at"] if len(history) > 1 else None
+        middle = history[len(history) // 2]["generated_at"]
+        reads = {
+            "latest": lambda path: step5_reader.read_latest_snapshot(path),
+            "peek": lambda path: step5_reader.peek_generated_at(path),
+            "catch_up": lambda path: step5_reader.read_history_since(path, previous),
+            "middle": lambda path: step5_reader.read_fetch(path, middle),
+        }
+        for name, read in reads.items():
+            if name == "peek" and read(legacy) is None:
+                continue  # generated_at further back than the legacy tail window - the store always knows
+            assert read(legacy) == read(store), f"{name} differs between layouts"
+
+        store_size = sum(path.stat().st_size for path in store.iterdir())
+        print(f"{len(history)} fetches x {args.matches} matches: step5.json {legacy.stat().st_size / 1e6:.1f} MB, "
+              f"store {store_size / 1e6:.1f} MB (converted in {convert_seconds:.2f} s)")
+        print(f"{'read':<12}{'legacy ms':>12}{'store ms':>12}{'speedup':>10}")
+        for name, read in reads.items():
+            legacy_ms = best_ms(lambda: read(legacy), args.repeat)
+            store_ms = best_ms(lambda: read(store), args.repeat)
+            print(f"{name:<12}{legacy_ms:>12.2f}{store_ms:>12.2f}{legacy_ms / store_ms:>9.1f}x")
+
+        # The producer's side: add one fetch
+        new_fetch = dict(history[-1], generated_at="12/31/2099 11:59:00 PM EDT")
+        history.append(new_fetch)
+        legacy_ms = best_ms(lambda: legacy.write_text(json.dumps({"history": history}, indent=2)), 1)
+        store_ms = best_ms(lambda: SnapshotStore(store).append(new_fetch), 1)
+        print(f"{'append':<12}{legacy_ms:>12.2f}{store_ms:>12.2f}{legacy_ms / store_ms:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
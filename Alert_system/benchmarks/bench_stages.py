@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Per-Stage Cost of Each Alert Module
+===============================================
+
+Generates a synthetic step5.json (benchmarks/step5_generator.py) and times
+every stage of one alert cycle separately, for ou_3 and ou_3_no_score:
+
+    load          read_latest_snapshot() - newest history entry only
+    fresh_fetch   stat fingerprint + tail peek used to skip an unchanged file
+    views         build_match_views() over the snapshot
+    delta         match hashes + classification against the previous fetch
+    filter        compiled rule evaluation (status gate + criteria)
+    keys          dedup key per candidate (Rule.match_key)
+    format        step6_style render_cycle() over the candidates
+    persist       state store add/evict/hashes/daily count + one fsynced flush
+
+Each stage is run --repeat times on the same input; min and median are
+kept. All alert state is written under a temporary directory.
+
+Results go to a JSON file (--output) together with the git commit and the
+generator parameters. --compare OLD.json prints the per-stage ratio of the
+min timings (the least noisy figure) against an earlier run and exits
+non-zero when a stage got slower than --threshold.
+
+Usage:
+    python3 benchmarks/bench_stages.py --matches 5000 --history 20
+    python3 benchmarks/bench_stages.py --output before.json
+    python3 benchmarks/bench_stages.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Shared alert helpers and the alert runner
+ALERT_SYSTEM_DIR = Path(__file__).parent.parent
+sys.path.append(str(ALERT_SYSTEM_DIR))
+
+from alert_runner import DEFAULT_DEDUP_TTL_HOURS, AlertRunner, alert_config_path
+from dedup_store import open_dedup_store
+from delta_engine import compute_delta, hash_matches
+from match_view import build_match_views
+from rule_engine import evaluate_rules
+from step5_generator import add_generator_arguments, generator_params, write_step5
+from step5_reader import peek_generated_at, read_latest_snapshot, stat_fingerprint
+
+ALERTS = ("ou_3", "ou_3_no_score")
+STAGES = ["load", "fresh_fetch", "views", "delta", "filter", "keys", "format", "persist"]
+
+def git_commit():
+    """Current commit hash (with -dirty for local changes), None outside a checkout"""
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty", "--abbrev=12"],
+            cwd=ALERT_SYSTEM_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def time_stage(run, repeat, setup=None):
+    """Run a stage `repeat` times (setup untimed) -> {"min_ms", "median_ms"}"""
+    samples = []
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        run(state)
+        samples.append(time.perf_counter() - start)
+    return {"min_ms": min(samples) * 1000, "median_ms": statistics.median(samples) * 1000}
+
+def isolated_runner(name, state_dir):
+    """The alert's runner with its state files in state_dir (nothing is written to the repo)"""
+    state_dir.mkdir(parents=True, exist_ok=True)
+    runner = AlertRunner(alert_config_path(name, ALERT_SYSTEM_DIR))
+    runner.dedup_store_file = state_dir / "processed_matches.jsonl"
+    runner.processed_matches_file = state_dir / "processed_matches.json"
+    runner.daily_counter_file = state_dir / "daily_alert_count.json"
+    runner.log_file = state_dir / f"{name}.log"
+    return runner
+
+def bench_alert(name, step5_path, previous_entry, repeat, state_dir):
+    """Time every stage of one alert -> ({stage: timings}, counts)"""
+    runner = isolated_runner(name, state_dir)
+    rule = runner.get_alert_rule(runner.load_config())
+    results = {}
+
+    results["load"] = time_stage(lambda _: read_latest_snapshot(step5_path), repeat)
+    matches, generated_at = read_latest_snapshot(step5_path)
+    previous_time = previous_entry["generated_at"] if previous_entry else ""
+
+    def fresh_fetch(_):
+        stat_fingerprint(step5_path)
+        return peek_generated_at(step5_path) == previous_time
+    results["fresh_fetch"] = time_stage(fresh_fetch, repeat)
+
+    results["views"] = time_stage(lambda _: build_match_views(matches), repeat)
+    views = build_match_views(matches)
+
+    previous_hashes = hash_matches(previous_entry["matches"]) if previous_entry else {}
+    results["delta"] = time_stage(lambda _: compute_delta(matches, previous_hashes), repeat)
+    delta = compute_delta(matches, previous_hashes)
+
+    results["filter"] = time_stage(lambda _: evaluate_rules([rule], matches, views), repeat)
+    evaluation = evaluate_rules([rule], matches, views)[rule.name]
+    candidates = evaluation["candidates"]
+
+    def fresh_candidates():
+        for view in candidates:
+            view.signatures.clear()  # keys are cached per view - time the first build
+        return candidates
+    results["keys"] = time_stage(lambda views: [rule.match_key(view) for view in views], repeat, fresh_candidates)
+    keys = [(rule.match_key(view), view.match_id) for view in candidates]
+
+    cycle_time = runner.get_eastern_time()
+    renderer = runner.get_alert_renderer({})
+    numbered = list(enumerate(candidates, 1))
+    results["format"] = time_stage(lambda _: renderer.render_cycle(numbered, cycle_time, len(matches)), repeat)
+
+    def steady_state_store():
+        # Store as the previous cycle left it: its hashes and fetch time on disk
+        runner.dedup_store_file.unlink(missing_ok=True)
+        store = open_dedup_store(runner.dedup_store_file)
+        store.set_match_hashes(previous_hashes)
+        runner.save_processed_matches(store, previous_time)
+        return store
+    def persist(store):
+        for key, match_id in keys:
+            store.add(key, match_id)
+        store.evict(evaluation["finished_match_ids"], DEFAULT_DEDUP_TTL_HOURS * 3600)
+        store.set_match_hashes(delta["hashes"])
+        if keys:
+            runner.save_daily_count(store, len(keys), "2025-05-28")
+        runner.save_processed_matches(store, generated_at)
+    results["persist"] = time_stage(persist, repeat, steady_state_store)
+
+    counts = {
+        "matches": len(matches),
+        "changed": len(delta["new"]) + len(delta["changed"]),
+        "candidates": len(candidates),
+    }
+    return results, counts
+
+def run_benchmark(params, alerts, repeat, work_dir):
+    """Generate the step5 file and bench each alert -> result document"""
+    step5_path = Path(work_dir) / "step5.json"
+    step5_data = write_step5(step5_path, **params)
+    history = step5_data["history"]
+    previous_entry = history[-2] if len(history) > 1 else None
+    del step5_data
+
+    document = {
+        "meta": {
+            "commit": git_commit(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "params": params,
+            "step5_bytes": step5_path.stat().st_size,
+        },
+        "alerts": {},
+    }
+    for name in alerts:
+        stages, counts = bench_alert(name, step5_path, previous_entry, repeat, Path(work_dir) / name)
+        document["alerts"][name] = {"counts": counts, "stages": stages}
+    return document
+
+def print_results(document):
+    """Per-alert stage table"""
+    meta = document["meta"]
+    print(f"commit {meta['commit']}  python {meta['python']}  step5 {meta['step5_bytes'] / 1e6:.1f} MB  "
+          f"repeat {meta['repeat']}  params {meta['params']}")
+    for name, result in document["alerts"].items():
+        counts = result["counts"]
+        print(f"\n{name} ({counts['matches']} matches, {counts['changed']} new/changed, "
+              f"{counts['candidates']} candidates)")
+        print(f"{'stage':<14}{'min ms':>12}{'median ms':>12}")
+        for stage in STAGES:
+            timing = result["stages"][stage]
+            print(f"{stage:<14}{timing['min_ms']:>12.3f}{timing['median_ms']:>12.3f}")
+
+def compare_results(document, baseline, threshold):
+    """Print min-time ratios against a previous result file; returns the regressed (alert, stage) pairs"""
+    if baseline["meta"].get("params") != document["meta"]["params"]:
+        print("\nWARNING: generator parameters differ from the baseline - ratios are not comparable")
+    print(f"\nvs {baseline['meta'].get('commit')} (min-time ratio, > {threshold:.2f} = regression)")
+    regressions = []
+    for name, result in document["alerts"].items():
+        old_stages = baseline.get("alerts", {}).get(name, {}).get("stages", {})
+        for stage in STAGES:
+            if stage not in old_stages:
+                continue
+            old, new = old_stages[stage]["min_ms"], result["stages"][stage]["min_ms"]
+            ratio = new / old if old > 0 else float("inf")
+            flag = "  REGRESSION" if ratio > threshold else ""
+            print(f"{name:<16}{stage:<14}{old:>10.3f} -> {new:>10.3f} ms  x{ratio:.2f}{flag}")
+            if flag:
+                regressions.append((name, stage))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each stage of the alerts on a synthetic step5.json")
+    add_generator_arguments(parser)
+    parser.add_argument("--alerts", nargs="+", choices=ALERTS, default=list(ALERTS))
+    parser.add_argument("--repeat", type=int, default=5, help="runs per stage")
+    parser.add_argument("--output", type=Path, default=None, help="write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, default=None, help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="min-time ratio that counts as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        document = run_benchmark(generator_params(args), args.alerts, args.repeat, work_dir)
+
+    print_results(document)
+    if args.output is not None:
+        args.output.write_text(json.dumps(document, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.compare is not None:
+        regressions = compare_results(document, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Synthetic step5.json Generator
+==============================
+
+Builds step5.json documents shaped like the real pipeline output, for
+benchmarks that need a file of a given size and mix:
+
+    matches        matches per fetch
+    history        history entries (fetches) in the file, oldest first
+    lines          O/U lines per match
+    live_share     share of matches in a live status (2, 3, 4); the rest are
+                   not started / finished
+    change_share   share of matches whose odds move between two fetches
+                   (drives the delta engine's new / changed / unchanged split)
+
+Output is deterministic for a given seed. Fetches are one minute apart.
+
+Usage:
+    python3 benchmarks/step5_generator.py out.json --matches 5000 --history 20
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+LIVE_STATUS_IDS = (2, 3, 4)
+OTHER_STATUS_IDS = (1, 5, 7, 8)
+FIRST_FETCH = datetime(2025, 5, 28, 20, 0, 0)
+
+def line_pool(lines):
+    """Quarter-goal O/U values around the usual 2.5 - 3.5 range, at least `lines` of them"""
+    return [1.5 + 0.25 * n for n in range(max(lines, 12))]
+
+def synthetic_match(rng, index, lines, live_share):
+    """One match with a random status, score and `lines` O/U lines"""
+    match_id = f"m{index:07d}"
+    live = rng.random() < live_share
+    status_id = rng.choice(LIVE_STATUS_IDS if live else OTHER_STATUS_IDS)
+    if status_id == 3 and rng.random() < 0.5:
+        home_score = away_score = 0  # scoreless at half-time
+    else:
+        home_score, away_score = rng.randint(0, 3), rng.randint(0, 3)
+
+    values = sorted(rng.sample(line_pool(lines), lines))
+    return {
+        "match_id": match_id,
+        "competition_id": f"c{index % 97:04d}",
+        "competition": f"League {index % 97}",
+        "country": "Synthetic",
+        "home_team": f"Home {index}",
+        "away_team": f"Away {index}",
+        "score": f"{home_score} - {away_score}",
+        "status_id": status_id,
+        "home_score": home_score,
+        "away_score": away_score,
+        "full_time_result": {"home": f"{rng.randint(-300, 300):+d}", "draw": "+285", "away": "+363", "time": "1"},
+        "spread": {"home": "-108", "away": "-118", "handicap": -0.25, "time": "1"},
+        "over_under": {
+            f"line_{n}": {"line": value, "over": f"{rng.randint(-150, 120):+d}", "under": "+100", "time": "1"}
+            for n, value in enumerate(values, 1)
+        },
+        "environment": {"weather_description": "Clear"},
+    }
+
+def move_odds(rng, match, minute):
+    """Copy of a match with new O/U prices (shares every untouched sub-dict)"""
+    moved = dict(match)
+    moved["over_under"] = {
+        key: {**line, "over": f"{rng.randint(-150, 120):+d}", "time": str(minute)}
+        for key, line in match["over_under"].items()
+    }
+    return moved
+
+def generate_step5(matches=1000, history=10, lines=3, live_share=0.5, change_share=0.2, seed=0):
+    """A {"history": [...]} step5 document, newest fetch last"""
+    rng = random.Random(seed)
+    current = {}
+    for index in range(matches):
+        match = synthetic_match(rng, index, lines, live_share)
+        current[match["match_id"]] = match
+
+    entries = []
+    for fetch in range(history):
+        if fetch:
+            for key in rng.sample(list(current), int(len(current) * change_share)):
+                current[key] = move_odds(rng, current[key], fetch + 1)
+        generated_at = (FIRST_FETCH + timedelta(minutes=fetch)).strftime("%m/%d/%Y %I:%M:%S %p") + " EDT"
+        entries.append({"generated_at": generated_at, "matches": dict(current)})
+    return {"history": entries}
+
+def write_step5(path, **params):
+    """Generate a step5 document and write it to path; returns the document"""
+    step5_data = generate_step5(**params)
+    Path(path).write_text(json.dumps(step5_data, indent=2))
+    return step5_data
+
+def add_generator_arguments(parser):
+    """--matches / --history / --lines / --live-share / --change-share / --seed"""
+    parser.add_argument("--matches", type=int, default=1000, help="matches per fetch")
+    parser.add_argument("--history", type=int, default=10, help="history entries in the file")
+    parser.add_argument("--lines", type=int, default=3, help="O/U lines per match")
+    parser.add_argument("--live-share", type=float, default=0.5, help="share of live matches (0-1)")
+    parser.add_argument("--change-share", type=float, default=0.2, help="share of matches changing per fetch (0-1)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+
+def generator_params(args):
+    """generate_step5() keyword arguments from parsed arguments"""
+    return {
+        "matches": args.matches, "history": args.history, "lines": args.lines,
+        "live_share": args.live_share, "change_share": args.change_share, "seed": args.seed,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic step5.json")
+    parser.add_argument("output", type=Path, help="file to write")
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+
+    step5_data = write_step5(args.output, **generator_params(args))
+    entries = step5_data["history"]
+    print(f"Wrote {args.output}: {len(entries)} fetches x {args.matches} matches "
+          f"({args.output.stat().st_size / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
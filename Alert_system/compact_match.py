@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Compact Match - __slots__ Match Records for In-Memory History
+=============================================================
+
+A decoded step5 match is a dict of dicts: ~15 keys, odds sub-dicts per
+market and per O/U line, the environment, and team / competition / country
+strings that every fetch decodes again as fresh copies. Anything that keeps
+more than one snapshot in memory (history, deltas, line tracking) multiplies
+that.
+
+CompactMatch holds the same data in __slots__ records:
+
+    layout      the key order of a record, shared by every record with the
+                same keys (one tuple + index for all matches, not one per match)
+    strings     interned (sys.intern) - "Premier League" is one object however
+                many fetches mention it
+    odds        American odds strings ("-110", "+285") stored as ints and
+                turned back into the identical string when read; anything that
+                would not round-trip exactly is kept as it is
+    floats      O/U line and handicap values shared through a small cache
+    lists       stored as tuples (environment_summary)
+
+It is a drop-in MatchView: status_id / home_score / away_score / lines /
+max_line / signatures / scores_valid / match, plus get() / [] / `in` like
+the match dict. The rule engine, dedup keys and the alert renderer accept it
+unchanged and give identical results; to_dict() rebuilds the original
+match dict.
+
+Bytes per match before / after: benchmarks/bench_compact_match.py
+"""
+
+import sys
+from collections.abc import Mapping
+
+from match_view import coerce_score, coerce_status, is_line_value
+
+# Float values shared between records (O/U lines, handicaps) - bounded
+FLOAT_CACHE_SIZE = 65536
+
+# Only strings starting with a sign can be packed odds
+ODDS_SIGNS = ("+", "-")
+
+_layouts = {}
+_floats = {}
+
+class Layout:
+    """Key order of a record plus key -> position, shared by identical records"""
+
+    __slots__ = ("keys", "index")
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.index = {key: position for position, key in enumerate(keys)}
+
+def layout_for(keys):
+    """The shared Layout for a key tuple"""
+    layout = _layouts.get(keys)
+    if layout is None:
+        layout = _layouts[keys] = Layout(tuple(sys.intern(key) for key in keys))
+    return layout
+
+def pack_odds(value):
+    """int for an odds string that round-trips exactly ("-110" -> -110), None otherwise"""
+    if len(value) < 2 or value[0] not in "+-" or not value[1:].isdigit() or not value.isascii():
+        return None
+    number = int(value)
+    return number if f"{number:+d}" == value else None
+
+def _pack_float(value):
+    """Shared float object for a value (0.0 / -0.0 are left alone)"""
+    if not value:
+        return value
+    shared = _floats.get(value)
+    if shared is None:
+        if len(_floats) >= FLOAT_CACHE_SIZE:
+            return value
+        shared = _floats[value] = value
+    return shared
+
+def _pack_value(value):
+    """Packed form of a value without odds packing (list items, non-string fields)"""
+    kind = type(value)
+    if kind is str:
+        return sys.intern(value)
+    if kind is dict:
+        return CompactRecord(value)
+    if kind is list:
+        return tuple([_pack_value(item) for item in value])
+    if kind is float:
+        return _pack_float(value)
+    return value
+
+def _unpack_plain(value):
+    """Original JSON value of a packed value (records / tuples back to dicts / lists)"""
+    if isinstance(value, CompactRecord):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_unpack_plain(item) for item in value]
+    return value
+
+class CompactRecord(Mapping):
+    """One step5 object (match, odds market, O/U line, environment) in slots"""
+
+    __slots__ = ("_layout", "_values", "_odds")
+
+    def __init__(self, data):
+        self._layout = layout_for(tuple(data))
+        values = []
+        odds = 0
+        for position, value in enumerate(data.values()):
+            if type(value) is str and value[:1] in ODDS_SIGNS:
+                number = pack_odds(value)
+                if number is not None:
+                    odds |= 1 << position
+                    values.append(number)
+                    continue
+            values.append(_pack_value(value))
+        self._values = tuple(values)
+        self._odds = odds
+
+    def _read(self, position):
+        value = self._values[position]
+        if self._odds >> position & 1:
+            return f"{value:+d}"
+        return value
+
+    def get(self, key, default=None):
+        """Field value like dict.get (odds strings come back as strings)"""
+        position = self._layout.index.get(key)
+        return default if position is None else self._read(position)
+
+    def __getitem__(self, key):
+        position = self._layout.index.get(key)
+        if position is None:
+            raise KeyError(key)
+        return self._read(position)
+
+    def __contains__(self, key):
+        return key in self._layout.index
+
+    def __iter__(self):
+        return iter(self._layout.keys)
+
+    def __len__(self):
+        return len(self._values)
+
+    def to_dict(self):
+        """The original JSON object"""
+        return {key: _unpack_plain(self._read(position)) for position, key in enumerate(self._layout.keys)}
+
+class CompactMatch(CompactRecord):
+    """Compact step5 match that is also a MatchView (rules, keys and formatting accept it)"""
+
+    __slots__ = ("match_id", "status_id", "home_score", "away_score", "max_line", "_lines", "_signatures")
+
+    def __init__(self, match):
+        super().__init__(match)
+        self.match_id = self.get("match_id")
+        self.status_id = coerce_status(match.get("status_id"))
+        try:
+            self.home_score = coerce_score(match.get("home_score", 0))
+            self.away_score = coerce_score(match.get("away_score", 0))
+        except (ValueError, TypeError):
+            self.home_score = self.away_score = None
+
+        lines = []
+        over_under = self.get("over_under")
+        if type(over_under) is CompactRecord:
+            for line_data in over_under._values:
+                if type(line_data) is CompactRecord and is_line_value(line_data.get("line")):
+                    lines.append((line_data.get("line"), line_data))
+        lines.sort(key=lambda line: line[0])
+        self._lines = tuple([line_data for _, line_data in lines])
+        self.max_line = lines[-1][0] if lines else None
+        self._signatures = None
+
+    @property
+    def match(self):
+        """The match itself reads like the raw dict"""
+        return self
+
+    @property
+    def lines(self):
+        """[(line_value, line_data), ...] sorted by value, like MatchView.lines"""
+        return [(line_data.get("line"), line_data) for line_data in self._lines]
+
+    @property
+    def signatures(self):
+        """Per-rule key signatures, allocated on first use"""
+        if self._signatures is None:
+            self._signatures = {}
+        return self._signatures
+
+    @property
+    def scores_valid(self):
+        """False when the feed's home/away score could not be read as numbers"""
+        return self.home_score is not None
+
+def compact_matches(matches):
+    """One CompactMatch per match of a snapshot's matches dict, in snapshot order"""
+    return [CompactMatch(match_data) for match_data in matches.values()]
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Dedup Store - Append-Only Keyed Log With TTL Eviction
+=====================================================
+
+Replaces the processed_matches.json list that was rewritten in full on every
+cycle and never shrank. The store is the alert's whole persistent state:
+dedup keys, last fetch time / stat, delta hashes and the daily alert
+counter all live in this one file.
+
+FILE FORMAT (one JSON record per line):
+    {"k": "<match key>", "m": "<match id>", "t": <epoch seconds>}   key alerted
+    {"d": "<match key>"}                                             key evicted
+    {"meta": {"last_fetch_time": ..., "last_fetch_stat": ...,       fetch state and
+              "daily_count": {"date": ..., "count": ...}}}         daily counter
+    {"h": {"<match key>": "<hash>", ...}, "x": ["<match key>", ...]} match hashes
+                                                                     set / removed
+
+Loading replays the log into a dict, so lookups and inserts are O(1).
+Inserts and meta changes are appended in a single fsynced write per cycle;
+nothing is written when nothing changed. Keys are evicted once their match
+is finished or older than the alert's TTL, and the log is compacted (temp
+file + fsync + rename) once it is more than twice the size of a full
+rewrite. Size, not record count, is what matters: one hash record covers a
+whole fetch, so a few dozen records of superseded hashes can dwarf the live
+state. A crash can
+only tear the last appended line, which is ignored on load - earlier state
+is never truncated.
+
+bytes_written counts what flushes actually wrote; full_size() is what one
+full rewrite of the state would take, so the saving can be reported.
+
+Match content hashes for the delta engine (delta_engine.py) are logged the
+same way: only hashes that changed since the last fetch are appended.
+
+The legacy processed_matches.json and daily_alert_count.json are migrated
+the first time the store is opened. Legacy keys are "<match id>_<O/U
+line><key_suffix>"; match IDs may contain "_", so the ID is what is left
+after the alert's key_suffix and the line are taken off the right. A store created with path=None lives in
+memory only (replays).
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+# Never compact logs smaller than this - rewriting tiny files buys nothing
+COMPACT_MIN_BYTES = 64 * 1024
+
+class DedupStore:
+    """Set-like store of alerted match keys backed by an append-only log"""
+
+    def __init__(self, path):
+        self.path = Path(path) if path is not None else None
+        self.entries = {}  # match key -> (match_id, first_seen_epoch)
+        self.meta = {}
+        self.match_hashes = {}  # match key -> content hash of the last processed fetch
+        self._pending = []
+        self._log_bytes = 0
+        self._compact_at = COMPACT_MIN_BYTES  # log size at which live size is checked again
+        self._torn_tail = False
+        self.bytes_written = 0  # bytes appended / rewritten by this instance
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def load(self):
+        """Replay the log from disk (missing file = empty store)"""
+        self.entries.clear()
+        self.meta = {}
+        self.match_hashes = {}
+        self._log_bytes = 0
+        self._compact_at = COMPACT_MIN_BYTES
+        self._torn_tail = False
+        if self.path is None:
+            return self
+        try:
+            with open(self.path, 'r') as f:
+                self._log_bytes = os.fstat(f.fileno()).st_size
+                for line in f:
+                    self._torn_tail = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn write from a crash
+                    if "k" in record:
+                        self.entries[record["k"]] = (record.get("m"), record.get("t", 0))
+                    elif "d" in record:
+                        self.entries.pop(record["d"], None)
+                    elif "meta" in record:
+                        self.meta.update(record["meta"])
+                    elif "h" in record:
+                        self.match_hashes.update(record["h"])
+                        for key in record.get("x", []):
+                            self.match_hashes.pop(key, None)
+        except FileNotFoundError:
+            pass
+        return self
+
+    def add(self, key, match_id, now=None):
+        """Record an alerted match key and the match it belongs to (no-op if already present)"""
+        if key in self.entries:
+            return
+        first_seen = time.time() if now is None else now
+        self.entries[key] = (match_id, first_seen)
+        self._pending.append({"k": key, "m": match_id, "t": first_seen})
+
+    def discard(self, key):
+        """Forget a match key"""
+        if self.entries.pop(key, None) is not None:
+            self._pending.append({"d": key})
+
+    def evict(self, finished_match_ids=(), ttl_seconds=None, now=None):
+        """Drop keys for finished matches or older than ttl_seconds; returns count"""
+        finished_match_ids = set(finished_match_ids)
+        cutoff = None
+        if ttl_seconds is not None:
+            cutoff = (time.time() if now is None else now) - ttl_seconds
+
+        expired = [
+            key for key, (match_id, first_seen) in self.entries.items()
+            if match_id in finished_match_ids or (cutoff is not None and first_seen < cutoff)
+        ]
+        for key in expired:
+            self.discard(key)
+        return len(expired)
+
+    def set_meta(self, **values):
+        """Update fetch state; only changed values are written"""
+        changed = {name: value for name, value in values.items() if self.meta.get(name) != value}
+        if changed:
+            self.meta.update(changed)
+            self._pending.append({"meta": changed})
+
+    def set_match_hashes(self, hashes):
+        """Replace the per-match hashes; only set / removed hashes are written"""
+        changed = {key: digest for key, digest in hashes.items() if self.match_hashes.get(key) != digest}
+        removed = [key for key in self.match_hashes if key not in hashes]
+        if changed or removed:
+            self.match_hashes = dict(hashes)
+            record = {"h": changed}
+            if removed:
+                record["x"] = removed
+            self._pending.append(record)
+
+    @property
+    def dirty(self):
+        """True if there are changes not yet on disk"""
+        return bool(self._pending)
+
+    def flush(self):
+        """Append pending records in one write, compacting when the log is mostly stale bytes"""
+        if not self._pending:
+            return
+        if self.path is None:
+            self._pending.clear()
+            return
+        payload = "".join(json.dumps(record) + "\n" for record in self._pending)
+        if self._torn_tail:
+            # Terminate a crash-torn line so the new records parse cleanly
+            payload = "\n" + payload
+        payload_bytes = len(payload.encode("utf-8"))
+        if self._log_bytes + payload_bytes > self._compact_at:
+            # Sizing the live state costs a full serialisation, so it is
+            # only redone once the log has grown past the last check
+            live_bytes = self.full_size()
+            if self._log_bytes + payload_bytes > 2 * live_bytes:
+                self.compact()
+                return
+            self._compact_at = max(COMPACT_MIN_BYTES, 2 * live_bytes)
+        self._torn_tail = False
+        with open(self.path, 'a') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self.bytes_written += payload_bytes
+        self._log_bytes += payload_bytes
+        self._pending.clear()
+
+    def _snapshot_records(self):
+        """Live state as the records a compacted log holds"""
+        records = [{"meta": self.meta}] if self.meta else []
+        if self.match_hashes:
+            records.append({"h": self.match_hashes})
+        records.extend(
+            {"k": key, "m": match_id, "t": first_seen}
+            for key, (match_id, first_seen) in self.entries.items()
+        )
+        return records
+
+    def full_size(self):
+        """Bytes one full rewrite of the current state would write"""
+        return sum(len(json.dumps(record).encode("utf-8")) + 1 for record in self._snapshot_records())
+
+    def compact(self):
+        """Rewrite the log with only live keys and current meta (temp + fsync + rename)"""
+        records = self._snapshot_records()
+        payload = "".join(json.dumps(record) + "\n" for record in records)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._log_bytes = len(payload.encode("utf-8"))
+        self.bytes_written += self._log_bytes
+        self._compact_at = max(COMPACT_MIN_BYTES, 2 * self._log_bytes)
+        self._torn_tail = False
+        self._pending.clear()
+
+def legacy_match_id(key, key_suffix=""):
+    """Match ID of a legacy "<match id>_<O/U line><key_suffix>" dedup key"""
+    if key_suffix and key.endswith(key_suffix):
+        key = key[:-len(key_suffix)]
+    return key.rsplit("_", 1)[0]
+
+def migrate_legacy_json(store, legacy_json_path, key_suffix=""):
+    """Import a legacy processed_matches.json into an empty store"""
+    try:
+        with open(legacy_json_path, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+
+    now = time.time()
+    for key in data.get("processed_matches", []):
+        store.add(key, legacy_match_id(key, key_suffix), now=now)
+    store.set_meta(
+        last_fetch_time=data.get("last_fetch_time", ""),
+        last_fetch_stat=data.get("last_fetch_stat"),
+    )
+    store.compact()
+    return True
+
+def migrate_legacy_daily_count(store, legacy_json_path):
+    """Import a legacy daily_alert_count.json into a store that has no daily count yet"""
+    if "daily_count" in store.meta:
+        return False
+    try:
+        with open(legacy_json_path, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    store.set_meta(daily_count={"date": data.get("date"), "count": data.get("count", 0)})
+    store.flush()
+    return True
+
+def open_dedup_store(path, legacy_json_path=None, legacy_daily_count_path=None, key_suffix=""):
+    """Load the store at path, migrating the legacy JSON state files on first use (key_suffix: the alert's)"""
+    store = DedupStore(path)
+    if (store.path.exists() or legacy_json_path is None
+            or not migrate_legacy_json(store, legacy_json_path, key_suffix)):
+        store.load()
+    if legacy_daily_count_path is not None:
+        migrate_legacy_daily_count(store, legacy_daily_count_path)
+    return store
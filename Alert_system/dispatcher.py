@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Alert Dispatcher - Async Webhook / Chat Delivery With a Persistent Outbox
+=========================================================================
+
+Pushes fired alerts to HTTP endpoints (chat webhooks, downstream services)
+without slowing the scan. The alert cycle only hands over the match dicts
+it returned; delivery runs on an asyncio loop:
+
+1. Every alert is written to the outbox (outbox.jsonl, one fsynced append per
+   cycle) before any delivery is attempted
+2. Pending alerts are grouped per endpoint into batches of batch_size and
+   POSTed as {"alerts": [...]} through ONE aiohttp ClientSession - pooled,
+   keep-alive connections, at most `concurrency` requests in flight
+3. Connection errors, timeouts, 429 and 5xx are retried with exponential
+   backoff (backoff_seconds * 2^n, max_attempts tries); a batch that still
+   fails stays pending for the next drain. Other 4xx are permanent and the
+   batch is marked dead
+4. Delivered batches are acknowledged in the outbox
+
+OUTBOX (one JSON record per line, same log pattern as dedup_store.py):
+    {"id": <n>, "e": "<endpoint>", "p": {alert payload}, "t": <epoch>}   queued
+    {"ack": [<id>, ...]}                                                 delivered
+    {"dead": [<id>, ...], "error": "..."}                                given up
+    {"next_id": <n>}                                                     id high-water mark
+
+Anything queued but neither delivered nor dead is re-sent after a crash or
+restart, so delivery is at-least-once; every alert carries its outbox "id"
+for receivers that need to dedup. The log is compacted (temp file + fsync +
+rename) once finished records outnumber pending ones. Compaction writes the
+next_id record first, so ids never restart - not after compaction, and not
+after a restart that finds nothing pending.
+
+CONFIG (Alert_system/dispatch.json, disabled by default):
+    {"enabled": true, "outbox": "outbox.jsonl", "concurrency": 8,
+     "batch_size": 20, "max_attempts": 5, "backoff_seconds": 0.5,
+     "timeout_seconds": 10,
+     "endpoints": [{"name": "chat", "url": "https://...", "headers": {}}]}
+
+aiohttp is optional: HAVE_AIOHTTP is False when it is not installed and the
+runners skip delivery (alerts are still logged as before).
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    import aiohttp
+    HAVE_AIOHTTP = True
+except ImportError:  # pragma: no cover - depends on the environment
+    aiohttp = None
+    HAVE_AIOHTTP = False
+
+BASE_DIR = Path(__file__).parent
+DISPATCH_CONFIG = BASE_DIR / "dispatch.json"
+
+DEFAULT_SETTINGS = {
+    "enabled": False,
+    "outbox": "outbox.jsonl",
+    "concurrency": 8,
+    "batch_size": 20,
+    "max_attempts": 5,
+    "backoff_seconds": 0.5,
+    "timeout_seconds": 10,
+    "endpoints": [],
+}
+
+# Never compact outboxes shorter than this
+COMPACT_MIN_RECORDS = 1000
+
+class Outbox:
+    """Queued alerts backed by an append-only log (path=None: memory only)"""
+
+    def __init__(self, path):
+        self.path = Path(path) if path is not None else None
+        self.pending = {}  # id -> (endpoint name, payload, queued epoch)
+        self._next_id = 1
+        self._buffer = []
+        self._log_records = 0
+        self._torn_tail = False
+
+    def __len__(self):
+        return len(self.pending)
+
+    def load(self):
+        """Replay the log: queued minus delivered minus dead"""
+        self.pending.clear()
+        self._log_records = 0
+        self._torn_tail = False
+        if self.path is None:
+            return self
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    self._torn_tail = not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn write from a crash
+                    self._log_records += 1
+                    if "id" in record:
+                        self.pending[record["id"]] = (record["e"], record["p"], record.get("t", 0))
+                        self._next_id = max(self._next_id, record["id"] + 1)
+                    elif "next_id" in record:
+                        self._next_id = max(self._next_id, record["next_id"])
+                    else:
+                        for alert_id in record.get("ack", record.get("dead", [])):
+                            self.pending.pop(alert_id, None)
+        except FileNotFoundError:
+            pass
+        return self
+
+    def add(self, endpoint_name, payload, now=None):
+        """Queue one alert for one endpoint; returns its id"""
+        alert_id = self._next_id
+        self._next_id += 1
+        queued = time.time() if now is None else now
+        self.pending[alert_id] = (endpoint_name, payload, queued)
+        self._buffer.append({"id": alert_id, "e": endpoint_name, "p": payload, "t": queued})
+        return alert_id
+
+    def ack(self, alert_ids):
+        """Mark alerts delivered"""
+        for alert_id in alert_ids:
+            self.pending.pop(alert_id, None)
+        self._buffer.append({"ack": list(alert_ids)})
+
+    def dead(self, alert_ids, error):
+        """Give up on alerts that can never be delivered"""
+        for alert_id in alert_ids:
+            self.pending.pop(alert_id, None)
+        self._buffer.append({"dead": list(alert_ids), "error": error})
+
+    def batches(self, batch_size):
+        """[(endpoint name, [(id, payload), ...]), ...] of everything pending, oldest first"""
+        grouped = {}
+        for alert_id, (endpoint_name, payload, _) in sorted(self.pending.items()):
+            grouped.setdefault(endpoint_name, []).append((alert_id, payload))
+        return [
+            (endpoint_name, items[start:start + batch_size])
+            for endpoint_name, items in grouped.items()
+            for start in range(0, len(items), batch_size)
+        ]
+
+    def flush(self):
+        """Append buffered records in one fsynced write, compacting when mostly finished"""
+        if not self._buffer:
+            return
+        if self.path is None:
+            self._buffer.clear()
+            return
+        if self._log_records + len(self._buffer) > max(COMPACT_MIN_RECORDS, 2 * (len(self.pending) + 1)):
+            self.compact()
+            return
+        payload = "".join(json.dumps(record) + "\n" for record in self._buffer)
+        if self._torn_tail:
+            payload = "\n" + payload
+            self._torn_tail = False
+        with open(self.path, 'a') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_records += len(self._buffer)
+        self._buffer.clear()
+
+    def compact(self):
+        """Rewrite the log with the id high-water mark and pending alerts only (temp + fsync + rename)"""
+        records = [{"next_id": self._next_id}] + [
+            {"id": alert_id, "e": endpoint_name, "p": payload, "t": queued}
+            for alert_id, (endpoint_name, payload, queued) in sorted(self.pending.items())
+        ]
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._log_records = len(records)
+        self._torn_tail = False
+        self._buffer.clear()
+
+def alert_payloads(results):
+    """[(alert name, match dict), ...] from run_cycle() results or {alert name: [match dicts]}"""
+    payloads = []
+    for name, result in results.items():
+        if name.startswith("_"):
+            continue  # manager bookkeeping (_load, _delta, _filter)
+        matches = result["matches"] if isinstance(result, dict) else result
+        payloads.extend((name, match) for match in matches)
+    return payloads
+
+class AlertDispatcher:
+    """Deliver queued alerts to every endpoint through one pooled ClientSession"""
+
+    def __init__(self, endpoints, outbox, concurrency=8, batch_size=20, max_attempts=5,
+                 backoff_seconds=0.5, timeout_seconds=10):
+        if not HAVE_AIOHTTP:
+            raise RuntimeError("aiohttp is not installed - alert dispatch is unavailable")
+        self.endpoints = {endpoint["name"]: endpoint for endpoint in endpoints}
+        self.outbox = outbox
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.timeout_seconds = timeout_seconds
+        self.session = None
+        self._drain_lock = None
+
+    async def start(self):
+        """Open the shared keep-alive session (call on the loop that will drain)"""
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout_seconds)
+        )
+        self._drain_lock = asyncio.Lock()
+        return self
+
+    async def close(self):
+        """Close the session and its pooled connections"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def enqueue(self, results, now=None):
+        """Queue every fired alert for every endpoint (one fsynced outbox write); returns count"""
+        queued_at = time.time() if now is None else now
+        count = 0
+        for alert_name, match in alert_payloads(results):
+            payload = {"alert": alert_name, "match": match, "queued_at": queued_at}
+            for endpoint_name in self.endpoints:
+                self.outbox.add(endpoint_name, payload, queued_at)
+                count += 1
+        self.outbox.flush()
+        return count
+
+    async def _post(self, endpoint, body):
+        """POST one batch with retries; None on success, otherwise (error, permanent)"""
+        error = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                await asyncio.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+            try:
+                async with self.session.post(endpoint["url"], json=body, headers=endpoint.get("headers")) as response:
+                    await response.read()
+                    if response.status < 300:
+                        return None
+                    error = f"HTTP {response.status}"
+                    if response.status < 500 and response.status != 429:
+                        return error, True  # client error - retrying cannot help
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {e}"
+        return error, False
+
+    async def _deliver(self, endpoint_name, batch, semaphore, summary):
+        """Send one batch and record the outcome in the outbox"""
+        endpoint = self.endpoints.get(endpoint_name)
+        alert_ids = [alert_id for alert_id, _ in batch]
+        if endpoint is None:
+            self.outbox.dead(alert_ids, f"unknown endpoint {endpoint_name}")
+            summary["dead"] += len(batch)
+            return
+        body = {"alerts": [{"id": alert_id, **payload} for alert_id, payload in batch]}
+        async with semaphore:
+            failure = await self._post(endpoint, body)
+        if failure is None:
+            self.outbox.ack(alert_ids)
+            summary["delivered"] += len(batch)
+        elif failure[1]:
+            self.outbox.dead(alert_ids, failure[0])
+            summary["dead"] += len(batch)
+            print(f"Alert Dispatcher: {endpoint_name} rejected {len(batch)} alerts ({failure[0]}) - dropped")
+        else:
+            summary["deferred"] += len(batch)
+            print(f"Alert Dispatcher: {endpoint_name} unavailable ({failure[0]}) - {len(batch)} alerts kept in outbox")
+
+    async def drain(self):
+        """Deliver everything pending -> {"delivered", "dead", "deferred", "seconds"}"""
+        async with self._drain_lock:
+            start = time.perf_counter()
+            summary = {"delivered": 0, "dead": 0, "deferred": 0}
+            semaphore = asyncio.Semaphore(self.concurrency)
+            await asyncio.gather(*(
+                self._deliver(endpoint_name, batch, semaphore, summary)
+                for endpoint_name, batch in self.outbox.batches(self.batch_size)
+            ))
+            self.outbox.flush()
+            summary["seconds"] = time.perf_counter() - start
+            return summary
+
+    async def dispatch(self, results):
+        """Queue a cycle's alerts and deliver everything pending"""
+        self.enqueue(results)
+        return await self.drain()
+
+class DispatcherThread:
+    """Run an AlertDispatcher on its own event loop so the alert cycle never waits on HTTP"""
+
+    def __init__(self, dispatcher):
+        self.dispatcher = dispatcher
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="alert-dispatcher", daemon=True)
+
+    def start(self):
+        """Start the loop thread and open the session on it"""
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.dispatcher.start(), self.loop).result()
+        return self
+
+    def submit(self, results):
+        """Hand a cycle's results over (returns at once; a future with the drain summary)"""
+        return asyncio.run_coroutine_threadsafe(self.dispatcher.dispatch(results), self.loop)
+
+    def stop(self, timeout=30):
+        """Finish in-flight deliveries (up to timeout), close the session and the loop"""
+        async def shutdown():
+            try:
+                await asyncio.wait_for(self.dispatcher.drain(), timeout)
+            finally:
+                await self.dispatcher.close()
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        except Exception as e:
+            print(f"Alert Dispatcher: shutdown drain incomplete ({type(e).__name__}) - pending alerts stay in the outbox")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+def load_dispatch_config(path=DISPATCH_CONFIG):
+    """Dispatch settings merged over the defaults (missing file = disabled)"""
+    try:
+        with open(path, 'r') as f:
+            return {**DEFAULT_SETTINGS, **json.load(f)}
+    except FileNotFoundError:
+        return dict(DEFAULT_SETTINGS)
+    except json.JSONDecodeError as e:
+        print(f"Alert Dispatcher: Error loading {path}: {e} - dispatch disabled")
+        return dict(DEFAULT_SETTINGS)
+
+def create_dispatcher(settings, base_dir=BASE_DIR):
+    """AlertDispatcher for enabled settings with endpoints, otherwise None"""
+    if not settings.get("enabled") or not settings.get("endpoints"):
+        return None
+    if not HAVE_AIOHTTP:
+        print("Alert Dispatcher: aiohttp not installed - alerts are only logged")
+        return None
+    outbox_path = settings.get("outbox")
+    outbox = Outbox(Path(base_dir) / outbox_path if outbox_path else None).load()
+    return AlertDispatcher(
+        settings["endpoints"], outbox,
+        concurrency=settings["concurrency"], batch_size=settings["batch_size"],
+        max_attempts=settings["max_attempts"], backoff_seconds=settings["backoff_seconds"],
+        timeout_seconds=settings["timeout_seconds"],
+    )
+
+def dispatch_results(results, settings=None):
+    """One-shot runners: queue and deliver one cycle's alerts (plus any left in the outbox)"""
+    dispatcher = create_dispatcher(settings if settings is not None else load_dispatch_config())
+    if dispatcher is None:
+        return None
+
+    async def run():
+        async with dispatcher:
+            return await dispatcher.dispatch(results)
+    return asyncio.run(run())
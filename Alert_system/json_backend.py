@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+JSON Backend - Pluggable step5 Decoder
+======================================
+
+step5 documents used to be decoded with the stdlib json module only. The
+reader now decodes through decode(), which uses the fastest installed
+backend:
+
+    orjson    orjson.loads
+    msgspec   msgspec.json.decode
+    json      stdlib json.loads (always available)
+
+Every backend returns the same plain dicts / lists / str / int / float, so
+the rest of the pipeline (MatchView, hashing, formatting, dispatch) and the
+alert output are identical whichever one runs. Pick one explicitly with
+STEP5_JSON_BACKEND=msgspec|orjson|json or set_backend(name); a
+STEP5_JSON_BACKEND naming a backend that is not installed falls back to
+stdlib json with a message instead of failing the import.
+
+STDLIB FALLBACK:
+orjson and msgspec reject NaN and Infinity, which stdlib json.dump writes
+for float("nan") odds. A document the selected backend cannot decode is
+decoded again with stdlib json, so such a fetch still alerts; only a
+document stdlib json rejects too raises.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+    HAVE_ORJSON = False
+
+try:
+    import msgspec
+    HAVE_MSGSPEC = True
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None
+    HAVE_MSGSPEC = False
+
+# Fastest first for plain dicts (benchmarks/bench_json_backends.py) - the
+# first installed one is the default
+BACKEND_PREFERENCE = ("orjson", "msgspec", "json")
+
+def available_backends():
+    """Installed backend names, fastest first"""
+    installed = {"orjson": HAVE_ORJSON, "msgspec": HAVE_MSGSPEC, "json": True}
+    return [name for name in BACKEND_PREFERENCE if installed[name]]
+
+def backend_loads(name):
+    """The decode function of one backend (ValueError if unknown or not installed)"""
+    if name not in available_backends():
+        raise ValueError(f"JSON backend {name!r} is not available (installed: {', '.join(available_backends())})")
+    if name == "msgspec":
+        return msgspec.json.decode
+    if name == "orjson":
+        return orjson.loads
+    return json.loads
+
+def set_backend(name=None):
+    """Switch decode() to a backend (None: STEP5_JSON_BACKEND or the fastest installed); returns its name"""
+    global BACKEND, _loads
+    if name is None:
+        name = os.environ.get("STEP5_JSON_BACKEND") or available_backends()[0]
+        if name not in available_backends():
+            print(f"JSON Backend: STEP5_JSON_BACKEND={name!r} is not available - using json")
+            name = "json"
+    _loads = backend_loads(name)
+    BACKEND = name
+    return name
+
+def decode(data):
+    """Decode a JSON document (bytes) with the selected backend, stdlib json if it fails"""
+    try:
+        return _loads(data)
+    except ValueError:
+        if _loads is json.loads:
+            raise
+        return json.loads(data)
+
+BACKEND = None
+_loads = json.loads
+set_backend()
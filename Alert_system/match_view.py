@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Match View - Normalized Per-Match Data Built Once Per Snapshot
+==============================================================
+
+Every stage of an alert used to re-read the raw step5 match dict: the filter
+walked over_under, get_match_key() walked it again, format_ou_match() walked
+and sorted it a third time, and scores/status were coerced separately in
+each check.
+
+A MatchView is built ONCE per match per snapshot and shared by the rule
+engine (filter), the dedup key and the formatter:
+
+    view.match         the raw step5 match dict (untouched, used for display)
+    view.match_id
+    view.status_id     integer status ID (None if missing / not numeric)
+    view.home_score    integer scores - missing counts as 0,
+    view.away_score    None if the feed value is not a number
+    view.lines         [(line_value, line_data), ...] numeric O/U lines sorted
+                       by value (0.0 is a real line, not a missing one)
+    view.max_line      largest O/U line, None if the match has none
+    view.signatures    {rule name: qualifying-line signature} filled by
+                       Rule.match_key() so the key is only built once
+
+Views read like the match dict (view.get("home_team"), view["match_id"]),
+so display code works on either. compact_match.CompactMatch offers the same
+interface for matches kept in memory across snapshots.
+"""
+
+def coerce_score(value):
+    """Score value to int (None counts as 0), raises ValueError/TypeError if invalid"""
+    return int(value) if value is not None else 0
+
+def coerce_status(value):
+    """Status ID to int (3, 3.0 and "3" all give 3), None if missing or not numeric"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(number) if number.is_integer() else None
+
+def is_line_value(value):
+    """True for numeric O/U line values (0.0 included, bools and strings not)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+class MatchView:
+    """Normalized, precomputed fields of one step5 match"""
+
+    __slots__ = ("match", "match_id", "status_id", "home_score", "away_score", "lines", "max_line", "signatures")
+
+    def __init__(self, match):
+        self.match = match
+        self.match_id = match.get("match_id")
+        self.status_id = coerce_status(match.get("status_id"))
+
+        try:
+            self.home_score = coerce_score(match.get("home_score", 0))
+            self.away_score = coerce_score(match.get("away_score", 0))
+        except (ValueError, TypeError):
+            self.home_score = self.away_score = None
+
+        lines = []
+        over_under = match.get("over_under", {})
+        if over_under and isinstance(over_under, dict):
+            for line_data in over_under.values():
+                if isinstance(line_data, dict) and is_line_value(line_data.get("line")):
+                    lines.append((line_data["line"], line_data))
+        lines.sort(key=lambda line: line[0])
+        self.lines = lines
+        self.max_line = lines[-1][0] if lines else None
+        self.signatures = {}
+
+    @property
+    def scores_valid(self):
+        """False when the feed's home/away score could not be read as numbers"""
+        return self.home_score is not None
+
+    def get(self, key, default=None):
+        """Raw match field, like dict.get"""
+        return self.match.get(key, default)
+
+    def __getitem__(self, key):
+        return self.match[key]
+
+    def __contains__(self, key):
+        return key in self.match
+
+def as_view(match):
+    """MatchView for a raw match dict (views and compact matches are returned unchanged)"""
+    return MatchView(match) if isinstance(match, dict) else match
+
+def build_match_views(matches):
+    """One MatchView per match of a snapshot's matches dict, in snapshot order"""
+    return [MatchView(match_data) for match_data in matches.values()]
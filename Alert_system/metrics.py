@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Cycle Metrics - Per-Cycle Stage Timings, Counters and Fetch Latency
+===================================================================
+
+The only operational signal used to be the "Found N NEW live matches"
+console line. Each alert cycle can now record:
+
+    stages     seconds spent in load, catch_up, filter, dedup, format and
+               persist (laps - each stage runs from the previous lap)
+    counts     scanned, changed, non_live, duplicates, fired, and the state
+               write volume: state_bytes_written (what the cycle appended) vs
+               state_bytes_full_rewrite (what rewriting the state would cost)
+    latency    seconds from the fetch's generated_at to the alert write
+               (only when something fired)
+
+and export them two ways, configured per alert in its .json config:
+
+    "metrics": {
+        "enabled": true,
+        "prometheus_textfile": "ou_3.prom",   # node_exporter textfile collector
+        "jsonl": "ou_3_metrics.jsonl"         # one JSON record per cycle
+    }
+
+Relative paths are resolved against the alert's directory. The textfile is
+replaced atomically and holds last-cycle gauges; the JSONL stream keeps the
+history. A caught-up fetch is recorded at its own generated_at, not at the
+time the catch-up ran.
+
+DISABLED COST:
+With metrics off (the default) the alert gets NULL_METRICS, whose methods
+do nothing - a cycle pays a handful of no-op method calls.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Counters with this prefix are byte volumes, exported as alert_state_bytes
+STATE_BYTES_PREFIX = "state_bytes_"
+
+def fetch_timestamp(generated_at, tz):
+    """Epoch seconds of a generated_at string ("05/28/2025 11:05:04 PM EDT"), None if unparseable"""
+    try:
+        local = datetime.strptime(generated_at.rsplit(" ", 1)[0], "%m/%d/%Y %I:%M:%S %p")
+    except (AttributeError, ValueError):
+        return None
+    return local.replace(tzinfo=tz).timestamp()
+
+class NullMetrics:
+    """Metrics switched off - every call is a no-op"""
+
+    enabled = False
+
+    def lap(self, stage):
+        pass
+
+    def count(self, name, value):
+        pass
+
+    def alert_written(self):
+        pass
+
+    def finish(self):
+        pass
+
+NULL_METRICS = NullMetrics()
+
+class CycleMetrics:
+    """Stage laps, counters and fetch-to-alert latency of one alert cycle"""
+
+    enabled = True
+
+    def __init__(self, alert_name, generated_at, tz, prometheus_path=None, jsonl_path=None, started=None,
+                 caught_up=False):
+        self.alert_name = alert_name
+        self.generated_at = generated_at
+        self.tz = tz
+        self.caught_up = caught_up
+        self.prometheus_path = prometheus_path
+        self.jsonl_path = jsonl_path
+        self.stages = {}
+        self.counts = {}
+        self.latency_seconds = None
+        self._started = self._last_lap = started if started is not None else time.perf_counter()
+
+    def lap(self, stage):
+        """Close a stage: time since the previous lap (or the cycle start) is added to it"""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self._last_lap)
+        self._last_lap = now
+
+    def count(self, name, value):
+        """Set a per-cycle counter"""
+        self.counts[name] = value
+
+    def alert_written(self):
+        """Fetch-to-alert latency, taken when the alert block is handed to the log writer"""
+        fetched = fetch_timestamp(self.generated_at, self.tz)
+        if fetched is not None:
+            self.latency_seconds = time.time() - fetched
+
+    def record(self):
+        """The cycle as one JSON-ready dict"""
+        ts = fetch_timestamp(self.generated_at, self.tz) if self.caught_up else None
+        return {
+            "ts": round(ts if ts is not None else time.time(), 3),
+            "alert": self.alert_name,
+            "generated_at": self.generated_at,
+            "cycle_seconds": time.perf_counter() - self._started,
+            "stages": self.stages,
+            "counts": self.counts,
+            "latency_seconds": self.latency_seconds,
+        }
+
+    def finish(self):
+        """Export the cycle to the configured textfile and JSONL stream"""
+        record = self.record()
+        if self.jsonl_path is not None:
+            append_jsonl(self.jsonl_path, record)
+        if self.prometheus_path is not None:
+            write_prometheus_textfile(self.prometheus_path, record)
+        return record
+
+def open_cycle_metrics(alert_name, config, base_dir, generated_at, tz, started=None, caught_up=False):
+    """CycleMetrics for this cycle when the alert config enables metrics, otherwise NULL_METRICS"""
+    settings = config.get("metrics") or {}
+    if not settings.get("enabled", False):
+        return NULL_METRICS
+
+    def resolve(key):
+        value = settings.get(key)
+        return None if not value else Path(base_dir) / value
+    return CycleMetrics(alert_name, generated_at, tz, resolve("prometheus_textfile"), resolve("jsonl"), started,
+                        caught_up)
+
+def _label(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_text(record):
+    """Prometheus text exposition of one cycle record (last-cycle gauges)"""
+    alert = _label(record["alert"])
+    lines = [
+        "# HELP alert_cycle_seconds Duration of the last alert cycle",
+        "# TYPE alert_cycle_seconds gauge",
+        f'alert_cycle_seconds{{alert="{alert}"}} {record["cycle_seconds"]:.6f}',
+        "# HELP alert_stage_seconds Duration of each stage of the last alert cycle",
+        "# TYPE alert_stage_seconds gauge",
+    ]
+    for stage, seconds in record["stages"].items():
+        lines.append(f'alert_stage_seconds{{alert="{alert}",stage="{_label(stage)}"}} {seconds:.6f}')
+    lines += [
+        "# HELP alert_cycle_matches Matches per outcome in the last alert cycle",
+        "# TYPE alert_cycle_matches gauge",
+    ]
+    state_bytes = {}
+    for kind, value in record["counts"].items():
+        if kind.startswith(STATE_BYTES_PREFIX):
+            state_bytes[kind[len(STATE_BYTES_PREFIX):]] = value
+            continue
+        lines.append(f'alert_cycle_matches{{alert="{alert}",kind="{_label(kind)}"}} {value}')
+    if state_bytes:
+        lines += [
+            "# HELP alert_state_bytes State store write volume of the last cycle (written vs a full rewrite)",
+            "# TYPE alert_state_bytes gauge",
+        ]
+        for kind, value in state_bytes.items():
+            lines.append(f'alert_state_bytes{{alert="{alert}",kind="{_label(kind)}"}} {value}')
+    if record["latency_seconds"] is not None:
+        lines += [
+            "# HELP alert_fetch_to_alert_seconds Seconds from the fetch's generated_at to the alert write",
+            "# TYPE alert_fetch_to_alert_seconds gauge",
+            f'alert_fetch_to_alert_seconds{{alert="{alert}"}} {record["latency_seconds"]:.3f}',
+        ]
+    lines += [
+        "# HELP alert_last_cycle_timestamp_seconds When the last alert cycle finished",
+        "# TYPE alert_last_cycle_timestamp_seconds gauge",
+        f'alert_last_cycle_timestamp_seconds{{alert="{alert}"}} {record["ts"]:.3f}',
+    ]
+    return "\n".join(lines) + "\n"
+
+def write_prometheus_textfile(path, record):
+    """Replace the textfile atomically so the collector never reads half a file"""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(prometheus_text(record))
+    os.replace(tmp_path, path)
+
+def append_jsonl(path, record):
+    """Append one record to the JSONL metrics stream"""
+    with open(path, "a") as f:
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Odds Tracker - Bounded Per-Match Odds History for Line-Movement Alerts
+======================================================================
+
+The O/U alerts only see the current snapshot. The odds tracker remembers the
+last K readings of every tracked match in memory so line movement ("the
+total crossed 3.0", "the line moved 0.5+ in 10 minutes") can be asked
+without re-reading history from disk.
+
+READINGS:
+Each reading holds the fetch time and nine numbers (NaN when missing):
+
+    ou_line, ou_over, ou_under      the MAIN O/U line - the line whose over /
+                                    under prices are the most balanced
+    spread_handicap, spread_home, spread_away
+    ml_home, ml_draw, ml_away       full_time_result (money line)
+
+A reading is only recorded when one of them changed since the previous
+one, so K readings cover K movements rather than K fetches.
+
+STORAGE:
+Every match has one fixed-size ring buffer - a single array('d') of K x 10
+slots, overwritten in place. Queries walk at most K readings: O(K).
+
+FEEDING:
+The Alert Manager feeds the tracker incrementally each cycle with only the
+new and changed matches from the delta engine (unchanged matches cannot
+have moved). Finished matches (status 7 / 8) and matches that left the feed
+are evicted. The tracker is handed to alerts as snapshot["odds_tracker"];
+no shipped alert criterion reads it yet - it is the history line-movement
+alerts will query. Fetch times are read in the feed's Eastern time, like
+the alerts' own timestamps.
+
+MEMORY BUDGET:
+Configured in odds_tracker.json next to this file (shipped disabled):
+
+    {"enabled": true, "readings": 16, "memory_budget_mb": 32}
+
+The budget caps the number of tracked matches; when it is reached the match
+updated least recently is dropped. memory_bytes() reports the estimate.
+"""
+
+import json
+import math
+import sys
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from match_view import as_view
+from metrics import fetch_timestamp
+from rule_engine import FINISHED_STATUS_IDS, parse_odds
+
+CONFIG_FILE = Path(__file__).parent / "odds_tracker.json"
+
+# generated_at is Eastern time ("05/28/2025 11:05:04 PM EDT")
+TZ = ZoneInfo("America/New_York")
+
+DEFAULT_READINGS = 16
+DEFAULT_MEMORY_BUDGET_MB = 32
+
+DEFAULT_SETTINGS = {"enabled": False, "readings": DEFAULT_READINGS, "memory_budget_mb": DEFAULT_MEMORY_BUDGET_MB}
+
+# Reading layout: slot 0 is the fetch time, then the tracked fields
+FIELDS = ("ou_line", "ou_over", "ou_under",
+          "spread_handicap", "spread_home", "spread_away",
+          "ml_home", "ml_draw", "ml_away")
+SLOTS = 1 + len(FIELDS)
+FIELD_SLOTS = {field: slot for slot, field in enumerate(FIELDS, 1)}
+
+NAN = float("nan")
+
+def implied_probability(odds):
+    """Implied probability of American odds (-110 -> 0.524), None if missing"""
+    if odds is None or -100 < odds < 100:
+        return None
+    return 100 / (odds + 100) if odds > 0 else -odds / (-odds + 100)
+
+def main_line(view):
+    """(line, over, under) of the most balanced O/U line; the first line if none is fully priced"""
+    best, best_gap = None, None
+    for line_value, line_data in view.lines:
+        over, under = parse_odds(line_data.get("over")), parse_odds(line_data.get("under"))
+        if best is None:
+            best = (line_value, over, under)
+        over_p, under_p = implied_probability(over), implied_probability(under)
+        if over_p is None or under_p is None:
+            continue
+        gap = abs(over_p - under_p)
+        if best_gap is None or gap < best_gap:
+            best, best_gap = (line_value, over, under), gap
+    return best
+
+def _number(value):
+    """Float for a reading slot (NaN when missing)"""
+    return NAN if value is None else float(value)
+
+def reading_values(view):
+    """The nine tracked numbers of one match, in FIELDS order"""
+    line = main_line(view)
+    ou_line, ou_over, ou_under = line if line is not None else (None, None, None)
+    spread = view.get("spread")
+    spread = spread if spread and isinstance(spread, Mapping) else {}
+    ml = view.get("full_time_result")
+    ml = ml if ml and isinstance(ml, Mapping) else {}
+    return (
+        _number(ou_line), _number(ou_over), _number(ou_under),
+        _number(parse_odds(spread.get("handicap"))), _number(parse_odds(spread.get("home"))),
+        _number(parse_odds(spread.get("away"))),
+        _number(parse_odds(ml.get("home"))), _number(parse_odds(ml.get("draw"))), _number(parse_odds(ml.get("away"))),
+    )
+
+class MatchTrack:
+    """Ring buffer of one match's readings"""
+
+    __slots__ = ("buffer", "head", "count")
+
+    def __init__(self, capacity):
+        self.buffer = array("d", [NAN]) * (capacity * SLOTS)
+        self.head = 0   # slot index of the next write
+        self.count = 0
+
+class OddsTracker:
+    """Last K odds readings per match, bounded by a memory budget"""
+
+    def __init__(self, readings=DEFAULT_READINGS, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+        self.capacity = max(1, int(readings))
+        self.max_matches = max(1, int(memory_budget_mb * 1024 * 1024 // self.bytes_per_match()))
+        self.tracks = OrderedDict()  # match_id -> MatchTrack, least recently updated first
+        self.evicted = 0
+        self.last_timestamp = None
+
+    def bytes_per_match(self):
+        """Estimated memory of one tracked match (buffer, track object, dict entry)"""
+        probe = MatchTrack(self.capacity)
+        return sys.getsizeof(probe.buffer) + sys.getsizeof(probe) + 100
+
+    def memory_bytes(self):
+        """Estimated memory of everything tracked"""
+        return len(self.tracks) * self.bytes_per_match()
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def __contains__(self, match_id):
+        return match_id in self.tracks
+
+    def record(self, match_id, timestamp, values):
+        """Append one reading unless it equals the match's last one; True if recorded"""
+        reading = array("d", values)
+        track = self.tracks.get(match_id)
+        if track is None:
+            if len(self.tracks) >= self.max_matches:
+                self.tracks.popitem(last=False)
+                self.evicted += 1
+            track = self.tracks[match_id] = MatchTrack(self.capacity)
+        else:
+            self.tracks.move_to_end(match_id)
+            if track.count:
+                last = (track.head - 1) % self.capacity * SLOTS
+                # Byte comparison: missing (NaN) slots compare equal too
+                if track.buffer[last + 1:last + SLOTS].tobytes() == reading.tobytes():
+                    return False
+
+        start = track.head * SLOTS
+        track.buffer[start] = timestamp
+        track.buffer[start + 1:start + SLOTS] = reading
+        track.head = (track.head + 1) % self.capacity
+        track.count = min(track.count + 1, self.capacity)
+        return True
+
+    def update(self, matches, generated_at, removed=()):
+        """
+        Feed one fetch: matches (views or dicts) - normally only the new and
+        changed ones - plus the match ids that left the feed.
+
+        Returns {"recorded": int, "evicted": int}.
+        """
+        timestamp = fetch_timestamp(generated_at, TZ)
+        if timestamp is None:
+            timestamp = self.last_timestamp if self.last_timestamp is not None else 0.0
+        self.last_timestamp = timestamp
+
+        recorded = evicted = 0
+        for match in matches:
+            view = as_view(match)
+            if view.match_id is None:
+                continue
+            if view.status_id in FINISHED_STATUS_IDS:
+                evicted += self.tracks.pop(view.match_id, None) is not None
+                continue
+            recorded += self.record(view.match_id, timestamp, reading_values(view))
+        for match_id in removed:
+            evicted += self.tracks.pop(match_id, None) is not None
+        return {"recorded": recorded, "evicted": evicted}
+
+    def readings(self, match_id, field="ou_line"):
+        """[(timestamp, value), ...] of one field, oldest first (missing values skipped)"""
+        track = self.tracks.get(match_id)
+        if track is None:
+            return []
+        slot = FIELD_SLOTS[field]
+        buffer, capacity = track.buffer, self.capacity
+        result = []
+        for i in range(track.count):
+            start = (track.head - track.count + i) % capacity * SLOTS
+            value = buffer[start + slot]
+            if not math.isnan(value):
+                result.append((buffer[start], value))
+        return result
+
+    def movement(self, match_id, window_seconds, field="ou_line", now=None):
+        """
+        How a field moved in the last window_seconds (up to now, default the
+        latest fetch): {"start", "current", "low", "high"}, or None when
+        there are no readings.
+
+        "start" is the value in force when the window opened - the last
+        reading at or before it, or the first reading inside it.
+        """
+        readings = self.readings(match_id, field)
+        if not readings:
+            return None
+        now = self.last_timestamp if now is None else now
+        window_start = now - window_seconds
+        start = None
+        low = high = None
+        for timestamp, value in readings:
+            if timestamp <= window_start:
+                start = value
+                continue
+            if start is None:
+                start = value
+            low = value if low is None else min(low, value)
+            high = value if high is None else max(high, value)
+        current = readings[-1][1]
+        low = min(start, current) if low is None else min(low, start)
+        high = max(start, current) if high is None else max(high, start)
+        return {"start": start, "current": current, "low": low, "high": high}
+
+    def crossed(self, match_id, threshold, window_seconds, field="ou_line"):
+        """"up" / "down" if the field crossed threshold within the window, else None"""
+        moved = self.movement(match_id, window_seconds, field)
+        if moved is None:
+            return None
+        if moved["start"] < threshold <= moved["current"]:
+            return "up"
+        if moved["current"] < threshold <= moved["start"]:
+            return "down"
+        return None
+
+    def line_moves(self, min_shift, window_seconds, field="ou_line"):
+        """[(match_id, start, current), ...] for every match whose field moved by min_shift or more"""
+        moves = []
+        for match_id in self.tracks:
+            moved = self.movement(match_id, window_seconds, field)
+            if moved is not None and abs(moved["current"] - moved["start"]) >= min_shift:
+                moves.append((match_id, moved["start"], moved["current"]))
+        return moves
+
+def load_tracker_config(path=CONFIG_FILE):
+    """Tracker settings merged over the defaults (missing file = disabled)"""
+    try:
+        with open(path, 'r') as f:
+            return {**DEFAULT_SETTINGS, **json.load(f)}
+    except FileNotFoundError:
+        return dict(DEFAULT_SETTINGS)
+    except json.JSONDecodeError as e:
+        print(f"Odds Tracker: Error loading {path}: {e} - tracking disabled")
+        return dict(DEFAULT_SETTINGS)
+
+def create_tracker(settings):
+    """OddsTracker for enabled settings, otherwise None"""
+    if not settings.get("enabled"):
+        return None
+    return OddsTracker(settings["readings"], settings["memory_budget_mb"])
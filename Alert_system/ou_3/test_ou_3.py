@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for OU_3 Alert - Synthetic step5 Files
+==================================================
+
+Runs the ou_3 alert (alert_runner.AlertRunner over ou_3.json) against
+synthetic step5.json files in a temporary directory to verify the
+fetch-change pre-check:
+1. Unchanged file (same inode/size/mtime) is skipped without parsing
+2. Rewritten file with the same generated_at is skipped without parsing
+3. A genuinely new fetch is parsed and alerted
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add Alert_system/ to path so we can import the alert runner
+sys.path.append(str(Path(__file__).parent.parent))
+
+import alert_runner
+from alert_runner import AlertRunner
+from step5_reader import stat_fingerprint
+
+def write_step5(path, generated_at):
+    """Write a one-match step5.json in the history layout"""
+    match = {
+        "match_id": "test_001",
+        "home_team": "Test Team A",
+        "away_team": "Test Team B",
+        "status_id": 2,
+        "over_under": {"line_1": {"line": 3.5, "over": "-110", "under": "-110", "time": "10"}},
+    }
+    path.write_text(json.dumps({"history": [{"generated_at": generated_at, "matches": {"test_001": match}}]}))
+
+def isolate_alert(tmp_path, monkeypatch):
+    """The ou_3 alert with every file it touches in tmp_path, and its parser calls"""
+    ou_3 = AlertRunner(Path(__file__).parent / "ou_3.json")
+    ou_3.step5_json = tmp_path / "step5.json"
+    ou_3.log_file = tmp_path / "ou_3.log"
+    ou_3.archive_file = tmp_path / "alert_archive.db"
+    ou_3.processed_matches_file = tmp_path / "processed_matches.json"
+    ou_3.dedup_store_file = tmp_path / "processed_matches.jsonl"
+    ou_3.daily_counter_file = tmp_path / "daily_alert_count.json"
+
+    parse_calls = []
+    real_reader = alert_runner.read_latest_snapshot
+
+    def counting_reader(path):
+        parse_calls.append(path)
+        return real_reader(path)
+
+    monkeypatch.setattr(alert_runner, "read_latest_snapshot", counting_reader)
+    return ou_3, parse_calls
+
+def test_unchanged_snapshot_is_not_parsed(tmp_path, monkeypatch):
+    """Second run on an untouched file returns before the parser is called"""
+    ou_3, parse_calls = isolate_alert(tmp_path, monkeypatch)
+    write_step5(tmp_path / "step5.json", "05/28/2025 11:05:04 PM EDT")
+
+    assert len(ou_3.check_alert()) == 1
+    assert len(parse_calls) == 1
+
+    assert ou_3.check_alert() == []
+    assert len(parse_calls) == 1
+
+def test_rewritten_same_fetch_is_not_parsed(tmp_path, monkeypatch):
+    """Same generated_at in a rewritten file is caught by the tail peek"""
+    ou_3, parse_calls = isolate_alert(tmp_path, monkeypatch)
+    step5 = tmp_path / "step5.json"
+    write_step5(step5, "05/28/2025 11:05:04 PM EDT")
+    ou_3.check_alert()
+
+    # Rewrite with identical content but a new mtime
+    write_step5(step5, "05/28/2025 11:05:04 PM EDT")
+    stat = step5.stat()
+    os.utime(step5, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert ou_3.check_alert() == []
+    assert len(parse_calls) == 1
+
+    # And the refreshed fingerprint now short-circuits on the stat alone
+    _, _, last_fetch_stat = ou_3.load_processed_matches()
+    assert last_fetch_stat == stat_fingerprint(step5)
+
+def test_new_fetch_is_parsed(tmp_path, monkeypatch):
+    """A new generated_at goes through the full parse"""
+    ou_3, parse_calls = isolate_alert(tmp_path, monkeypatch)
+    step5 = tmp_path / "step5.json"
+    write_step5(step5, "05/28/2025 11:05:04 PM EDT")
+    ou_3.check_alert()
+
+    write_step5(step5, "05/28/2025 11:06:04 PM EDT")
+    ou_3.check_alert()
+    assert len(parse_calls) == 2
+
+def test_entry_script_wraps_the_shared_runner(tmp_path, monkeypatch):
+    """ou_3.py keeps check_ou_3_alert and --profile, backed by the manager's runner"""
+    import subprocess
+    import alert_manager
+    sys.path.append(str(Path(__file__).parent))
+    import ou_3
+
+    alerts = alert_manager.discover_alerts()
+    assert alerts["ou_3"] == Path(__file__).parent / "ou_3.json"
+    assert ou_3.RUNNER is alert_manager.load_alert_module(alerts["ou_3"])
+
+    runner, parse_calls = isolate_alert(tmp_path, monkeypatch)
+    for attr in ("step5_json", "log_file", "archive_file", "processed_matches_file", "dedup_store_file",
+                 "daily_counter_file"):
+        monkeypatch.setattr(ou_3.RUNNER, attr, getattr(runner, attr))
+    write_step5(tmp_path / "step5.json", "05/28/2025 11:05:04 PM EDT")
+    assert [match["match_id"] for match in ou_3.check_ou_3_alert()] == ["test_001"]
+
+    usage = subprocess.run([sys.executable, str(Path(__file__).parent / "ou_3.py"), "--help"],
+                           capture_output=True, text=True, check=True).stdout
+    assert "--profile" in usage
@@ -3,7 +3,8 @@
 Test script for OU_3 No Score Alert - Mock Data Testing
 ========================================================
 
-This script creates mock match data to test all three criteria:
+This script creates mock match data to test all three criteria of the
+compiled ou_3_no_score.json rule:
 1. O/U line >= 3.0
 2. Half-time break status (ID = 3)
 3. Scoreless at half-time (0-0)
@@ -13,14 +14,23 @@ import json
 import sys
 from pathlib import Path
 
-# Add the current directory to path so we can import the alert module
-sys.path.append(str(Path(__file__).parent))
+# Add Alert_system/ to path so we can import the alert runner
+sys.path.append(str(Path(__file__).parent.parent))
 
-from ou_3_no_score import (
-    is_half_time_match,
-    is_scoreless_at_halftime,
-    get_status_description
-)
+from alert_runner import AlertRunner, get_status_description
+from match_view import as_view
+
+# The alert's criteria, compiled by the rule engine like every cycle does
+RULE = AlertRunner(Path(__file__).parent / "ou_3_no_score.json").get_alert_rule()
+
+def is_half_time_match(match_data):
+    """Status gate of the rule (half-time break only)"""
+    return RULE.status_matches(as_view(match_data))
+
+def is_scoreless_at_halftime(match_data):
+    """Score condition of the rule (0-0) on the coerced scores"""
+    view = as_view(match_data)
+    return view.scores_valid and (view.home_score, view.away_score) == (RULE.score_spec["home"], RULE.score_spec["away"])
 
 def create_mock_matches():
     """Create mock match data for testing"""
@@ -235,3 +245,15 @@ if __name__ == "__main__":
     print("\n" + "="*80)
     print("TEST COMPLETE")
     print("="*80)
+
+def test_entry_script_wraps_the_shared_runner():
+    """ou_3_no_score.py keeps check_ou_3_no_score_alert and --profile"""
+    import subprocess
+    sys.path.append(str(Path(__file__).parent))
+    import ou_3_no_score
+
+    assert ou_3_no_score.RUNNER.get_alert_rule().score_spec == RULE.score_spec
+    assert callable(ou_3_no_score.check_ou_3_no_score_alert)
+    usage = subprocess.run([sys.executable, str(Path(__file__).parent / "ou_3_no_score.py"), "--help"],
+                           capture_output=True, text=True, check=True).stdout
+    assert "--profile" in usage
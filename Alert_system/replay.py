@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Replay - Backtest Alerts Over step5 History
+===========================================
+
+Streams every entry of a step5.json `history` array, oldest first, through
+the real alert cycle (alert_runner.py) and reports which alerts would have
+fired, and for which fetch.
+
+ISOLATION:
+Every task builds AlertRunners of its own from the alert configs - the
+process's shared runners (alert_runner.get_runner, used by the manager and
+the daemon) are never switched or fed. They run in resident mode with
+persist_state=False - dedup store, daily counter and logger live in memory
+only, so a replay never touches the live processed_matches.jsonl,
+daily_alert_count.json or .log files. State starts empty for every task.
+
+CLOCK:
+The replay runners read "now" from each entry's generated_at
+(fetch_clock), so dedup TTL eviction and the daily alert count follow the
+replayed history rather than the wall clock of the replay.
+
+STREAMING:
+step5_reader.iter_history_entries() collects only entry offsets and decodes
+one entry at a time, so memory per task is one fetch regardless of how much
+history the file holds.
+
+FAN-OUT:
+Work is split into tasks - one per file (--split file) or one per file and
+day (--split day) - and run in a process pool with --workers N. Dedup state
+is per task, so with --split day a match spanning midnight can fire once in
+each day.
+
+Usage:
+    python3 replay.py step5.json
+    python3 replay.py archive/step5_*.json --workers 8
+    python3 replay.py step5.json --split day --workers 4 --alerts ou_3_no_score
+    python3 replay.py step5.json --profile      # profile a serial replay
+"""
+
+import argparse
+import contextlib
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from alert_manager import discover_alerts
+from alert_runner import AlertRunner
+from delta_engine import hash_matches
+from match_view import build_match_views
+from profiling import add_profile_arguments, profiler_from_args
+from step5_reader import history_generated_at, iter_history_entries
+
+def fetch_day(generated_at):
+    """Day part of a generated_at string ("05/28/2025 11:05:04 PM EDT" -> "05/28/2025")"""
+    return (generated_at or "Unknown").split(" ", 1)[0]
+
+def history_days(step5_path):
+    """Every fetch day in a step5 file, in file order (entries are not decoded)"""
+    days = []
+    for generated_at in history_generated_at(step5_path):
+        day = fetch_day(generated_at)
+        if day not in days:
+            days.append(day)
+    return days
+
+def isolate_alerts(names=None):
+    """Fresh in-memory AlertRunners of the discovered alerts (optionally only names), clocked by the fetches"""
+    runners = {}
+    for name, config_path in discover_alerts().items():
+        if names and name not in names:
+            continue
+        if Path(config_path).suffix != ".json":
+            raise RuntimeError(f"{name} has no criteria config - it cannot be replayed in isolation")
+        runner = AlertRunner(config_path)
+        runner.enable_resident_mode(console_echo=False, persist_state=False)
+        runner.fetch_clock = True
+        runners[name] = runner
+    return runners
+
+def replay_alert(runner, snapshot):
+    """One alert cycle on a replayed entry (a failing alert fires nothing, like in the Alert Manager)"""
+    try:
+        return runner.check_alert(snapshot=snapshot)
+    except Exception as e:
+        print(f"Replay: {runner.name} failed: {e}")
+        return []
+
+def replay_task(step5_path, day=None, alert_names=None):
+    """
+    Replay one file (or one day of it) with fresh isolated alert state.
+
+    Returns {"snapshots": int, "seconds": float,
+             "fired": [(generated_at, alert, match_id, home_team, away_team), ...]}
+    """
+    runners = isolate_alerts(alert_names)
+    select = None if day is None else (lambda generated_at: fetch_day(generated_at) == day)
+
+    fired = []
+    snapshots = 0
+    start = time.perf_counter()
+    for index, entry in enumerate(iter_history_entries(step5_path, select)):
+        matches = entry.get("matches", {})
+        snapshot = {
+            "matches": matches,
+            "generated_at": entry.get("generated_at", "Unknown"),
+            "fetch_stat": [str(step5_path), day, index],  # unique per entry - never "unchanged"
+            "catch_up": False,  # every entry is replayed anyway
+            "views": build_match_views(matches),
+            "match_hashes": hash_matches(matches),
+        }
+        snapshots += 1
+        # Alerts narrate every cycle on stdout; a replay only wants the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = {name: replay_alert(runner, snapshot) for name, runner in runners.items()}
+        for name, alert_matches in results.items():
+            for match in alert_matches:
+                fired.append((snapshot["generated_at"], name, match.get("match_id"),
+                              match.get("home_team"), match.get("away_team")))
+    return {"snapshots": snapshots, "seconds": time.perf_counter() - start, "fired": fired}
+
+def plan_tasks(paths, split="file"):
+    """(path, day) tasks - day is None when splitting by file"""
+    tasks = []
+    for path in paths:
+        if split == "day":
+            tasks.extend((str(path), day) for day in history_days(path))
+        else:
+            tasks.append((str(path), None))
+    return tasks
+
+def run_replay(paths, alert_names=None, split="file", workers=None):
+    """Run every task (in a process pool when workers > 1) and merge the results"""
+    tasks = plan_tasks(paths, split)
+    start = time.perf_counter()
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(replay_task, path, day, alert_names) for path, day in tasks]
+            task_results = [future.result() for future in futures]
+    else:
+        task_results = [replay_task(path, day, alert_names) for path, day in tasks]
+
+    return {
+        "tasks": len(tasks),
+        "snapshots": sum(result["snapshots"] for result in task_results),
+        "seconds": time.perf_counter() - start,
+        "fired": [row for result in task_results for row in result["fired"]],
+    }
+
+def print_replay_report(result, show_alerts=True):
+    """Print fired alerts, per-alert totals and throughput"""
+    print("\n" + "="*80)
+    print("REPLAY REPORT".center(80))
+    print("="*80)
+    if show_alerts:
+        for generated_at, name, match_id, home_team, away_team in result["fired"]:
+            print(f"{generated_at:<28} {name:<16} {match_id}  {home_team} vs {away_team}")
+        print("-"*80)
+
+    totals = {}
+    for _, name, *_ in result["fired"]:
+        totals[name] = totals.get(name, 0) + 1
+    for name, count in sorted(totals.items()):
+        print(f"{name:<30} {count:>8} alerts")
+    print(f"{'tasks':<30} {result['tasks']:>8}")
+    print(f"{'snapshots':<30} {result['snapshots']:>8}")
+    seconds = result["seconds"]
+    rate = result["snapshots"] / seconds if seconds > 0 else 0.0
+    print(f"{'throughput':<30} {rate:>8.1f} snapshots/sec ({seconds:.2f} s)")
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Replay step5 history through the alerts with isolated state")
+    parser.add_argument("step5", type=Path, nargs="+", help="step5.json file(s) with a history array, or snapshot store directories")
+    parser.add_argument("--alerts", nargs="+", default=None, help="only replay these alerts")
+    parser.add_argument("--split", choices=["file", "day"], default="file", help="unit of work per task")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--quiet", action="store_true", help="totals only, no per-alert lines")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # Only this process is profiled - use --workers 1 to see the alert code
+    result = profiler_from_args(args, "replay").run(run_replay, args.step5, args.alerts, args.split, args.workers)
+    print_replay_report(result, show_alerts=not args.quiet)
+    return result
+
+if __name__ == "__main__":
+    main()
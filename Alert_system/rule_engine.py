@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Rule Engine - Declarative Alert Criteria
+========================================
+
+Compiles the "criteria" block of an alert config into a Rule: a status-ID
+gate followed by a chain of predicates ordered cheapest first. Criteria are
+compiled once (at startup / first cycle), not re-interpreted per match.
+
+SUPPORTED CRITERIA:
+    "min_ou_line": 3.0            O/U line lower bound (inclusive, null = 3.0)
+    "max_ou_line": null           O/U line upper bound (inclusive, null = none)
+    "status_ids": [2, 3, 4]       allowed status IDs ("status_id": 3 also works)
+    "score": {                    score conditions (missing scores count as 0)
+        "home": 0, "away": 0,     exact home/away goals
+        "min_total": 1,           total goals bounds
+        "max_total": 4
+    }
+    "odds": [                     American odds thresholds (inclusive)
+        {"market": "full_time_result", "side": "home", "min": -200, "max": 150},
+        {"market": "spread", "side": "away", "max": -105},
+        {"market": "over_under", "side": "over", "max": -100}
+    ]
+    "key_suffix": "_halftime"     appended to dedup keys
+
+over_under odds thresholds apply per line: a match qualifies if at least one
+line is inside the line range AND satisfies every over_under odds threshold.
+
+Many rules are evaluated in a single pass over the matches dict with
+evaluate_rules(). Rules work on match_view.MatchView objects (status, scores
+and sorted O/U lines precomputed once per snapshot); raw match dicts are
+wrapped on the way in.
+
+DISPATCH:
+Every rule declares the status IDs and the O/U line range it can match
+(status_ids, min_ou_line, max_ou_line). evaluate_rules() builds a RuleIndex
+over those declarations - status_id -> rules sorted by min_ou_line - so a
+match only meets the rules whose status gate it passes and whose line range
+its lines reach, found with one dict lookup and one bisect. Score criteria
+are settled there too. The result is cached per (status_id, O/U line values,
+score) and the index is kept while the same compiled rules come back, so
+after the first cycles a match costs one dict lookup plus the rules that
+could fire. Status rejections are counted per status_id instead of per rule.
+
+SCALING:
+odds thresholds are not indexed - prices are continuous, so no key covers
+them. Each rule with odds criteria that a match is dispatched to checks
+them, so odds-heavy rule sets scale linearly with the number of such rules
+sharing a status and line range.
+"""
+
+from bisect import bisect_right
+from collections import Counter
+from collections.abc import Mapping
+
+from match_view import as_view, build_match_views
+
+# Finished status IDs - reported so dedup keys for these matches can be dropped
+FINISHED_STATUS_IDS = {7, 8}
+
+# min_ou_line when the criteria leave it out (or set it to null)
+DEFAULT_MIN_OU_LINE = 3.0
+
+# Cached dispatch entries per RuleIndex / RuleIndexes kept, before clearing
+DISPATCH_CACHE_SIZE = 65536
+RULE_INDEX_CACHE_SIZE = 8
+
+def parse_odds(value):
+    """American odds string/number ("-141", "+285", 150) to float, None if missing"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _in_range(value, minimum, maximum):
+    """Inclusive range check where None bounds are open"""
+    if value is None:
+        return False
+    if minimum is not None and value < minimum:
+        return False
+    if maximum is not None and value > maximum:
+        return False
+    return True
+
+def _compile_score(score_spec):
+    """Build a predicate for the score conditions, or None if there are none"""
+    if not score_spec:
+        return None
+    home = score_spec.get("home")
+    away = score_spec.get("away")
+    min_total = score_spec.get("min_total")
+    max_total = score_spec.get("max_total")
+
+    def score_predicate(view):
+        if not view.scores_valid:
+            return False
+        home_score, away_score = view.home_score, view.away_score
+        if home is not None and home_score != home:
+            return False
+        if away is not None and away_score != away:
+            return False
+        return _in_range(home_score + away_score, min_total, max_total)
+
+    return score_predicate
+
+def _compile_market_odds(market, side, minimum, maximum):
+    """Predicate for one full_time_result / spread odds threshold"""
+    def odds_predicate(view):
+        market_data = view.match.get(market)
+        if not market_data or not isinstance(market_data, Mapping):
+            return False
+        return _in_range(parse_odds(market_data.get(side)), minimum, maximum)
+    return odds_predicate
+
+def _compile_line_predicate(min_line, max_line, line_odds):
+    """Predicate for one numeric O/U line (line_value, line_data) of a MatchView"""
+    def line_predicate(line_value, line_data):
+        if line_value < min_line:
+            return False
+        if max_line is not None and line_value > max_line:
+            return False
+        for side, minimum, maximum in line_odds:
+            if not _in_range(parse_odds(line_data.get(side)), minimum, maximum):
+                return False
+        return True
+    return line_predicate
+
+def validate_criteria(criteria):
+    """Raise ValueError for criteria values a Rule cannot compile (checked when a config is loaded)"""
+    for field in ("min_ou_line", "max_ou_line"):
+        value = criteria.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError(f"criteria {field} must be a number or null, got {value!r}")
+
+class Rule:
+    """Compiled alert criteria: status gate, predicate chain and dedup key"""
+
+    def __init__(self, name, criteria):
+        self.name = name
+        self.criteria = criteria
+        min_line = criteria.get("min_ou_line")
+        self.min_line = DEFAULT_MIN_OU_LINE if min_line is None else min_line
+        self.max_line = criteria.get("max_ou_line")
+        self.key_suffix = criteria.get("key_suffix", "")
+
+        status_ids = criteria.get("status_ids")
+        if status_ids is None and criteria.get("status_id") is not None:
+            status_ids = [criteria["status_id"]]
+        self.status_ids = frozenset(status_ids) if status_ids is not None else None
+
+        # Normalised criteria kept alongside the compiled predicates so other
+        # evaluators (e.g. the columnar path) can compile them their own way
+        self.score_spec = criteria.get("score") or {}
+        self.market_odds = []  # (market, side, min, max) for full_time_result / spread
+        self.line_odds = []    # (side, min, max) applied to each over_under line
+
+        self.predicates = []
+        self.score_predicate = _compile_score(self.score_spec)
+        if self.score_predicate is not None:
+            self.predicates.append(self.score_predicate)
+        for threshold in criteria.get("odds", []):
+            minimum, maximum = threshold.get("min"), threshold.get("max")
+            if threshold.get("market") == "over_under":
+                self.line_odds.append((threshold["side"], minimum, maximum))
+            else:
+                self.market_odds.append((threshold["market"], threshold["side"], minimum, maximum))
+                self.predicates.append(
+                    _compile_market_odds(threshold["market"], threshold["side"], minimum, maximum)
+                )
+
+        # O/U walk is the most expensive check, so it always runs last
+        self.line_predicate = _compile_line_predicate(self.min_line, self.max_line, self.line_odds)
+        self.predicates.append(self.has_qualifying_line)
+        # RuleIndex dispatch already checks the score (part of its cache key)
+        # and, without line odds, the line walk (it only looks at line
+        # values) - both are left out there
+        first = 1 if self.score_predicate is not None else 0
+        self.dispatch_predicates = self.predicates[first:] if self.line_odds else self.predicates[first:-1]
+
+    def status_matches(self, view):
+        """Status gate - the first and cheapest check"""
+        return self.status_ids is None or view.status_id in self.status_ids
+
+    def qualifying_lines(self, match):
+        """All O/U line values (ascending) satisfying the line range and line odds"""
+        view = as_view(match)
+        return [line_value for line_value, line_data in view.lines if self.line_predicate(line_value, line_data)]
+
+    def has_qualifying_line(self, view):
+        """True if any O/U line qualifies (stops at the first)"""
+        # Precomputed max line rules out most matches without a line walk
+        if view.max_line is None or view.max_line < self.min_line:
+            return False
+        for line_value, line_data in view.lines:
+            if self.line_predicate(line_value, line_data):
+                return True
+        return False
+
+    def criteria_match(self, view):
+        """Every predicate after the status gate"""
+        for predicate in self.predicates:
+            if not predicate(view):
+                return False
+        return True
+
+    def matches(self, match):
+        """Full rule: status gate plus criteria (match dict or MatchView)"""
+        view = as_view(match)
+        return self.status_matches(view) and self.criteria_match(view)
+
+    def signature(self, match):
+        """Qualifying-line signature ("3.0|3.5"), built once per view and rule"""
+        view = as_view(match)
+        signature = view.signatures.get(self.name)
+        if signature is None:
+            signature = "|".join(sorted(str(line_value) for line_value in self.qualifying_lines(view)))
+            view.signatures[self.name] = signature
+        return signature
+
+    def match_key(self, match):
+        """Dedup key: match_id + sorted qualifying O/U lines (+ suffix)"""
+        view = as_view(match)
+        match_id = view.match.get("match_id", "unknown")
+        return f"{match_id}_{self.signature(view)}{self.key_suffix}"
+
+class RuleIndex:
+    """Discrimination index over the rules' status IDs and O/U line ranges"""
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        wildcard = [rule for rule in self.rules if rule.status_ids is None]
+        by_status = {}
+        for rule in self.rules:
+            for status_id in rule.status_ids or ():
+                by_status.setdefault(status_id, []).append(rule)
+        self.buckets = {status_id: self._bucket(bucket + wildcard) for status_id, bucket in by_status.items()}
+        self.default_bucket = self._bucket(wildcard)
+        self._dispatch = {}  # (status_id, line values) -> rules_for() result
+
+    @staticmethod
+    def _bucket(rules):
+        """(min lines, rules) sorted by min_ou_line"""
+        rules = sorted(rules, key=lambda rule: rule.min_line)
+        return [rule.min_line for rule in rules], rules
+
+    def rules_for(self, view):
+        """
+        ((rule, predicates), ...) for the rules whose status gate, line
+        range and score conditions this view passes; predicates are what is
+        left to check. Views share few (status, O/U lines, score)
+        combinations, so it is cached.
+        """
+        min_lines, rules = self.buckets.get(view.status_id, self.default_bucket)
+        # Every rule needs an O/U line at or above its min_ou_line
+        if view.max_line is None or not min_lines or view.max_line < min_lines[0]:
+            return ()
+        key = (view.status_id, tuple([line_value for line_value, _ in view.lines]), view.home_score, view.away_score)
+        dispatch = self._dispatch.get(key)
+        if dispatch is None:
+            if len(self._dispatch) >= DISPATCH_CACHE_SIZE:
+                self._dispatch.clear()
+            line_values = key[1]
+            dispatch = []
+            # Only rules with min_ou_line <= the view's largest line can fire
+            for rule in rules[:bisect_right(min_lines, view.max_line)]:
+                if rule.max_line is not None and rule.max_line < line_values[0]:
+                    continue
+                if not rule.line_odds and rule.max_line is not None and \
+                        not any(rule.min_line <= line_value <= rule.max_line for line_value in line_values):
+                    continue
+                # The score is part of the key, so it is checked once per key
+                if rule.score_predicate is not None and not rule.score_predicate(view):
+                    continue
+                dispatch.append((rule, rule.dispatch_predicates))
+            dispatch = self._dispatch[key] = tuple(dispatch)
+        return dispatch
+
+_rule_indexes = {}
+
+def rule_index(rules):
+    """RuleIndex for these rules, reused while the same Rule objects come back (resident alerts)"""
+    key = tuple(id(rule) for rule in rules)
+    index = _rule_indexes.get(key)
+    if index is None:
+        if len(_rule_indexes) >= RULE_INDEX_CACHE_SIZE:
+            _rule_indexes.clear()
+        # The index holds the rules, so their ids cannot be reused while it is cached
+        index = _rule_indexes[key] = RuleIndex(rules)
+    return index
+
+def compile_rule(name, config):
+    """Compile an alert config dict (with a "criteria" block) into a Rule"""
+    return Rule(name, config.get("criteria", {}))
+
+def evaluate_rules(rules, matches, views=None):
+    """
+    Evaluate every rule in one pass over the matches dict.
+
+    views: the snapshot's MatchViews when already built (see
+    match_view.build_match_views); built here otherwise.
+
+    Returns {rule name: {"candidates": [MatchView, ...],
+                         "status_rejected": int,
+                         "finished_match_ids": [...]}}
+    Candidates keep snapshot order; dedup is left to each alert.
+
+    finished_match_ids are the finished matches a rule cannot alert on, so
+    their dedup keys can go: those with a status the rule rejects or, for a
+    rule without a status gate, those that are not candidates. A finished
+    match no longer changes, so one that does not qualify now never will;
+    one that does keeps its key and is not alerted twice.
+    """
+    if views is None:
+        views = build_match_views(matches)
+    index = rule_index(rules)
+    results = {
+        rule.name: {"candidates": [], "status_rejected": 0, "finished_match_ids": []}
+        for rule in rules
+    }
+    candidates = {name: result["candidates"] for name, result in results.items()}
+    rules_for = index.rules_for
+    for view in views:
+        for rule, predicates in rules_for(view):
+            for predicate in predicates:
+                if not predicate(view):
+                    break
+            else:
+                candidates[rule.name].append(view)
+
+    # Status gate bookkeeping from the per-status counts, not per match
+    status_counts = Counter(view.status_id for view in views)
+    finished_views = [view for view in views if view.status_id in FINISHED_STATUS_IDS]
+    total = len(views)
+    finished_ids = {}  # finished statuses a rule accepts -> ids it rejected
+    for rule in rules:
+        result = results[rule.name]
+        if rule.status_ids is None:
+            qualified = set(result["candidates"])
+            result["finished_match_ids"] = [view.match_id for view in finished_views if view not in qualified]
+            continue
+        result["status_rejected"] = total - sum(status_counts[status_id] for status_id in rule.status_ids)
+        accepted = rule.status_ids & FINISHED_STATUS_IDS
+        if accepted not in finished_ids:
+            finished_ids[accepted] = [view.match_id for view in finished_views if view.status_id not in accepted]
+        result["finished_match_ids"] = list(finished_ids[accepted])
+    return results
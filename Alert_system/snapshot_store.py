@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Snapshot Store - Segmented NDJSON step5 History with an Offset Index
+====================================================================
+
+The legacy step5.json keeps the whole day's `history` in one document: the
+producer rewrites all of it on every fetch and a reader has to map the file
+and scan it to find one fetch. The snapshot store keeps the same fetches as:
+
+    <store>/step5_20250528.ndjson    one fetch per line, append-only, one
+    <store>/step5_20250529.ndjson    segment per fetch day (rolled daily)
+    <store>/index.jsonl              one line per fetch:
+                                     [generated_at, segment, offset, length]
+
+Appending a fetch writes one line to its day's segment and one line to the
+index (each fsynced, segment first). Reading any fetch - the latest or a
+historical one - is a lookup in the index plus a single os.pread() of
+exactly that fetch's bytes; the rest of the history is never touched.
+
+INDEX:
+Readers keep the parsed index in memory and refresh() it incrementally,
+reading only the lines appended since the last call. The latest fetch can
+also be found from the last index line alone (latest_record()). A torn last
+line (writer crashed mid-append) is ignored by readers and repaired by the
+next writer: segment lines the index does not know about are indexed, a
+partial segment line is cut off.
+
+COMPATIBILITY:
+step5_reader's functions accept either a legacy step5.json or a store
+directory, so alerts, the manager, the daemon and replay work unchanged when
+STEP5_JSON / --step5 points at a store.
+
+Usage:
+    python3 snapshot_store.py convert step5.json store/   # import (incremental)
+    python3 snapshot_store.py latest store/
+    python3 snapshot_store.py list store/
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from json_backend import decode
+
+INDEX_NAME = "index.jsonl"
+SEGMENT_PREFIX = "step5_"
+SEGMENT_SUFFIX = ".ndjson"
+
+# Segment day for fetches whose generated_at cannot be parsed
+UNDATED_SEGMENT = "undated"
+
+# How much of the index tail latest_record() reads first
+INDEX_TAIL_SIZE = 4096
+
+def is_snapshot_store(path):
+    """True if path is a snapshot store directory (not a legacy step5.json)"""
+    return Path(path).is_dir()
+
+def segment_name(generated_at):
+    """Segment file for a fetch ("05/28/2025 11:05:04 PM EDT" -> step5_20250528.ndjson)"""
+    try:
+        day = datetime.strptime(generated_at.split(" ", 1)[0], "%m/%d/%Y").strftime("%Y%m%d")
+    except (AttributeError, ValueError):
+        day = UNDATED_SEGMENT
+    return f"{SEGMENT_PREFIX}{day}{SEGMENT_SUFFIX}"
+
+def _parse_index_line(line):
+    """(generated_at, segment, offset, length) of one index line, None if torn / invalid"""
+    try:
+        generated_at, segment, offset, length = json.loads(line)
+    except ValueError:
+        return None
+    return generated_at, segment, offset, length
+
+def _append_synced(path, data):
+    """Append bytes and fsync; returns the offset they were written at"""
+    with open(path, 'ab') as f:
+        offset = f.seek(0, os.SEEK_END)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return offset
+
+class SnapshotStore:
+    """Reader / writer of one store directory"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.index_path = self.directory / INDEX_NAME
+        self.records = []    # [(generated_at, segment, offset, length)] oldest first
+        self.positions = {}  # generated_at -> position in records (newest wins)
+        self._index_read = 0
+        self._index_inode = None
+        self._recovered = False
+
+    def refresh(self):
+        """Read index lines appended since the last refresh (reloads if the index was replaced)"""
+        try:
+            st = self.index_path.stat()
+        except FileNotFoundError:
+            st = None
+        inode = st.st_ino if st is not None else None
+        if inode != self._index_inode or (st is not None and st.st_size < self._index_read):
+            self.records, self.positions = [], {}
+            self._index_read = 0
+            self._index_inode = inode
+        if st is None or st.st_size == self._index_read:
+            return self
+
+        with open(self.index_path, 'rb') as f:
+            f.seek(self._index_read)
+            data = f.read()
+        complete = data.rfind(b"\n") + 1  # a torn last line is left for later
+        for line in data[:complete].splitlines():
+            record = _parse_index_line(line)
+            if record is not None:
+                self.positions[record[0]] = len(self.records)
+                self.records.append(record)
+        self._index_read += complete
+        return self
+
+    def latest_record(self):
+        """Index record of the newest fetch from the index tail only, None if the store is empty"""
+        try:
+            fd = os.open(self.index_path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            size = os.fstat(fd).st_size
+            tail_size = INDEX_TAIL_SIZE
+            while True:
+                start = max(0, size - tail_size)
+                lines = os.pread(fd, size - start, start).split(b"\n")
+                if start > 0:
+                    lines = lines[1:]  # first line may be cut by the tail window
+                # Newest first; the final piece is empty or a torn line
+                for line in reversed(lines[:-1]):
+                    record = _parse_index_line(line)
+                    if record is not None:
+                        return record
+                if start == 0:
+                    return None
+                tail_size *= 4
+        finally:
+            os.close(fd)
+
+    def generated_at_list(self):
+        """generated_at of every stored fetch, oldest first"""
+        return [record[0] for record in self.refresh().records]
+
+    def read_record(self, record):
+        """Decode the fetch an index record points at (one pread)"""
+        _, segment, offset, length = record
+        fd = os.open(self.directory / segment, os.O_RDONLY)
+        try:
+            data = os.pread(fd, length, offset)
+        finally:
+            os.close(fd)
+        if len(data) != length:
+            raise ValueError(f"{segment} is shorter than its index ({offset}+{length})")
+        return decode(data)
+
+    def latest(self):
+        """Newest fetch, None if the store is empty"""
+        record = self.latest_record()
+        return self.read_record(record) if record is not None else None
+
+    def get(self, generated_at):
+        """The fetch with this generated_at (KeyError if it is not stored)"""
+        self.refresh()
+        return self.read_record(self.records[self.positions[generated_at]])
+
+    def iter_entries(self, select=None):
+        """Every fetch oldest first, decoded one at a time (select: predicate on generated_at)"""
+        for record in list(self.refresh().records):
+            if select is None or select(record[0]):
+                yield self.read_record(record)
+
+    def since(self, last_generated_at, max_entries=None):
+        """(fetches newer than last_generated_at oldest first, skipped) - same contract as read_history_since"""
+        newer = []
+        for record in reversed(self.refresh().records):
+            if record[0] == last_generated_at:
+                break
+            newer.append(record)
+        skipped = max(0, len(newer) - max_entries) if max_entries is not None else 0
+        if max_entries is not None:
+            newer = newer[:max_entries]
+        return [self.read_record(record) for record in reversed(newer)], skipped
+
+    def recover(self):
+        """Index segment lines a crashed writer left unindexed and cut off a partial line"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.index_path.exists():
+            with open(self.index_path, 'rb+') as f:
+                size = f.seek(0, os.SEEK_END)
+                # Index lines are short - a torn one is always inside the tail
+                start = max(0, size - INDEX_TAIL_SIZE)
+                f.seek(start)
+                complete = start + f.read().rfind(b"\n") + 1
+                if complete != size:
+                    f.truncate(complete)
+        self.refresh()
+
+        indexed_end = {}
+        for _, segment, offset, length in self.records:
+            indexed_end[segment] = max(indexed_end.get(segment, 0), offset + length + 1)
+        newest = self.records[-1][1] if self.records else None
+        for path in sorted(self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")):
+            if newest is not None and path.name < newest:
+                continue  # only the newest segments can hold a torn append
+            start = indexed_end.get(path.name, 0)
+            with open(path, 'rb+') as f:
+                f.seek(start)
+                data = f.read()
+                complete = data.rfind(b"\n") + 1
+                if complete != len(data):
+                    f.truncate(start + complete)
+            offset = start
+            for line in data[:complete].split(b"\n")[:-1]:
+                try:
+                    generated_at = decode(line).get("generated_at")
+                except (ValueError, AttributeError):
+                    generated_at = None
+                if generated_at is not None:
+                    self._append_index(generated_at, path.name, offset, len(line))
+                offset += len(line) + 1
+        self._recovered = True
+        return self
+
+    def _append_index(self, generated_at, segment, offset, length):
+        record = [generated_at, segment, offset, length]
+        _append_synced(self.index_path, json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.refresh()
+
+    def append(self, entry):
+        """Store one fetch ({"generated_at", "matches", ...}); returns its index record"""
+        if not self._recovered:
+            self.recover()  # repair a previous writer's crash before appending after it
+        generated_at = entry.get("generated_at", "Unknown")
+        line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        segment = segment_name(generated_at)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Segment first: a crash before the index line only leaves an unindexed line
+        offset = _append_synced(self.directory / segment, line + b"\n")
+        self._append_index(generated_at, segment, offset, len(line))
+        return self.records[-1]
+
+    def fingerprint(self):
+        """[inode, size, mtime_ns] of the index - changes with every appended fetch"""
+        st = self.index_path.stat()
+        return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+_open_stores = {}
+
+def open_store(directory):
+    """Shared, refreshed SnapshotStore for a directory (the index is parsed once per process)"""
+    key = str(Path(directory).resolve())
+    store = _open_stores.get(key)
+    if store is None:
+        store = _open_stores[key] = SnapshotStore(directory)
+    return store.refresh()
+
+def convert_step5(step5_path, directory):
+    """Append every fetch of a legacy step5.json the store does not have yet; returns (added, already stored)"""
+    # step5_reader itself reads stores - imported here to keep the import one-way
+    from step5_reader import iter_history_entries
+
+    store = SnapshotStore(directory).recover()
+    known = len(store.positions)
+    added = 0
+    # Stored fetches are skipped by generated_at without being decoded
+    for entry in iter_history_entries(step5_path, select=lambda generated_at: generated_at not in store.positions):
+        store.append(entry)
+        added += 1
+    return added, known
+
+def main():
+    parser = argparse.ArgumentParser(description="Segmented NDJSON step5 snapshot store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert = commands.add_parser("convert", help="import a legacy step5.json (only fetches not stored yet)")
+    convert.add_argument("step5", type=Path)
+    convert.add_argument("store", type=Path)
+    latest = commands.add_parser("latest", help="print the newest fetch's generated_at and match count")
+    latest.add_argument("store", type=Path)
+    listing = commands.add_parser("list", help="print every stored fetch")
+    listing.add_argument("store", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        added, known = convert_step5(args.step5, args.store)
+        print(f"Snapshot Store: Added {added} fetches to {args.store} ({known} already stored)")
+    elif args.command == "latest":
+        entry = SnapshotStore(args.store).latest()
+        if entry is None:
+            print(f"Snapshot Store: {args.store} is empty")
+        else:
+            print(f"Snapshot Store: {entry.get('generated_at')} - {len(entry.get('matches', {}))} matches")
+    else:
+        for generated_at, segment, offset, length in SnapshotStore(args.store).refresh().records:
+            print(f"{generated_at:<30} {segment:<26} {offset:>12} {length:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Step5 Snapshot Reader - Latest Fetch Only
+=========================================
+
+Reads ONLY the newest fetch out of step5.json without decoding the whole
+history array.
+
+step5.json comes in two layouts:
+
+1. History layout: {"history": [{fetch}, {fetch}, ...], ...}
+2. Flat layout:    {"generated_at": "...", "matches": {...}}
+
+For the history layout the file is memory-mapped and scanned backwards from
+the closing brace: the last top-level array is located, its final element is
+bracket-matched in reverse (skipping over string contents) and only that
+slice is decoded. Parse time and memory therefore depend on the size of the
+latest fetch, not on how much history has piled up during the day. Decoding
+goes through json_backend.decode() - orjson or msgspec when installed,
+stdlib json otherwise, with identical results.
+
+Anything the backward scanner does not recognise falls back to a full
+decode, so the result is always the same as the original
+`step5_data["history"][-1]` logic.
+
+The same scanner backs iter_history_entries(), which streams EVERY history
+entry oldest first for replays: only entry offsets are collected up front
+and each entry is decoded on its own, so memory stays at one entry. And
+read_history_since(), which decodes only the entries newer than a given
+generated_at, for catching up on missed fetches.
+
+SNAPSHOT STORES:
+Every function also accepts a snapshot store directory (snapshot_store.py,
+one NDJSON line per fetch plus an offset index) in place of step5.json.
+There each fetch is one pread of exactly its bytes, and the fingerprint /
+watch target is the store's index file.
+"""
+
+import json
+import mmap
+import re
+from pathlib import Path
+
+from json_backend import decode
+from snapshot_store import INDEX_NAME, SnapshotStore, is_snapshot_store, open_store
+
+# Whitespace allowed between JSON tokens
+JSON_WHITESPACE = b" \t\r\n"
+
+# Structural characters the reverse bracket matcher cares about
+STRUCTURAL_CHARS = re.compile(rb'[{}"]')
+
+# How far back to look per regex pass while bracket matching
+SCAN_CHUNK_SIZE = 64 * 1024
+
+# How much of the file tail peek_generated_at() reads
+TAIL_PEEK_SIZE = 64 * 1024
+
+# "generated_at": "<value>" with JSON string escapes allowed in the value
+GENERATED_AT_PATTERN = re.compile(rb'"generated_at"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+def _skip_whitespace_back(buf, pos):
+    """Move pos backwards past JSON whitespace, return new position"""
+    while pos >= 0 and buf[pos] in JSON_WHITESPACE:
+        pos -= 1
+    return pos
+
+def _is_escaped(buf, pos):
+    """True if the character at pos is preceded by an odd number of backslashes"""
+    backslashes = 0
+    pos -= 1
+    while pos >= 0 and buf[pos] == 0x5C:  # '\'
+        backslashes += 1
+        pos -= 1
+    return backslashes % 2 == 1
+
+def _string_start(buf, end):
+    """Given the closing quote of a string at end, return its opening quote position"""
+    pos = end
+    while True:
+        pos = buf.rfind(b'"', 0, pos)
+        if pos < 0:
+            raise ValueError("unterminated string")
+        if not _is_escaped(buf, pos):
+            return pos
+
+def _object_start(buf, end):
+    """Given a closing '}' at end, return the position of its matching '{'"""
+    depth = 0
+    in_string = False
+    chunk_end = end + 1
+    while chunk_end > 0:
+        chunk_start = max(0, chunk_end - SCAN_CHUNK_SIZE)
+        hits = [m.start() + chunk_start for m in STRUCTURAL_CHARS.finditer(buf[chunk_start:chunk_end])]
+        for pos in reversed(hits):
+            char = buf[pos]
+            if char == 0x22:  # '"'
+                if not _is_escaped(buf, pos):
+                    in_string = not in_string
+            elif in_string:
+                continue
+            elif char == 0x7D:  # '}'
+                depth += 1
+            else:  # '{'
+                depth -= 1
+                if depth == 0:
+                    return pos
+        chunk_end = chunk_start
+    raise ValueError("unbalanced object")
+
+def _value_start(buf, end):
+    """Return the start position of the scalar/object value ending at end"""
+    char = buf[end]
+    if char == 0x22:
+        return _string_start(buf, end)
+    if char == 0x7D:
+        return _object_start(buf, end)
+    if char == 0x5D:  # ']' - arrays are handled by the caller
+        raise ValueError("unexpected array")
+    # Number or literal (true/false/null)
+    pos = end
+    while pos >= 0 and buf[pos] not in b",:[{" and buf[pos] not in JSON_WHITESPACE:
+        pos -= 1
+    return pos + 1
+
+def _history_array_end(buf):
+    """
+    Walk the top-level object backwards and return the position of the ']'
+    closing the trailing history array, or None if the layout is not recognised.
+    """
+    pos = _skip_whitespace_back(buf, len(buf) - 1)
+    if pos < 0 or buf[pos] != 0x7D:
+        return None
+    pos -= 1
+
+    while True:
+        pos = _skip_whitespace_back(buf, pos)
+        if pos < 0 or buf[pos] == 0x7B:  # reached '{' - no history array
+            return None
+
+        if buf[pos] == 0x5D:  # ']' - candidate history array
+            return pos
+
+        # Skip a small trailing member ("key": value) before the history array
+        pos = _value_start(buf, pos) - 1
+        pos = _skip_whitespace_back(buf, pos)
+        if pos < 0 or buf[pos] != 0x3A:  # ':'
+            return None
+        pos = _skip_whitespace_back(buf, pos - 1)
+        if pos < 0 or buf[pos] != 0x22:
+            return None
+        pos = _string_start(buf, pos) - 1
+        pos = _skip_whitespace_back(buf, pos)
+        if pos < 0:
+            return None
+        if buf[pos] == 0x2C:  # ',' - another member before this one
+            pos -= 1
+            continue
+        return None  # member was the first key, no history array found
+
+def _history_entry_spans(buf, array_end):
+    """Yield (start, end) of each object in the array closing at array_end, newest first"""
+    pos = _skip_whitespace_back(buf, array_end - 1)
+    while pos >= 0 and buf[pos] != 0x5B:  # stop at the opening '['
+        if buf[pos] != 0x7D:
+            raise ValueError("history is not an array of objects")
+        start = _object_start(buf, pos)
+        yield start, pos
+        pos = _skip_whitespace_back(buf, start - 1)
+        if pos >= 0 and buf[pos] == 0x2C:  # ',' - another entry before this one
+            pos = _skip_whitespace_back(buf, pos - 1)
+        elif pos < 0 or buf[pos] != 0x5B:
+            raise ValueError("malformed history array")
+
+def _tail_history_entry(buf):
+    """Return the last element of the trailing history array, or None if the layout is not recognised"""
+    array_end = _history_array_end(buf)
+    if array_end is None:
+        return None
+    for elem_start, elem_end in _history_entry_spans(buf, array_end):
+        entry = decode(buf[elem_start:elem_end + 1])
+        if isinstance(entry, dict) and "matches" in entry:
+            return entry
+        return None
+    return None  # empty history
+
+def _span_generated_at(buf, start, end):
+    """generated_at of the entry at buf[start:end], read without decoding the entry"""
+    found = GENERATED_AT_PATTERN.search(buf, start, end)
+    if found is None:
+        return None
+    return json.loads(b'"' + found.group(1) + b'"')
+
+def _snapshot_from_data(step5_data):
+    """Original full-document logic: latest history entry or flat layout"""
+    if "history" in step5_data and step5_data["history"]:
+        latest_data = step5_data["history"][-1]  # Only the most recent fetch
+        return latest_data.get("matches", {}), latest_data.get("generated_at", "Unknown")
+    return step5_data.get("matches", {}), step5_data.get("generated_at", "Unknown")
+
+def read_latest_snapshot(step5_path):
+    """
+    Return (matches, generated_at) for the newest fetch in step5.json.
+
+    Only the last history entry is decoded; the flat layout and any layout
+    the backward scanner does not understand are decoded in full.
+    """
+    if is_snapshot_store(step5_path):
+        entry = SnapshotStore(step5_path).latest()
+        if entry is None:
+            raise ValueError("snapshot store is empty")
+        return entry.get("matches", {}), entry.get("generated_at", "Unknown")
+
+    step5_path = Path(step5_path)
+    with open(step5_path, 'rb') as f:
+        if step5_path.stat().st_size == 0:
+            raise ValueError("step5.json is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            try:
+                entry = _tail_history_entry(buf)
+            except ValueError:
+                entry = None
+
+            if entry is not None:
+                return entry.get("matches", {}), entry.get("generated_at", "Unknown")
+
+            return _snapshot_from_data(decode(buf[:]))
+
+def stat_fingerprint(step5_path):
+    """
+    Return [inode, size, mtime_ns] for step5.json.
+
+    Used as a pre-check before any parsing: if the fingerprint matches the
+    one stored with the alert state, the file has not been rewritten.
+    A list (not a tuple) so it round-trips through json unchanged.
+    """
+    st = Path(watch_target(step5_path)).stat()
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+def watch_target(step5_path):
+    """File whose writes signal a new fetch: step5.json itself, or a store's index"""
+    if is_snapshot_store(step5_path):
+        return Path(step5_path) / INDEX_NAME
+    return Path(step5_path)
+
+def peek_generated_at(step5_path, tail_bytes=TAIL_PEEK_SIZE):
+    """
+    Return the last generated_at found in the file tail, or None.
+
+    Only the final tail_bytes are read. The newest fetch is always the last
+    thing in the file, so the last generated_at in the tail belongs to it.
+    Used only to confirm an unchanged fetch, never to decide that a fetch
+    is new - a miss simply means the file gets parsed.
+    """
+    if is_snapshot_store(step5_path):
+        record = SnapshotStore(step5_path).latest_record()
+        return record[0] if record is not None else None
+
+    with open(step5_path, 'rb') as f:
+        f.seek(0, 2)
+        size = f.tell()
+        f.seek(max(0, size - tail_bytes))
+        tail = f.read()
+
+    found = None
+    for found in GENERATED_AT_PATTERN.finditer(tail):
+        pass
+    if found is None:
+        return None
+    try:
+        return json.loads(b'"' + found.group(1) + b'"')
+    except ValueError:
+        return None
+
+def load_snapshot(step5_path):
+    """
+    Stat and parse step5.json once, for sharing between several alerts.
+
+    Returns {"matches", "generated_at", "fetch_stat", "path"}, the shape
+    AlertRunner.check_alert(snapshot=...) accepts. The stat is taken before
+    the read so the fingerprint is never newer than the content.
+    """
+    fetch_stat = stat_fingerprint(step5_path)
+    matches, generated_at = read_latest_snapshot(step5_path)
+    return {"matches": matches, "generated_at": generated_at, "fetch_stat": fetch_stat, "path": str(step5_path)}
+
+def _history_spans(buf):
+    """(start, end) of every history entry oldest first, or None if the layout is not recognised"""
+    try:
+        array_end = _history_array_end(buf)
+        spans = list(_history_entry_spans(buf, array_end)) if array_end is not None else None
+    except ValueError:
+        return None
+    if spans is None:
+        return None
+    if spans and buf.find(b'"matches"', spans[0][0], spans[0][1]) < 0:
+        return None  # trailing array is not a list of fetches
+    spans.reverse()
+    return spans
+
+def iter_history_entries(step5_path, select=None):
+    """
+    Yield every history entry of step5.json, oldest first, one at a time.
+
+    select: optional predicate on an entry's generated_at string; entries it
+    rejects are skipped without being decoded. The flat layout yields its
+    single snapshot.
+    """
+    if is_snapshot_store(step5_path):
+        yield from open_store(step5_path).iter_entries(select)
+        return
+
+    step5_path = Path(step5_path)
+    with open(step5_path, 'rb') as f:
+        if step5_path.stat().st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            spans = _history_spans(buf)
+            if spans is not None:
+                for start, end in spans:
+                    if select is not None and not select(_span_generated_at(buf, start, end + 1)):
+                        continue
+                    entry = decode(buf[start:end + 1])
+                    if isinstance(entry, dict):
+                        yield entry
+                return
+
+            # Unrecognised layout: full decode, same entries
+            step5_data = decode(buf[:])
+    entries = step5_data["history"] if "history" in step5_data else [step5_data]
+    for entry in entries:
+        if select is None or select(entry.get("generated_at")):
+            yield entry
+
+def history_generated_at(step5_path):
+    """generated_at of every history entry, oldest first, without decoding the entries"""
+    if is_snapshot_store(step5_path):
+        return open_store(step5_path).generated_at_list()
+
+    step5_path = Path(step5_path)
+    with open(step5_path, 'rb') as f:
+        if step5_path.stat().st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            spans = _history_spans(buf)
+            if spans is not None:
+                return [_span_generated_at(buf, start, end + 1) for start, end in spans]
+    return [entry.get("generated_at") for entry in iter_history_entries(step5_path)]
+
+def read_history_since(step5_path, last_generated_at, max_entries=None):
+    """
+    Decode only the history entries newer than last_generated_at, oldest first.
+
+    The history array is walked backwards from the newest entry until
+    last_generated_at is found; older entries are never decoded. If it is
+    not found every entry counts as newer. At most max_entries (the newest
+    ones) are returned.
+
+    Returns (entries, skipped) - skipped is how many newer entries were
+    dropped by max_entries.
+    """
+    if is_snapshot_store(step5_path):
+        return open_store(step5_path).since(last_generated_at, max_entries)
+
+    step5_path = Path(step5_path)
+    with open(step5_path, 'rb') as f:
+        if step5_path.stat().st_size == 0:
+            return [], 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            newer = None
+            try:
+                array_end = _history_array_end(buf)
+                if array_end is not None:
+                    newer = []
+                    for start, end in _history_entry_spans(buf, array_end):
+                        if not newer and buf.find(b'"matches"', start, end) < 0:
+                            newer = None  # trailing array is not a list of fetches
+                            break
+                        if _span_generated_at(buf, start, end + 1) == last_generated_at:
+                            break
+                        newer.append((start, end))
+            except ValueError:
+                newer = None
+
+            if newer is not None:
+                skipped = max(0, len(newer) - max_entries) if max_entries is not None else 0
+                if max_entries is not None:
+                    newer = newer[:max_entries]
+                return [decode(buf[start:end + 1]) for start, end in reversed(newer)], skipped
+
+            # Unrecognised layout: full decode, same entries
+            step5_data = decode(buf[:])
+    entries = step5_data["history"] if "history" in step5_data else [step5_data]
+    newer = []
+    for entry in reversed(entries):
+        if entry.get("generated_at") == last_generated_at:
+            break
+        newer.append(entry)
+    skipped = max(0, len(newer) - max_entries) if max_entries is not None else 0
+    if max_entries is not None:
+        newer = newer[:max_entries]
+    return newer[::-1], skipped
+
+def read_fetch(step5_path, generated_at):
+    """
+    Decode the one fetch with this generated_at, None if it is not there.
+
+    A snapshot store answers with a single pread; a legacy step5.json is
+    scanned by generated_at and only the matching entry is decoded.
+    """
+    if is_snapshot_store(step5_path):
+        store = open_store(step5_path)
+        return store.get(generated_at) if generated_at in store.positions else None
+    for entry in iter_history_entries(step5_path, select=lambda found: found == generated_at):
+        return entry
+    return None
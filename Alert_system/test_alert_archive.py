@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the alert archive
+=================================
+
+Imports the shipped text logs (every block format they contain), checks the
+lookups by match, competition, alert, time and team name, and that importing
+or archiving twice never duplicates an alert.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+import alert_archive
+from alert_archive import AlertArchive, alert_record, import_log, parse_alert_log, parse_since
+
+ALERT_SYSTEM_DIR = Path(__file__).parent
+OU_3_LOG = ALERT_SYSTEM_DIR / "ou_3" / "ou_3.log"
+NO_SCORE_LOG = ALERT_SYSTEM_DIR / "ou_3_no_score" / "ou_3_no_score.log"
+
+def block_count(log_path):
+    """Alert blocks in a log - one "Found:" line each"""
+    return sum(1 for line in log_path.read_text().splitlines() if line.strip().startswith("Found: "))
+
+def test_imports_every_block_of_the_shipped_logs(tmp_path):
+    """Old "MATCH n of m" and current "ALERT #n" blocks are parsed; a second import adds nothing"""
+    archive = AlertArchive(tmp_path / "archive.db")
+    assert import_log(archive, OU_3_LOG) == (block_count(OU_3_LOG), block_count(OU_3_LOG))
+    assert import_log(archive, NO_SCORE_LOG) == (block_count(NO_SCORE_LOG), block_count(NO_SCORE_LOG))
+    assert import_log(archive, OU_3_LOG) == (0, block_count(OU_3_LOG))
+
+    first = archive.query(alert="ou_3", limit=1)[0]
+    assert {key: first[key] for key in ("alert_number", "found_at", "match_id", "competition_id", "competition",
+                                        "country", "home_team", "away_team", "status_id", "lines", "found_date")} == {
+        "alert_number": 1, "found_at": "05/28/2025 10:46:27 PM EDT", "match_id": "y39mp1hzgn5xmoj",
+        "competition_id": "kn54qllhg2qvy9d", "competition": "United States Major League Soccer",
+        "country": "United States", "home_team": "Portland Timbers", "away_team": "Colorado Rapids",
+        "status_id": 2, "lines": "3.0", "found_date": "2025-05-28"}
+    assert archive.count(by="alert") == [("ou_3", block_count(OU_3_LOG)), ("ou_3_no_score", block_count(NO_SCORE_LOG))]
+    archive.close()
+
+def test_starred_lines_are_the_qualifying_ones():
+    """Blocks listing every O/U line keep only the starred ones"""
+    text = "\n".join([
+        "OU 3.0+ ALERT #7".center(80), "Found: 05/29/2025 01:02:03 AM EDT".center(80),
+        "Match ID: m1".center(80), "Competition ID: N/A".center(80), "",
+        "Competition: None (None)", "Match: Home FC vs Away FC", "Score: 1 - 1", "Status: Second Half (ID: 4)",
+        "--- MATCH BETTING ODDS ---",
+        "│ O/U:    │ Over: -110 │ Line: 2.5   │ Under: -110 │ (@70')",
+        "│ O/U:    │ Over: -110 │ Line: 3.5   │ Under: -110 │ (@70') ★",
+        "│ O/U:    │ Over: -110 │ Line: 3     │ Under: -110 │ (@70') ★",
+    ])
+    (alert,) = parse_alert_log(text)
+    assert alert["alert_number"] == "7" and alert["lines"] == "3.0|3.5" and alert["status_id"] == "4"
+    record = dict(zip(alert_archive.COLUMNS, alert_record("ou_3", 7, alert, alert["found_at"], alert["lines"],
+                                                          store_match=False)))
+    assert record["competition_id"] is None and record["competition"] is None and record["match"] is None
+
+def test_lookups_by_match_competition_time_and_team(tmp_path):
+    """Filters combine; --since / --until are local days; team names match by word prefix"""
+    archive = AlertArchive(tmp_path / "archive.db")
+    records = [
+        alert_record("ou_3", 1, {"match_id": "a", "competition_id": "c1", "home_team": "Portland Timbers",
+                                 "away_team": "Colorado Rapids"}, "05/27/2025 11:30:00 PM EDT", "3.0"),
+        alert_record("ou_3", 2, {"match_id": "a", "competition_id": "c1", "home_team": "Portland Timbers",
+                                 "away_team": "Colorado Rapids"}, "05/28/2025 09:00:00 PM EDT", "3.5"),
+        alert_record("ou_3_no_score", 1, {"match_id": "b", "competition_id": "c2", "home_team": "Davis Legacy SC",
+                                          "away_team": "Project 51O"}, "05/28/2025 10:00:00 PM EDT", "3.0"),
+    ]
+    assert alert_archive.archive_alerts(records, tmp_path / "archive.db") == 3
+    assert alert_archive.archive_alerts(records, tmp_path / "archive.db") == 0
+
+    may_28 = {"since": parse_since("2025-05-28"), "until": parse_since("2025-05-29")}
+    assert [row["alert_number"] for row in archive.query(match_id="a", **may_28)] == [2]
+    assert archive.count(competition_id="c1") == 2
+    assert archive.count(by="day") == [("2025-05-28", 2), ("2025-05-27", 1)]
+    assert [row["match_id"] for row in archive.query(team="portl rapids")] == ["a", "a"]
+    assert archive.count(team="legacy", alert="ou_3") == 0
+    archive.close()
+
+def test_query_cli(tmp_path, capsys):
+    """import / query / count subcommands"""
+    db = str(tmp_path / "archive.db")
+    alert_archive.main(["--archive", db, "import", str(NO_SCORE_LOG)])
+    alert_archive.main(["--archive", db, "query", "--team", "portland", "--since", "2025-05-28 23:00"])
+    alert_archive.main(["--archive", db, "count", "--competition", "kn54qllhg2qvy9d", "--by", "alert"])
+    output = capsys.readouterr().out.splitlines()
+    assert output[0].startswith(f"Alert Archive: Imported {block_count(NO_SCORE_LOG)} of")
+    assert "Portland Timbers vs Colorado Rapids" in output[1]
+    assert output[-1].split() == ["ou_3_no_score", str(block_count(NO_SCORE_LOG))]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the Alert Daemon watchers
+=========================================
+
+Checks that both the inotify watcher and the stat-polling fallback wake up
+on an atomic rename of step5.json and ignore unrelated files, and that the
+daemon's latency line is only printed once the alert block is on disk.
+"""
+
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+import alert_daemon
+from alert_daemon import InotifyWatcher, create_watcher, run_daemon
+from alert_log import emit_alert_block, setup_queued_logger
+
+def replace_later(step5, delay=0.05):
+    """Atomically rename a new step5.json into place from another thread"""
+    def writer():
+        time.sleep(delay)
+        tmp = step5.with_suffix(".tmp")
+        tmp.write_text('{"history": []}')
+        os.replace(tmp, step5)
+    thread = threading.Thread(target=writer)
+    thread.start()
+    return thread
+
+@pytest.mark.parametrize("kind", ["inotify", "poll"])
+def test_watcher_wakes_on_atomic_rename(tmp_path, kind):
+    """An atomic rename of step5.json is reported well within the timeout"""
+    step5 = tmp_path / "step5.json"
+    step5.write_text('{"history": []}')
+    try:
+        watcher = create_watcher(step5, kind, poll_interval=0.01)
+    except OSError:
+        pytest.skip("inotify not available")
+
+    thread = replace_later(step5)
+    try:
+        assert watcher.wait(timeout=2.0) is not None
+    finally:
+        thread.join()
+        watcher.close()
+
+def test_inotify_ignores_other_files(tmp_path):
+    """Writes to neighbouring files do not trigger a cycle"""
+    step5 = tmp_path / "step5.json"
+    step5.write_text('{"history": []}')
+    try:
+        watcher = InotifyWatcher(step5)
+    except OSError:
+        pytest.skip("inotify not available")
+
+    (tmp_path / "step4.json").write_text("{}")
+    try:
+        assert watcher.wait(timeout=0.1) is None
+    finally:
+        watcher.close()
+
+class OneWriteWatcher:
+    """Reports a single step5.json write, then stops the daemon"""
+
+    def __init__(self, log_file):
+        self.log_file = log_file
+        self.events = 0
+        self.log_at_next_wait = None
+
+    def wait(self, timeout=None):
+        self.events += 1
+        if self.events == 1:
+            return time.perf_counter()
+        # The latency line of the first cycle has been printed by now
+        self.log_at_next_wait = self.log_file.read_text()
+        raise KeyboardInterrupt
+
+    def close(self):
+        pass
+
+def test_daemon_latency_covers_the_log_write(tmp_path, monkeypatch, capsys):
+    """A slow log write is part of the reported latency and lands before the line is printed"""
+    log_file = tmp_path / "slow.log"
+    logger = setup_queued_logger("daemon_latency_test", log_file)
+    watcher = OneWriteWatcher(log_file)
+
+    def fake_cycle(alerts, step5_path, executor, max_workers):
+        emit_alert_block(logger, ["ALERT one", "ALERT two"], console_echo=False)
+        return {"fake": {"matches": [{"match_id": "1"}]}}
+
+    file_emit = logging.FileHandler.emit
+
+    def slow_emit(self, record):
+        time.sleep(0.2)
+        file_emit(self, record)
+
+    monkeypatch.setattr(logging.FileHandler, "emit", slow_emit)
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: None)
+    monkeypatch.setattr(alert_daemon, "load_resident_alerts", lambda console_echo: {"fake": None})
+    monkeypatch.setattr(alert_daemon, "load_dispatch_config", lambda: {"enabled": False})
+    monkeypatch.setattr(alert_daemon, "create_watcher", lambda target, kind, interval: watcher)
+    monkeypatch.setattr(alert_daemon, "run_cycle", fake_cycle)
+
+    run_daemon(tmp_path / "step5.json", watcher_kind="poll")
+
+    (line,) = [l for l in capsys.readouterr().out.splitlines() if "after step5.json write" in l]
+    latency_ms = float(line.split("written ")[1].split(" ms")[0])
+    assert latency_ms >= 200
+    assert "(1 alerts fired)" in line
+    assert watcher.log_at_next_wait == "ALERT one\nALERT two\n"
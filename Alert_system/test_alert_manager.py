@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Test script for the Alert Manager
+=================================
+
+Discovers the real alert modules, redirects their state, log and metrics
+files into a temporary directory and checks that one cycle parses step5.json
+exactly once no matter how many alerts run.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+import alert_manager
+import alert_runner
+import step5_reader
+
+def write_step5(path, generated_at="05/28/2025 11:05:04 PM EDT", extra_matches=None):
+    """Write a step5.json with one live 3.5 match and one 0-0 half-time 3.0 match"""
+    matches = {
+        "live_001": {
+            "match_id": "live_001", "home_team": "A", "away_team": "B",
+            "status_id": 2, "home_score": 1, "away_score": 0,
+            "over_under": {"line_1": {"line": 3.5, "over": "-110", "under": "-110", "time": "10"}},
+        },
+        "ht_002": {
+            "match_id": "ht_002", "home_team": "C", "away_team": "D",
+            "status_id": 3, "home_score": 0, "away_score": 0,
+            "over_under": {"line_1": {"line": 3.0, "over": "-105", "under": "-115", "time": "45"}},
+        },
+    }
+    matches.update(extra_matches or {})
+    path.write_text(json.dumps({"history": [{"generated_at": generated_at, "matches": matches}]}))
+
+@pytest.fixture
+def isolated_alerts(tmp_path, monkeypatch):
+    """Discover alerts and point all their files into tmp_path"""
+    monkeypatch.setattr(alert_manager, "_previous_hashes", {})
+    alerts = alert_manager.discover_alerts()
+    for name, module_path in alerts.items():
+        module = alert_manager.load_alert_module(module_path)
+        alert_tmp = tmp_path / name
+        alert_tmp.mkdir()
+        monkeypatch.setattr(module, "base_dir", alert_tmp)  # metrics files
+        monkeypatch.setattr(module, "log_file", alert_tmp / f"{name}.log")
+        monkeypatch.setattr(module, "archive_file", tmp_path / "alert_archive.db")
+        monkeypatch.setattr(module, "processed_matches_file", alert_tmp / "processed_matches.json")
+        monkeypatch.setattr(module, "dedup_store_file", alert_tmp / "processed_matches.jsonl")
+        monkeypatch.setattr(module, "daily_counter_file", alert_tmp / "daily_alert_count.json")
+
+    def no_parsing(path):
+        raise AssertionError("alert parsed step5.json itself")
+
+    monkeypatch.setattr(alert_runner, "read_latest_snapshot", no_parsing)
+    return alerts
+
+def configure(monkeypatch, alerts, **sections):
+    """Override config sections of every alert (catch_up and archive ship disabled)"""
+    for module_path in alerts.values():
+        module = alert_manager.load_alert_module(module_path)
+        config = {**module.load_config(), **sections}
+        monkeypatch.setattr(module, "load_config", lambda config=config: config)
+
+def test_discovers_existing_alerts():
+    """Both shipped alerts are found by directory convention"""
+    alerts = alert_manager.discover_alerts()
+    assert {"ou_3", "ou_3_no_score"} <= set(alerts)
+
+def test_an_alert_is_only_a_config(tmp_path, monkeypatch):
+    """A <name>/<name>.json with criteria is discovered and run by the shared runner"""
+    from alert_log import stop_alert_listeners
+
+    monkeypatch.setattr(alert_manager, "_previous_hashes", {})
+    alert_dir = tmp_path / "alerts"
+    for name, config in [("ou_4", {"criteria": {"min_ou_line": 3.5, "status_ids": [2]}}), ("notes", {})]:
+        (alert_dir / name).mkdir(parents=True)
+        (alert_dir / name / f"{name}.json").write_text(json.dumps(config))
+    alerts = alert_manager.discover_alerts(alert_dir)
+    assert alerts == {"ou_4": alert_dir / "ou_4" / "ou_4.json"}
+
+    step5 = tmp_path / "step5.json"
+    write_step5(step5)
+    results = alert_manager.run_cycle(alerts, step5)
+    stop_alert_listeners()
+    assert [m["match_id"] for m in results["ou_4"]["matches"]] == ["live_001"]
+    assert "OU_4 ALERT #1" in (alert_dir / "ou_4" / "ou_4.log").read_text()
+
+@pytest.mark.parametrize("executor", [None, "thread"])
+def test_one_parse_per_cycle(tmp_path, monkeypatch, isolated_alerts, executor):
+    """The manager parses once and every alert works off that snapshot"""
+    step5 = tmp_path / "step5.json"
+    write_step5(step5)
+
+    parse_calls = []
+    real_reader = step5_reader.read_latest_snapshot
+
+    def counting_reader(path):
+        parse_calls.append(path)
+        return real_reader(path)
+
+    monkeypatch.setattr(step5_reader, "read_latest_snapshot", counting_reader)
+    results = alert_manager.run_cycle(isolated_alerts, step5, executor=executor)
+
+    assert len(parse_calls) == 1
+    assert [m["match_id"] for m in results["ou_3"]["matches"]] == ["live_001", "ht_002"]
+    assert [m["match_id"] for m in results["ou_3_no_score"]["matches"]] == ["ht_002"]
+    assert all(result["seconds"] >= 0 for result in results.values())
+
+def test_next_fetch_only_evaluates_changed_matches(tmp_path, isolated_alerts):
+    """Unchanged matches are skipped by the delta, new ones still fire"""
+    step5 = tmp_path / "step5.json"
+    write_step5(step5)
+    alert_manager.run_cycle(isolated_alerts, step5)
+
+    new_match = {
+        "match_id": "live_003", "home_team": "E", "away_team": "F",
+        "status_id": 4, "home_score": 2, "away_score": 1,
+        "over_under": {"line_1": {"line": 4.0, "over": "-120", "under": "+100", "time": "70"}},
+    }
+    write_step5(step5, "05/28/2025 11:06:04 PM EDT", {"live_003": new_match})
+    results = alert_manager.run_cycle(isolated_alerts, step5)
+
+    delta = results["_delta"]["delta"]
+    assert (delta["new"], delta["changed"], delta["unchanged"]) == (["live_003"], [], ["live_001", "ht_002"])
+    assert [m["match_id"] for m in results["ou_3"]["matches"]] == ["live_003"]
+    assert results["ou_3_no_score"]["matches"] == []
+
+def test_missed_fetches_are_caught_up(tmp_path, monkeypatch, isolated_alerts):
+    """A 0-0 half-time that only existed in a skipped fetch still fires"""
+    configure(monkeypatch, isolated_alerts, catch_up={"enabled": True, "max_backlog": 12})
+    step5 = tmp_path / "step5.json"
+    write_step5(step5)
+    alert_manager.run_cycle(isolated_alerts, step5)
+
+    def later_fetch(generated_at, status_id, home_score):
+        match = {
+            "match_id": "ht_010", "home_team": "G", "away_team": "H",
+            "status_id": status_id, "home_score": home_score, "away_score": 0,
+            "over_under": {"line_1": {"line": 3.0, "over": "-105", "under": "-115", "time": "45"}},
+        }
+        return {"generated_at": generated_at, "matches": {"ht_010": match}}
+
+    history = json.loads(step5.read_text())["history"]
+    history.append(later_fetch("05/28/2025 11:06:04 PM EDT", 3, 0))  # missed
+    history.append(later_fetch("05/28/2025 11:07:04 PM EDT", 4, 1))
+    step5.write_text(json.dumps({"history": history}))
+    results = alert_manager.run_cycle(isolated_alerts, step5)
+
+    assert [m["match_id"] for m in results["ou_3_no_score"]["matches"]] == ["ht_010"]
+    assert [m["match_id"] for m in results["ou_3"]["matches"]] == ["ht_010"]
+
+def test_caught_up_alerts_keep_their_fetch_time(tmp_path, monkeypatch, isolated_alerts):
+    """Log, archive and metrics of a missed fetch carry its generated_at, not the catch-up time"""
+    from alert_archive import AlertArchive
+    from alert_log import stop_alert_listeners
+    from metrics import fetch_timestamp
+
+    configure(monkeypatch, isolated_alerts, catch_up={"enabled": True, "max_backlog": 12},
+              archive={"enabled": True}, metrics={"enabled": True, "jsonl": "metrics.jsonl"})
+    module = alert_manager.load_alert_module(isolated_alerts["ou_3_no_score"])
+    monkeypatch.setattr(module, "get_eastern_time", lambda: "05/28/2025 11:09:00 PM EDT")
+    step5 = tmp_path / "step5.json"
+    write_step5(step5, extra_matches={"ht_002": {"match_id": "ht_002", "status_id": 2}})
+    alert_manager.run_cycle(isolated_alerts, step5)
+
+    missed = "05/28/2025 11:06:04 PM EDT"
+    history = json.loads(step5.read_text())["history"]
+    write_step5(step5, missed)
+    history += json.loads(step5.read_text())["history"]
+    write_step5(step5, "05/28/2025 11:07:04 PM EDT")
+    history += json.loads(step5.read_text())["history"]
+    step5.write_text(json.dumps({"history": history}))
+    alert_manager.run_cycle(isolated_alerts, step5)
+    stop_alert_listeners()
+
+    assert f"Found: {missed}" in (tmp_path / "ou_3_no_score" / "ou_3_no_score.log").read_text()
+    archive = AlertArchive(tmp_path / "alert_archive.db")
+    assert [row["found_at"] for row in archive.query(alert="ou_3_no_score")] == [missed]
+    archive.close()
+    records = [json.loads(line) for line in (tmp_path / "ou_3_no_score" / "metrics.jsonl").read_text().splitlines()]
+    caught_up = next(record for record in records if record["generated_at"] == missed)
+    assert caught_up["counts"]["fired"] == 1
+    assert caught_up["ts"] == round(fetch_timestamp(missed, module.tz), 3)
+
+def test_cycle_metrics_are_written_when_enabled(tmp_path, monkeypatch, isolated_alerts):
+    """Each alert exports its cycle to the JSONL stream when metrics are on"""
+    for name, module_path in isolated_alerts.items():
+        module = alert_manager.load_alert_module(module_path)
+        config = {**module.load_config(), "metrics": {"enabled": True, "jsonl": "metrics.jsonl"}}
+        monkeypatch.setattr(module, "load_config", lambda config=config: config)
+
+    step5 = tmp_path / "step5.json"
+    write_step5(step5)
+    alert_manager.run_cycle(isolated_alerts, step5)
+    write_step5(step5, "05/28/2025 11:06:04 PM EDT")
+    alert_manager.run_cycle(isolated_alerts, step5)
+
+    first, second = [json.loads(line) for line in (tmp_path / "ou_3" / "metrics.jsonl").read_text().splitlines()]
+    counts = first["counts"]
+    assert {name: counts[name] for name in ("scanned", "changed", "non_live", "duplicates", "fired")} == {
+        "scanned": 2, "changed": 2, "non_live": 0, "duplicates": 0, "fired": 2}
+    assert {"load", "filter", "dedup", "format", "persist"} <= set(first["stages"])
+    assert first["latency_seconds"] is not None
+    # Nothing changed but the fetch time: only that is appended, not the whole state
+    assert second["counts"]["fired"] == 0
+    assert 0 < second["counts"]["state_bytes_written"] < second["counts"]["state_bytes_full_rewrite"] / 2
+    first, second = [json.loads(line) for line in (tmp_path / "ou_3_no_score" / "metrics.jsonl").read_text().splitlines()]
+    assert first["counts"]["fired"] == 1
+    # Unchanged matches are not re-evaluated but still count as status-rejected
+    assert first["counts"]["non_live"] == second["counts"]["non_live"] == 1
+
+def test_snapshot_store_runs_like_step5(tmp_path, monkeypatch, isolated_alerts):
+    """A snapshot store directory works as --step5, catch-up included"""
+    configure(monkeypatch, isolated_alerts, catch_up={"enabled": True, "max_backlog": 12})
+    from snapshot_store import SnapshotStore
+
+    legacy = tmp_path / "step5.json"
+    write_step5(legacy)
+    store = SnapshotStore(tmp_path / "store")
+    store.append(json.loads(legacy.read_text())["history"][0])
+    results = alert_manager.run_cycle(isolated_alerts, store.directory)
+    assert [m["match_id"] for m in results["ou_3"]["matches"]] == ["live_001", "ht_002"]
+
+    ht_match = {
+        "match_id": "ht_010", "home_team": "G", "away_team": "H", "status_id": 3, "home_score": 0, "away_score": 0,
+        "over_under": {"line_1": {"line": 3.0, "over": "-105", "under": "-115", "time": "45"}},
+    }
+    store.append({"generated_at": "05/28/2025 11:06:04 PM EDT", "matches": {"ht_010": ht_match}})  # missed
+    store.append({"generated_at": "05/28/2025 11:07:04 PM EDT", "matches": {}})
+    results = alert_manager.run_cycle(isolated_alerts, store.directory)
+    assert [m["match_id"] for m in results["ou_3_no_score"]["matches"]] == ["ht_010"]
+    assert alert_manager.run_cycle(isolated_alerts, store.directory)["ou_3"]["matches"] == []
+
+def test_fired_alerts_are_archived(tmp_path, monkeypatch, isolated_alerts):
+    """Every fired alert is also a row in the shared SQLite archive"""
+    from alert_archive import AlertArchive
+
+    configure(monkeypatch, isolated_alerts, archive={"enabled": True})
+
+    step5 = tmp_path / "step5.json"
+    write_step5(step5)
+    alert_manager.run_cycle(isolated_alerts, step5)
+    write_step5(step5, "05/28/2025 11:06:04 PM EDT")
+    alert_manager.run_cycle(isolated_alerts, step5)
+
+    archive = AlertArchive(tmp_path / "alert_archive.db")
+    rows = archive.query()
+    assert [(row["alert"], row["alert_number"], row["match_id"], row["lines"]) for row in rows] == [
+        ("ou_3", 1, "live_001", "3.5"), ("ou_3", 2, "ht_002", "3.0"), ("ou_3_no_score", 1, "ht_002", "3.0")]
+    assert archive.match_json("ou_3", "live_001", rows[0]["found_at"])["home_team"] == "A"
+    assert archive.count(team="C", alert="ou_3_no_score") == 1
+    archive.close()
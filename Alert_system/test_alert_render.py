@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Test script for the alert renderer
+==================================
+
+step6_style is checked against golden alert blocks for both shipped
+alerts and every odds / environment shape; compact, jsonl and html are
+checked for their record shape and escaping, and the configured log_format
+reaches the log file.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+import alert_manager
+from alert_log import stop_alert_listeners
+from alert_render import AlertRenderer, get_renderer
+from match_view import as_view
+
+FOUND = "05/28/2025 11:05:04 PM EDT"
+RULE = "=" * 80
+
+def sample_matches():
+    """Matches covering every odds and environment branch of the step6 block"""
+    full = {
+        "match_id": "m1", "competition_id": "c1", "competition": "USA ULOC", "country": "United States",
+        "home_team": "Monterey Bay FC", "away_team": "Spokane Velocity", "score": "1 - 0", "status_id": 4,
+        "full_time_result": {"home": "-143", "draw": "+274", "away": "+347", "time": "6"},
+        "spread": {"home": "-108", "away": "-118", "handicap": -0.25, "time": "5"},
+        "over_under": {"line_1": {"line": 3.5, "over": "-108", "under": "-119", "time": "6"},
+                       "line_2": {"line": 2.5, "over": "-150", "under": "+120", "time": "6"}},
+        "environment": {"weather_description": "Foggy"},
+        "environment_summary": ["Temperature: 57.2°F", "Wind: Light Breeze, 5.8 mph"],
+    }
+    fallback_environment = {
+        "match_id": "m2", "home_team": "A & B", "away_team": "<C>", "status_id": 3,
+        "over_under": {"line_1": {"line": 3.0}},
+        "environment": {"weather_description": "Clear", "temperature": "60F"},
+    }
+    bare = {"match_id": "m3", "status": "Live", "full_time_result": {}, "spread": {"home": "N/A", "away": "N/A"}}
+    return [full, fallback_environment, bare]
+
+def centered(text):
+    """A title line of the step6 block"""
+    return f"{text:^80}"
+
+def golden_alert(title, match_id, competition_id, body):
+    """Expected step6 alert: title block, then the match lines"""
+    return ["", RULE, centered(title), centered(f"Found: {FOUND}"), centered(f"Match ID: {match_id}"),
+            centered(f"Competition ID: {competition_id}"), RULE, "", *body]
+
+FULL_BODY = [
+    "Competition: USA ULOC (United States)",
+    "Match: Monterey Bay FC vs Spokane Velocity",
+    "Score: 1 - 0",
+    "Status: Second half (ID: 4)",
+    "",
+    "--- MATCH BETTING ODDS ---",
+    "│ ML:     │ Home: -143 │ Draw: +274  │ Away: +347  │ (@6')",
+    "│ Spread: │ Home: -108 │ Hcap: -0.25 │ Away: -118  │ (@5')",
+    "│ O/U:    │ Over: -150 │ Line: 2.5   │ Under: +120 │ (@6')",
+    "│ O/U:    │ Over: -108 │ Line: 3.5   │ Under: -119 │ (@6') ★",
+    "",
+    "--- MATCH ENVIRONMENT ---",
+    "Weather: Foggy",
+    "Temperature: 57.2°F",
+    "Wind: Light Breeze, 5.8 mph",
+]
+FALLBACK_BODY = [
+    "Competition: None (None)",
+    "Match: A & B vs <C>",
+    "Score: N/A",
+    "Status: Half-time break (ID: 3)",
+    "",
+    "--- MATCH BETTING ODDS ---",
+    "│ O/U:    │ Over: N/A  │ Line: 3.0   │ Under: N/A  │ (@N/A') ★",
+    "",
+    "--- MATCH ENVIRONMENT ---",
+    "Weather: Clear",
+    "Temperature: 60F",
+    "Wind: Calm, None None",
+]
+BARE_BODY = [
+    "Competition: None (None)",
+    "Match: None vs None",
+    "Score: N/A",
+    "Status: Live",
+    "",
+    "--- MATCH BETTING ODDS ---",
+    "No betting odds available",
+    "",
+    "--- MATCH ENVIRONMENT ---",
+    "No environment data available",
+]
+
+def test_step6_style_cycle_matches_golden_output():
+    """ou_3 header, three alert shapes and their separators - dicts and views give the same bytes"""
+    renderer = alert_manager.load_alert_module(alert_manager.discover_alerts()["ou_3"]).get_alert_renderer({})
+    assert renderer.log_format == "step6_style"
+    separator = ["", "-" * 80]
+    golden = "\n".join([
+        "", RULE, centered("OU 3.0+ ALERT CYCLE - LIVE MATCHES ONLY"), centered(f"Alert Time: {FOUND}"),
+        centered("NEW Matches Found: 3 of 250 scanned"), RULE,
+        *golden_alert("OU 3.0+ ALERT #12", "m1", "c1", FULL_BODY), *separator,
+        *golden_alert("OU 3.0+ ALERT #13", "m2", "N/A", FALLBACK_BODY), *separator,
+        *golden_alert("OU 3.0+ ALERT #14", "m3", "N/A", BARE_BODY),
+    ])
+    matches = sample_matches()
+    assert renderer.render_cycle(list(enumerate(matches, 12)), FOUND, 250) == golden
+    assert renderer.render_cycle([(n, as_view(match)) for n, match in enumerate(matches, 12)], FOUND, 250) == golden
+
+def test_step6_style_uses_each_alerts_wording():
+    """ou_3_no_score renders its own cycle title, found label and alert title"""
+    renderer = alert_manager.load_alert_module(alert_manager.discover_alerts()["ou_3_no_score"]).get_alert_renderer({})
+    golden = "\n".join([
+        "", RULE, centered("OU 3.0+ SCORELESS HALF TIME ALERT CYCLE - 0-0 HALF-TIME ONLY"),
+        centered(f"Alert Time: {FOUND}"), centered("NEW Half-time Matches Found: 1 of 5 scanned"), RULE,
+        *golden_alert("OU 3.0+ SCORELESS HALF TIME ALERT #7", "m1", "c1", FULL_BODY),
+    ])
+    assert renderer.render_cycle([(7, sample_matches()[0])], FOUND, 5) == golden
+
+def test_status_is_rendered_from_the_coerced_status_id():
+    """A feed sending "3" or 3.0 gets the same status the filter saw, in every format"""
+    renderer = alert_manager.load_alert_module(alert_manager.discover_alerts()["ou_3"]).get_alert_renderer({})
+    for status_id in ("3", 3.0):
+        match = {**sample_matches()[1], "status_id": status_id}
+        assert "Status: Half-time break (ID: 3)\n" in renderer.render_match(match, 1, FOUND)
+        assert "Half-time break (ID: 3)" in renderer.render_match(as_view(match), 1, FOUND)
+    record = json.loads(AlertRenderer("jsonl").render_match({"match_id": "m", "status_id": "3"}, 1, FOUND))
+    assert record["status_id"] == 3 and record["status"] == "Unknown Status (3) (ID: 3)"
+
+def test_compact_and_jsonl_are_one_record_per_alert():
+    """No header; only qualifying lines in compact; full structure in jsonl"""
+    matches = sample_matches()
+    compact = AlertRenderer("compact", alert="ou_3", title="OU 3.0+ ALERT").render_cycle(list(enumerate(matches, 1)), FOUND, 9)
+    lines = compact.split("\n")
+    assert len(lines) == 3
+    assert lines[0] == (f"{FOUND} | OU 3.0+ ALERT #1 | m1 | USA ULOC (United States) | Monterey Bay FC vs Spokane Velocity"
+                        " | 1 - 0 | Unknown Status (4) (ID: 4) | O/U 3.5 o-108/u-119")
+    assert lines[2].endswith("| N/A | Live | O/U -")
+
+    records = [json.loads(line) for line in
+               AlertRenderer("jsonl", alert="ou_3").render_cycle(list(enumerate(matches, 1)), FOUND, 9).split("\n")]
+    assert [record["alert_number"] for record in records] == [1, 2, 3]
+    assert records[0]["odds"]["over_under"] == [
+        {"line": 2.5, "over": "-150", "under": "+120", "time": "6", "qualifying": False},
+        {"line": 3.5, "over": "-108", "under": "-119", "time": "6", "qualifying": True},
+    ]
+    assert records[0]["odds"]["spread"]["handicap"] == -0.25
+    assert records[2]["odds"] == {"ml": None, "spread": None, "over_under": []}
+    assert records[1]["environment"] == ["Weather: Clear", "Temperature: 60F", "Wind: Calm, None None"]
+
+def test_html_is_escaped_and_marks_qualifying_lines():
+    """Team names cannot inject markup; 3.0+ rows carry the qualifying class"""
+    page = AlertRenderer("html", title="OU 3.0+ ALERT").render_cycle([(5, sample_matches()[1])], FOUND, 9)
+    assert page.startswith('<section class="alert-cycle"') and page.endswith("</section>")
+    assert "A &amp; B vs &lt;C&gt;" in page and "<C>" not in page
+    assert '<tr class="qualifying"><th>O/U</th>' in page
+
+def test_unknown_format_falls_back_and_renderers_are_shared(capsys):
+    """A typo in log_format keeps the step6 log; same settings give the same compiled renderer"""
+    renderer = get_renderer("fancy", title="X")
+    assert renderer.log_format == "step6_style"
+    assert "unknown log_format" in capsys.readouterr().out
+    assert get_renderer("step6_style", title="X") is renderer
+    with pytest.raises(ValueError):
+        AlertRenderer("fancy")
+
+def test_configured_format_reaches_the_log(tmp_path, monkeypatch):
+    """An alert configured for jsonl writes one JSON line per fired match"""
+    monkeypatch.setattr(alert_manager, "_previous_hashes", {})
+    module = alert_manager.load_alert_module(alert_manager.discover_alerts()["ou_3"])
+    for attr in ("resident", "persist_state", "console_echo"):
+        monkeypatch.setattr(module, attr, getattr(module, attr))
+    module.enable_resident_mode()
+    for attr, file_name in [("log_file", "x.log"), ("dedup_store_file", "p.jsonl"), ("archive_file", "a.db"),
+                            ("processed_matches_file", "p.json"), ("daily_counter_file", "c.json")]:
+        monkeypatch.setattr(module, attr, tmp_path / file_name)
+    config = {**module.load_config(), "log_format": "jsonl"}
+    monkeypatch.setattr(module, "load_config", lambda: config)
+
+    step5 = tmp_path / "step5.json"
+    step5.write_text(json.dumps({"history": [{"generated_at": FOUND, "matches": {
+        match["match_id"]: match for match in sample_matches()}}]}))
+    fired = alert_manager.run_cycle({"ou_3": alert_manager.discover_alerts()["ou_3"]}, step5)["ou_3"]["matches"]
+    stop_alert_listeners()
+
+    records = [json.loads(line) for line in (tmp_path / "x.log").read_text().splitlines()]
+    assert [record["match_id"] for record in records] == [match["match_id"] for match in fired] == ["m1", "m2"]
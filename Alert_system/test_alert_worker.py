@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the Alert Worker
+================================
+
+Runs the worker on a temporary Unix socket with every alert's files
+redirected into tmp_path, and checks new-fetch round trips from the client,
+dedup across requests, ping, bad requests and stale socket cleanup.
+"""
+
+import json
+import socket
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+import alert_manager
+from alert_worker import AlertWorker, remove_stale_socket
+from alert_worker_client import AlertWorkerClient, send_fetch
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets not available")
+
+def write_step5(path, generated_at="05/28/2025 11:05:04 PM EDT"):
+    """step5.json with one live 3.5 match and one 0-0 half-time 3.0 match"""
+    matches = {
+        "live_001": {"match_id": "live_001", "home_team": "A", "away_team": "B",
+                     "status_id": 2, "home_score": 1, "away_score": 0,
+                     "over_under": {"line_1": {"line": 3.5, "over": "-110", "under": "-110"}}},
+        "ht_002": {"match_id": "ht_002", "home_team": "C", "away_team": "D",
+                   "status_id": 3, "home_score": 0, "away_score": 0,
+                   "over_under": {"line_1": {"line": 3.0, "over": "-105", "under": "-115"}}},
+    }
+    path.write_text(json.dumps({"history": [{"generated_at": generated_at, "matches": matches}]}))
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    """Worker serving on tmp_path/w.sock from a thread, alert files isolated"""
+    monkeypatch.setattr(alert_manager, "_previous_hashes", {})
+    for name, module_path in alert_manager.discover_alerts().items():
+        module = alert_manager.load_alert_module(module_path)
+        for attr in ("resident", "persist_state", "console_echo"):
+            monkeypatch.setattr(module, attr, getattr(module, attr))
+        for attr, file_name in [("log_file", "x.log"), ("dedup_store_file", "p.jsonl"), ("archive_file", "a.db"),
+                                ("processed_matches_file", "p.json"), ("daily_counter_file", "c.json")]:
+            monkeypatch.setattr(module, attr, tmp_path / name / file_name)
+        (tmp_path / name).mkdir()
+
+    step5 = tmp_path / "step5.json"
+    write_step5(step5)
+    worker = AlertWorker(tmp_path / "w.sock", step5, dispatch=False).bind()
+    thread = threading.Thread(target=worker.serve, name="alert-worker-test")
+    thread.start()
+    yield worker
+    worker.stop()
+    thread.join()
+
+def test_new_fetch_replies_with_fired_alerts(worker):
+    """The first request fires both alerts, the same fetch again fires nothing"""
+    reply = send_fetch(worker.step5_path, "05/28/2025 11:05:04 PM EDT", worker.socket_path)
+    assert reply["ok"] and reply["generated_at"] == reply["processed_generated_at"] == "05/28/2025 11:05:04 PM EDT"
+    assert sorted(match["match_id"] for match in reply["fired"]["ou_3"]) == ["ht_002", "live_001"]
+    assert [match["match_id"] for match in reply["fired"]["ou_3_no_score"]] == ["ht_002"]
+
+    with AlertWorkerClient(worker.socket_path) as client:
+        again = client.new_fetch()
+        assert again["ok"] and all(matches == [] for matches in again["fired"].values())
+        assert client.ping() == {"ok": True, "alerts": list(worker.alerts), "cycles": 2}
+
+def test_errors_come_back_as_replies(worker, tmp_path):
+    """Bad JSON, unknown commands and missing files do not stop the worker"""
+    with AlertWorkerClient(worker.socket_path) as client:
+        client.sock.sendall(b"not json\n")
+        assert not client.reader.readline().startswith(b'{"ok": true')
+        assert client.request({"command": "reload"})["ok"] is False
+        assert client.new_fetch(tmp_path / "missing.json")["ok"] is False
+        assert client.ping()["ok"] is True
+    assert worker.cycles == 0
+
+def test_persistent_client_does_not_block_others(worker, tmp_path):
+    """An idle open connection neither holds up other clients nor stop()"""
+    idle = AlertWorkerClient(worker.socket_path, timeout=5).connect()
+    try:
+        assert idle.ping()["ok"] is True
+        reply = send_fetch(worker.step5_path, "05/28/2025 11:05:04 PM EDT", worker.socket_path, timeout=5)
+        assert [match["match_id"] for match in reply["fired"]["ou_3_no_score"]] == ["ht_002"]
+
+        serving = [thread for thread in threading.enumerate() if thread.name == "alert-worker-test"]
+        worker.stop()
+        serving[0].join(timeout=5)
+        assert not serving[0].is_alive()
+        assert idle.reader.readline() == b""  # connection closed by the worker
+    finally:
+        idle.close()
+
+def test_stale_socket_is_replaced(tmp_path):
+    """A socket file nobody listens on is removed, a live one is refused"""
+    path = tmp_path / "stale.sock"
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    dead.bind(str(path))
+    dead.close()
+    remove_stale_socket(path)
+    assert not path.exists()
+
+    live = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    live.bind(str(path))
+    live.listen(1)
+    try:
+        with pytest.raises(RuntimeError):
+            remove_stale_socket(path)
+    finally:
+        live.close()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for compact matches
+===============================
+
+Checks that a CompactMatch round-trips to the original match dict, gives
+the same rule results, dedup keys and formatted alert as the dict / MatchView
+path, and takes less memory when many fetches are kept.
+"""
+
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent / "benchmarks"))
+
+import alert_manager
+from compact_match import CompactMatch, compact_matches, pack_odds
+from match_view import build_match_views
+from rule_engine import compile_rule, evaluate_rules
+from step5_generator import generate_step5
+
+def awkward_match():
+    """Odds that must not be packed, nested lists, -0.0 and a 3 vs 3.0 line"""
+    return {
+        "match_id": "m1",
+        "home_team": "Équipe A",
+        "status_id": "3",
+        "home_score": 0,
+        "away_score": 0,
+        "full_time_result": {"home": "-141", "draw": "EVEN", "away": "+0", "time": "12"},
+        "spread": {"home": "-0110", "away": "+100", "handicap": -0.0},
+        "over_under": {
+            "line_1": {"line": 3, "over": "-110", "under": None},
+            "line_2": {"line": 2.5, "over": "+120", "under": "-150"},
+            "line_3": {"line": True},
+        },
+        "environment_summary": ["Wind: calm", "-110"],
+        "environment": {},
+    }
+
+def test_round_trip_is_exact():
+    """to_dict() and get() return the original values and types"""
+    match = awkward_match()
+    compact = CompactMatch(match)
+    restored = compact.to_dict()
+    assert json.dumps(restored) == json.dumps(match)
+    assert compact.get("full_time_result").get("away") == "+0"
+    assert compact["spread"]["home"] == "-0110"
+    assert compact.get("missing", "N/A") == "N/A" and "home_team" in compact
+    assert [line for line, _ in compact.lines] == [2.5, 3]
+    assert (compact.status_id, compact.home_score, compact.max_line) == (3, 0, 3)
+
+def test_pack_odds_only_when_lossless():
+    """Signed integer strings pack, anything else stays a string"""
+    assert pack_odds("-110") == -110 and pack_odds("+285") == 285 and pack_odds("+0") == 0
+    assert [pack_odds(value) for value in ("0", "-0", "110", "-0110", "+1.5", "EVEN", "-", "+١")] == [None] * 8
+
+def test_rules_and_format_match_the_dict_path():
+    """Same candidates, dedup keys and alert text for dicts and compact matches"""
+    matches = generate_step5(matches=300, history=1, lines=4, live_share=0.8, seed=3)["history"][-1]["matches"]
+    config = {"criteria": {"min_ou_line": 3.0, "status_ids": [2, 3, 4],
+                           "odds": [{"market": "full_time_result", "side": "home", "max": 150},
+                                    {"market": "over_under", "side": "over", "max": -100}]}}
+    rule = compile_rule("ou_3", config)
+    from_views = evaluate_rules([rule], None, build_match_views(matches))["ou_3"]["candidates"]
+    from_compact = evaluate_rules([rule], None, compact_matches(matches))["ou_3"]["candidates"]
+    assert from_views
+    assert [rule.match_key(view) for view in from_views] == [rule.match_key(match) for match in from_compact]
+
+    alerts = alert_manager.discover_alerts()
+    for name in ("ou_3", "ou_3_no_score"):
+        renderer = alert_manager.load_alert_module(alerts[name]).get_alert_renderer({})
+        for view, match in zip(from_views, from_compact):
+            assert renderer.render_match(match, 7, "now") == renderer.render_match(view.match, 7, "now")
+
+def retained_bytes(build):
+    """Bytes still allocated after build() (its result is kept alive)"""
+    tracemalloc.start()
+    try:
+        kept = build()
+        current = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return current
+
+def test_history_takes_less_memory():
+    """Ten fetches of 200 matches kept in memory: compact is well under the dicts"""
+    document = json.dumps(generate_step5(matches=200, history=10, seed=1))
+    entries = lambda: (entry["matches"] for entry in json.loads(document)["history"])
+
+    as_dicts = retained_bytes(lambda: [matches for matches in entries()])
+    as_compact = retained_bytes(lambda: [compact_matches(matches) for matches in entries()])
+    assert as_compact < as_dicts * 0.6
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test script for the dedup store
+===============================
+
+Covers migration from processed_matches.json, append-only persistence,
+finished/TTL eviction, compaction and recovery from a torn last line.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add the current directory to path so we can import the shared module
+sys.path.append(str(Path(__file__).parent))
+
+import dedup_store
+from dedup_store import DedupStore, open_dedup_store
+
+def test_migrates_legacy_json(tmp_path):
+    """Keys and last fetch time come across from processed_matches.json"""
+    legacy = tmp_path / "processed_matches.json"
+    legacy.write_text(json.dumps({
+        "processed_matches": ["y39mp1hzgn5xmoj_3.0", "6ypq3nhv03nomd7_4.5"],
+        "last_fetch_time": "05/28/2025 11:05:04 PM EDT",
+    }))
+    store = open_dedup_store(tmp_path / "processed_matches.jsonl", legacy)
+
+    assert "y39mp1hzgn5xmoj_3.0" in store
+    assert store.entries["6ypq3nhv03nomd7_4.5"][0] == "6ypq3nhv03nomd7"
+    assert store.meta["last_fetch_time"] == "05/28/2025 11:05:04 PM EDT"
+
+    reopened = open_dedup_store(tmp_path / "processed_matches.jsonl", legacy)
+    assert set(reopened) == set(store)
+
+def test_migrated_keys_keep_match_ids_with_underscores(tmp_path):
+    """The match ID is taken from the right, past the alert's key_suffix"""
+    legacy = tmp_path / "processed_matches.json"
+    legacy.write_text(json.dumps({
+        "processed_matches": ["league_a_y39mp_3.0_halftime", "dj2ry_3.25_halftime"],
+        "last_fetch_time": "05/29/2025 09:14:16 AM EDT",
+    }))
+    store = open_dedup_store(tmp_path / "processed_matches.jsonl", legacy, key_suffix="_halftime")
+
+    assert store.entries["league_a_y39mp_3.0_halftime"][0] == "league_a_y39mp"
+    assert store.entries["dj2ry_3.25_halftime"][0] == "dj2ry"
+    assert store.evict(finished_match_ids=["league_a_y39mp"]) == 1
+    assert list(store) == ["dj2ry_3.25_halftime"]
+
+def test_appends_only_changes(tmp_path):
+    """Unchanged cycles write nothing; new keys are appended, not rewritten"""
+    path = tmp_path / "processed_matches.jsonl"
+    store = DedupStore(path).load()
+    store.add("a_3.0", "a")
+    store.set_meta(last_fetch_time="t1")
+    store.flush()
+    size_after_first = path.stat().st_size
+
+    store.set_meta(last_fetch_time="t1")
+    assert not store.dirty
+    store.flush()
+    assert path.stat().st_size == size_after_first
+
+    store.add("b_3.5", "b")
+    store.flush()
+    assert path.read_text().count("\n") == 3
+    assert set(DedupStore(path).load()) == {"a_3.0", "b_3.5"}
+
+def test_evicts_finished_and_expired(tmp_path):
+    """Finished matches and keys past the TTL are dropped and stay dropped"""
+    path = tmp_path / "processed_matches.jsonl"
+    store = DedupStore(path).load()
+    store.add("old_3.0", "old", now=1000.0)
+    store.add("done_3.0", "done", now=5000.0)
+    store.add("live_3.0", "live", now=5000.0)
+
+    assert store.evict(["done"], ttl_seconds=3600, now=5000.0) == 2
+    store.flush()
+    assert set(DedupStore(path).load()) == {"live_3.0"}
+
+def test_compaction_and_torn_line(tmp_path, monkeypatch):
+    """Dead records trigger a rewrite; a torn last line is ignored"""
+    monkeypatch.setattr(dedup_store, "COMPACT_MIN_BYTES", 200)
+    path = tmp_path / "processed_matches.jsonl"
+    store = DedupStore(path).load()
+    for i in range(20):
+        store.set_meta(last_fetch_time=f"t{i}")
+        store.flush()
+    assert path.read_text().count("\n") < 20
+
+    with open(path, 'a') as f:
+        f.write('{"k": "torn')
+    reloaded = DedupStore(path).load()
+    assert reloaded.meta["last_fetch_time"] == "t19"
+    assert len(reloaded) == 0
+
+    reloaded.add("after_3.0", "after")
+    reloaded.flush()
+    assert set(DedupStore(path).load()) == {"after_3.0"}
+
+def test_stale_hashes_trigger_compaction(tmp_path):
+    """A handful of large superseded hash records is compacted away, whatever the record count"""
+    path = tmp_path / "processed_matches.jsonl"
+    store = DedupStore(path).load()
+    for fetch in range(20):
+        store.set_match_hashes({f"m{i}": f"{fetch:04x}{i:012x}" for i in range(1000)})
+        store.flush()
+    assert path.read_text().count("\n") < 20
+    assert path.stat().st_size <= 2 * store.full_size()
+    assert DedupStore(path).load().match_hashes == store.match_hashes
+
+def test_match_hashes_round_trip(tmp_path):
+    """Only changed hashes are appended; removals and compaction replay correctly"""
+    path = tmp_path / "processed_matches.jsonl"
+    store = DedupStore(path).load()
+    store.set_match_hashes({"a": "h1", "b": "h2"})
+    store.flush()
+    store.set_match_hashes({"a": "h1", "b": "h2"})
+    assert not store.dirty
+
+    store.set_match_hashes({"a": "h1", "c": "h3"})
+    assert store._pending == [{"h": {"c": "h3"}, "x": ["b"]}]
+    store.flush()
+    assert DedupStore(path).load().match_hashes == {"a": "h1", "c": "h3"}
+
+    store.compact()
+    assert DedupStore(path).load().match_hashes == {"a": "h1", "c": "h3"}
+
+def test_daily_count_lives_in_the_store(tmp_path):
+    """daily_alert_count.json is migrated once; the count then travels with the dedup state"""
+    legacy_count = tmp_path / "daily_alert_count.json"
+    legacy_count.write_text(json.dumps({"date": "2025-05-28", "count": 7, "last_updated": "x"}))
+    path = tmp_path / "processed_matches.jsonl"
+
+    store = open_dedup_store(path, tmp_path / "processed_matches.json", legacy_count)
+    assert store.meta["daily_count"] == {"date": "2025-05-28", "count": 7}
+
+    store.set_meta(daily_count={"date": "2025-05-28", "count": 9})
+    store.flush()
+    legacy_count.write_text(json.dumps({"date": "2025-05-28", "count": 0}))
+    assert open_dedup_store(path, None, legacy_count).meta["daily_count"]["count"] == 9
+
+def test_write_volume_is_counted(tmp_path):
+    """bytes_written covers only what was appended, full_size what a rewrite would cost"""
+    path = tmp_path / "processed_matches.jsonl"
+    store = DedupStore(path).load()
+    store.set_match_hashes({f"m{i}": f"{i:016x}" for i in range(200)})
+    store.set_meta(last_fetch_time="t1")
+    store.flush()
+    assert store.bytes_written == path.stat().st_size
+
+    before = store.bytes_written
+    store.set_meta(last_fetch_time="t2")
+    store.flush()
+    assert store.bytes_written - before == len('{"meta": {"last_fetch_time": "t2"}}\n')
+    assert store.bytes_written == path.stat().st_size
+    assert store.bytes_written - before < store.full_size() / 100
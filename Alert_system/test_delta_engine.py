@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for the delta engine
+================================
+
+Checks the new / changed / unchanged / removed classification and that only
+new and changed matches reach rule evaluation.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+from delta_engine import compute_delta, evaluate_delta, hash_matches
+from match_view import build_match_views
+from rule_engine import compile_rule
+
+def mock_matches(line_b=3.5):
+    """Three live matches that all qualify for a 3.0+ rule"""
+    return {
+        key: {"match_id": key, "status_id": 2, "over_under": {"line_1": {"line": line, "over": "-110"}}}
+        for key, line in [("a", 3.0), ("b", line_b), ("c", 4.0)]
+    }
+
+def test_classification():
+    """Each match lands in exactly one class"""
+    previous = hash_matches(mock_matches())
+    current = mock_matches(line_b=3.75)
+    del current["c"]
+    current["d"] = {"match_id": "d", "status_id": 2}
+
+    delta = compute_delta(current, previous)
+    assert delta["new"] == ["d"]
+    assert delta["changed"] == ["b"]
+    assert delta["unchanged"] == ["a"]
+    assert delta["removed"] == ["c"]
+    assert set(delta["hashes"]) == {"a", "b", "d"}
+
+def test_only_changed_matches_are_evaluated():
+    """Unchanged matches are never handed to the rule"""
+    rule = compile_rule("ou_3", {"criteria": {"min_ou_line": 3.0, "status_ids": [2]}})
+    previous = hash_matches(mock_matches())
+    matches = mock_matches(line_b=3.75)
+    views = build_match_views(matches)
+
+    evaluation = evaluate_delta(rule, matches, views, compute_delta(matches, previous))
+    assert [view.match_id for view in evaluation["candidates"]] == ["b"]
+
+    # A manager pass that did not cover "b" is not trusted
+    snapshot = {"rule_results": {"ou_3": {"candidates": [], "status_rejected": 0, "finished_match_ids": []}},
+                "evaluated_views": set()}
+    evaluation = evaluate_delta(rule, matches, views, compute_delta(matches, previous), snapshot)
+    assert [view.match_id for view in evaluation["candidates"]] == ["b"]
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test script for the Alert Dispatcher
+====================================
+
+Delivers alerts to a local stub HTTP server: batching, retries, permanent
+failures, crash recovery through the outbox and throughput at hundreds of
+alerts per second over pooled keep-alive connections.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+from dispatcher import HAVE_AIOHTTP, AlertDispatcher, DispatcherThread, Outbox, alert_payloads
+
+needs_aiohttp = pytest.mark.skipif(not HAVE_AIOHTTP, reason="aiohttp not installed")
+
+class StubServer:
+    """Local webhook endpoint recording every batch (statuses: responses to hand out first)"""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.batches = []
+        self.requests = 0
+        self.peers = set()
+
+    async def handle(self, request):
+        from aiohttp import web
+        self.requests += 1
+        self.peers.add(request.transport.get_extra_info("peername"))
+        body = await request.json()
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status == 200:
+            self.batches.append(body["alerts"])
+        return web.Response(status=status)
+
+    async def __aenter__(self):
+        from aiohttp import web
+        app = web.Application()
+        app.router.add_post("/alerts", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/alerts"
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.runner.cleanup()
+
+def fired(count, name="ou_3"):
+    """run_cycle()-shaped results with `count` fired matches"""
+    return {
+        "_load": {"seconds": 0.0, "matches": []},
+        name: {"seconds": 0.0, "matches": [{"match_id": f"m{i}", "home_team": "A", "away_team": "B"}
+                                            for i in range(count)]},
+    }
+
+def make_dispatcher(url, outbox, **settings):
+    """Dispatcher for one endpoint with fast retries"""
+    settings = {"batch_size": 20, "backoff_seconds": 0.01, "max_attempts": 3, **settings}
+    return AlertDispatcher([{"name": "hook", "url": url}], outbox, **settings)
+
+def test_alert_payloads_skip_manager_entries():
+    """Only real alerts are dispatched, in order"""
+    assert [(name, match["match_id"]) for name, match in alert_payloads(fired(2))] == [("ou_3", "m0"), ("ou_3", "m1")]
+    assert alert_payloads({"ou_3_no_score": [{"match_id": "x"}]}) == [("ou_3_no_score", {"match_id": "x"})]
+
+def test_outbox_replays_pending_only(tmp_path):
+    """Delivered and dead alerts are gone after reload; a torn line is ignored"""
+    path = tmp_path / "outbox.jsonl"
+    outbox = Outbox(path).load()
+    ids = [outbox.add("hook", {"n": n}) for n in range(4)]
+    outbox.ack(ids[:1])
+    outbox.dead(ids[1:2], "HTTP 400")
+    outbox.flush()
+    with open(path, 'a') as f:
+        f.write('{"ack": [3')
+
+    reloaded = Outbox(path).load()
+    assert sorted(reloaded.pending) == ids[2:]
+    assert reloaded.add("hook", {"n": 9}) == ids[-1] + 1
+    assert reloaded.batches(1) == [("hook", [(ids[2], {"n": 2})]), ("hook", [(ids[3], {"n": 3})]),
+                                   ("hook", [(ids[-1] + 1, {"n": 9})])]
+
+def test_ids_continue_after_compaction_and_restart(tmp_path):
+    """Compaction keeps the id high-water mark, so a restart never reuses a delivered id"""
+    path = tmp_path / "outbox.jsonl"
+    outbox = Outbox(path).load()
+    ids = [outbox.add("hook", {"n": n}) for n in range(3)]
+    outbox.ack(ids)
+    outbox.flush()
+    outbox.compact()
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [{"next_id": ids[-1] + 1}]
+
+    reloaded = Outbox(path).load()
+    assert len(reloaded) == 0
+    assert reloaded.add("hook", {"n": 3}) == ids[-1] + 1
+
+@needs_aiohttp
+def test_batches_are_delivered_and_acknowledged(tmp_path):
+    """45 alerts in batches of 20 -> 3 POSTs, outbox empty afterwards"""
+    async def run():
+        async with StubServer() as server:
+            async with make_dispatcher(server.url, Outbox(tmp_path / "outbox.jsonl").load()) as dispatcher:
+                summary = await dispatcher.dispatch(fired(45))
+        return server, summary
+
+    server, summary = asyncio.run(run())
+    assert summary["delivered"] == 45
+    assert [len(batch) for batch in server.batches] == [20, 20, 5]
+    assert server.batches[0][0]["alert"] == "ou_3" and server.batches[0][0]["match"]["match_id"] == "m0"
+    assert len(Outbox(tmp_path / "outbox.jsonl").load()) == 0
+
+@needs_aiohttp
+def test_retries_transient_and_drops_permanent_failures(tmp_path):
+    """503 / 429 are retried with backoff; 400 marks the batch dead"""
+    async def run(statuses):
+        async with StubServer(statuses) as server:
+            async with make_dispatcher(server.url, Outbox(None), batch_size=50) as dispatcher:
+                return server, await dispatcher.dispatch(fired(5))
+
+    server, summary = asyncio.run(run([503, 429]))
+    assert summary["delivered"] == 5 and server.requests == 3
+
+    server, summary = asyncio.run(run([400]))
+    assert summary["dead"] == 5 and server.requests == 1
+
+@needs_aiohttp
+def test_outbox_survives_an_outage(tmp_path):
+    """Alerts queued while the endpoint is down go out after a restart"""
+    path = tmp_path / "outbox.jsonl"
+
+    async def endpoint_down():
+        # Bind and close a server to get a port nothing listens on
+        async with StubServer() as server:
+            url = server.url
+        async with make_dispatcher(url, Outbox(path).load(), max_attempts=2) as dispatcher:
+            return await dispatcher.dispatch(fired(3))
+
+    summary = asyncio.run(endpoint_down())
+    assert summary["deferred"] == 3
+    assert len(Outbox(path).load()) == 3
+
+    async def restarted():
+        async with StubServer() as server:
+            async with make_dispatcher(server.url, Outbox(path).load()) as dispatcher:
+                summary = await dispatcher.drain()
+        return server, summary
+
+    server, summary = asyncio.run(restarted())
+    assert summary["delivered"] == 3
+    assert [alert["match"]["match_id"] for alert in server.batches[0]] == ["m0", "m1", "m2"]
+    assert len(Outbox(path).load()) == 0
+
+@needs_aiohttp
+def test_dispatcher_thread_does_not_block_the_caller(tmp_path):
+    """submit() returns immediately; stop() finishes the deliveries"""
+    async def run():
+        async with StubServer() as server:
+            thread = DispatcherThread(make_dispatcher(server.url, Outbox(tmp_path / "outbox.jsonl").load())).start()
+            start = time.perf_counter()
+            future = thread.submit(fired(30))
+            submit_seconds = time.perf_counter() - start
+            summary = await asyncio.wrap_future(future)
+            await asyncio.get_running_loop().run_in_executor(None, thread.stop)
+        return server, summary, submit_seconds
+
+    server, summary, submit_seconds = asyncio.run(run())
+    assert summary["delivered"] == 30
+    assert submit_seconds < 0.05
+    assert sum(len(batch) for batch in server.batches) == 30
+
+@needs_aiohttp
+def test_throughput_hundreds_of_alerts_per_second(tmp_path):
+    """1000 alerts over at most `concurrency` pooled connections, well above 200 alerts/s"""
+    async def run():
+        async with StubServer() as server:
+            outbox = Outbox(tmp_path / "outbox.jsonl").load()
+            async with make_dispatcher(server.url, outbox, batch_size=10, concurrency=8) as dispatcher:
+                dispatcher.enqueue(fired(1000))
+                start = time.perf_counter()
+                summary = await dispatcher.drain()
+                seconds = time.perf_counter() - start
+        return server, summary, seconds
+
+    server, summary, seconds = asyncio.run(run())
+    assert summary["delivered"] == 1000 and server.requests == 100
+    assert len(server.peers) <= 8  # keep-alive: connections are reused
+    assert 1000 / seconds > 200
+    # Everything acknowledged - the outbox compacted down to its id high-water mark
+    assert (tmp_path / "outbox.jsonl").read_text() == '{"next_id": 1001}\n'
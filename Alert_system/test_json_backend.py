@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the pluggable JSON backend
+==========================================
+
+Every installed backend must decode step5 documents to exactly what stdlib
+json returns, and the reader must give identical snapshots whichever one is
+selected - NaN included, through the stdlib fallback.
+"""
+
+import json
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+import json_backend
+from step5_reader import read_history_since, read_latest_snapshot
+
+def make_fetch(generated_at, num_matches=3):
+    """One fetch with unicode, escapes, nulls and mixed number types"""
+    matches = {}
+    for i in range(num_matches):
+        match_id = f"{generated_at}_m{i}"
+        matches[match_id] = {
+            "match_id": match_id,
+            "home_team": 'Équipe "Ü" \\ {A}',
+            "away_team": "Team é B",
+            "status_id": 2 + i % 2,
+            "home_score": i,
+            "away_score": 0,
+            "over_under": {"line_1": {"line": 3.0 + i, "over": "-110", "under": None}},
+            "spread": {"handicap": -0.25, "home": 1e-3},
+            "environment_summary": ["Wind: ] calm", "Temp: {72}"],
+        }
+    return {"generated_at": generated_at, "matches": matches}
+
+@pytest.fixture
+def restore_backend():
+    """Put the default backend back after the test"""
+    yield
+    json_backend.set_backend()
+
+def test_backends_decode_identically():
+    """Every installed backend returns the same objects as stdlib json"""
+    raw = json.dumps({"history": [make_fetch(f"fetch_{i}") for i in range(3)]}, ensure_ascii=False).encode()
+    expected = json.loads(raw)
+    for name in json_backend.available_backends():
+        assert json_backend.backend_loads(name)(raw) == expected, name
+
+def test_reader_is_identical_under_every_backend(tmp_path, restore_backend):
+    """read_latest_snapshot / read_history_since do not depend on the backend"""
+    history = [make_fetch(f"05/28/2025 11:0{i}:00 PM EDT") for i in range(4)]
+    step5 = tmp_path / "step5.json"
+    step5.write_text(json.dumps({"history": history, "last_updated": "x"}, indent=2, ensure_ascii=False))
+
+    results = {}
+    for name in json_backend.available_backends():
+        assert json_backend.set_backend(name) == name
+        results[name] = (read_latest_snapshot(step5), read_history_since(step5, history[1]["generated_at"]))
+    assert all(result == results["json"] for result in results.values())
+    assert results["json"][0] == (history[-1]["matches"], history[-1]["generated_at"])
+
+def test_unknown_backend_is_rejected(restore_backend, monkeypatch):
+    """Unknown names raise ValueError, the environment picks the default"""
+    with pytest.raises(ValueError):
+        json_backend.set_backend("ujson")
+    monkeypatch.setenv("STEP5_JSON_BACKEND", "json")
+    assert json_backend.set_backend() == "json"
+    assert json_backend.BACKEND == "json"
+
+def test_uninstalled_env_backend_falls_back_to_json(restore_backend, monkeypatch, capsys):
+    """A STEP5_JSON_BACKEND that is not installed selects stdlib json with a message"""
+    monkeypatch.setenv("STEP5_JSON_BACKEND", "ujson")
+    assert json_backend.set_backend() == "json"
+    assert "STEP5_JSON_BACKEND='ujson' is not available" in capsys.readouterr().out
+    assert json_backend.decode(b'{"a": 1}') == {"a": 1}
+
+def test_nan_falls_back_to_stdlib_json(tmp_path, restore_backend):
+    """A step5.json with NaN odds (as json.dump writes them) still decodes under every backend"""
+    history = [make_fetch("05/28/2025 11:00:00 PM EDT"), make_fetch("05/28/2025 11:01:00 PM EDT")]
+    history[-1]["matches"]["05/28/2025 11:01:00 PM EDT_m0"]["spread"]["home"] = float("nan")
+    step5 = tmp_path / "step5.json"
+    step5.write_text(json.dumps({"history": history}, indent=2))
+    assert "NaN" in step5.read_text()
+
+    for name in json_backend.available_backends():
+        json_backend.set_backend(name)
+        matches, generated_at = read_latest_snapshot(step5)
+        assert generated_at == history[-1]["generated_at"], name
+        assert sorted(matches) == sorted(history[-1]["matches"]), name
+        assert math.isnan(matches["05/28/2025 11:01:00 PM EDT_m0"]["spread"]["home"]), name
+    with pytest.raises(ValueError):
+        json_backend.decode(b'{"history": [')
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script for match views
+===========================
+
+Checks the normalized per-match fields and that the filter, dedup key and
+formatter share one view instead of re-reading the match dict.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the current directory to path so we can import the shared module
+sys.path.append(str(Path(__file__).parent))
+
+from match_view import MatchView, build_match_views
+from rule_engine import compile_rule, evaluate_rules
+
+def mock_match():
+    """Match with unsorted O/U lines, a 0.0 line and string scores/status"""
+    return {
+        "match_id": "m1",
+        "status_id": "3",
+        "home_score": "0",
+        "away_score": None,
+        "over_under": {
+            "line_1": {"line": 3.5, "over": "-110", "under": "+100"},
+            "line_2": {"line": 0.0, "over": "-500", "under": "+350"},
+            "line_3": {"line": 3.0, "over": "-120", "under": "+100"},
+            "line_4": {"line": None},
+            "line_5": "bad",
+        },
+    }
+
+def test_view_fields_are_normalized():
+    """Status and scores are coerced, lines sorted and numeric only"""
+    view = MatchView(mock_match())
+    assert view.status_id == 3
+    assert (view.home_score, view.away_score) == (0, 0)
+    assert [line_value for line_value, _ in view.lines] == [0.0, 3.0, 3.5]
+    assert view.max_line == 3.5
+    assert view.get("match_id") == view["match_id"] == "m1"
+
+def test_zero_line_is_a_real_line():
+    """A 0.0 line is not treated as missing"""
+    rule = compile_rule("any_line", {"criteria": {"min_ou_line": 0.0, "max_ou_line": 1.0}})
+    view = MatchView(mock_match())
+    assert rule.matches(view)
+    assert rule.match_key(view) == "m1_0.0"
+
+def test_signature_built_once_per_rule():
+    """The dedup key reuses the signature stored on the candidate view"""
+    rule = compile_rule("ou_3", {"criteria": {"min_ou_line": 3.0, "status_ids": [3]}})
+    views = build_match_views({"m1": mock_match()})
+    candidate = evaluate_rules([rule], None, views)["ou_3"]["candidates"][0]
+    assert candidate is views[0]
+    assert rule.match_key(candidate) == "m1_3.0|3.5"
+    assert candidate.signatures == {"ou_3": "3.0|3.5"}
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the cycle metrics
+=================================
+
+Checks that disabled metrics are a no-op object and that an enabled cycle
+exports its laps, counters and latency to both the Prometheus textfile and
+the JSONL stream.
+"""
+
+import json
+import sys
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+from metrics import NULL_METRICS, fetch_timestamp, open_cycle_metrics, prometheus_text
+
+TZ = ZoneInfo("America/New_York")
+
+def test_disabled_metrics_are_a_no_op():
+    """No metrics section, or enabled false, gives the shared null object"""
+    assert open_cycle_metrics("ou_3", {}, ".", "x", TZ) is NULL_METRICS
+    assert open_cycle_metrics("ou_3", {"metrics": {"enabled": False}}, ".", "x", TZ) is NULL_METRICS
+    NULL_METRICS.lap("load")
+    NULL_METRICS.count("fired", 1)
+    assert NULL_METRICS.finish() is None
+
+def test_fetch_timestamp():
+    """generated_at strings are read in the alert time zone"""
+    assert fetch_timestamp("05/28/2025 11:05:04 PM EDT", TZ) == 1748487904.0
+    assert fetch_timestamp("Unknown", TZ) is None
+    assert fetch_timestamp(None, TZ) is None
+
+def test_enabled_cycle_exports_textfile_and_jsonl(tmp_path):
+    """Laps, counters and latency reach both outputs"""
+    config = {"metrics": {"enabled": True, "prometheus_textfile": "a.prom", "jsonl": "a.jsonl"}}
+    for _ in range(2):
+        metrics = open_cycle_metrics("ou_3", config, tmp_path, "05/28/2025 11:05:04 PM EDT", TZ)
+        metrics.lap("load")
+        metrics.lap("filter")
+        metrics.count("scanned", 10)
+        metrics.count("fired", 1)
+        metrics.alert_written()
+        metrics.finish()
+
+    records = [json.loads(line) for line in (tmp_path / "a.jsonl").read_text().splitlines()]
+    assert len(records) == 2
+    assert list(records[0]["stages"]) == ["load", "filter"]
+    assert records[0]["counts"] == {"scanned": 10, "fired": 1}
+    assert records[0]["latency_seconds"] > 0
+
+    text = (tmp_path / "a.prom").read_text()
+    assert 'alert_stage_seconds{alert="ou_3",stage="filter"}' in text
+    assert 'alert_cycle_matches{alert="ou_3",kind="fired"} 1' in text
+    assert 'alert_fetch_to_alert_seconds{alert="ou_3"}' in text
+    assert not (tmp_path / "a.prom.tmp").exists()
+
+def test_latency_only_exported_when_an_alert_was_written():
+    """A cycle that fired nothing has no latency gauge"""
+    record = {"alert": 'q"x', "cycle_seconds": 0.5, "stages": {}, "counts": {"fired": 0},
+              "latency_seconds": None, "ts": 1.0}
+    text = prometheus_text(record)
+    assert "alert_fetch_to_alert_seconds" not in text
+    assert 'alert="q\\"x"' in text
+
+def test_state_write_volume_has_its_own_gauge():
+    """state_bytes_* counters are exported as bytes, not as match counts"""
+    record = {"alert": "ou_3", "cycle_seconds": 0.5, "stages": {}, "latency_seconds": None, "ts": 1.0,
+              "counts": {"fired": 1, "state_bytes_written": 120, "state_bytes_full_rewrite": 90000}}
+    text = prometheus_text(record)
+    assert 'alert_state_bytes{alert="ou_3",kind="written"} 120' in text
+    assert 'alert_state_bytes{alert="ou_3",kind="full_rewrite"} 90000' in text
+    assert 'kind="state_bytes_written"' not in text
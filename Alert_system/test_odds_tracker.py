@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test script for the odds tracker
+================================
+
+Ring-buffer wrap-around, change-only readings, main-line choice, movement
+queries over time windows, eviction of finished / removed matches, the
+memory budget, the Alert Manager feed and throughput at thousands of live
+matches.
+"""
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+import alert_manager
+from match_view import MatchView, build_match_views
+from odds_tracker import OddsTracker, main_line
+
+def fetch_time(minute):
+    """generated_at string `minute` minutes after 8 PM"""
+    return f"05/28/2025 08:{minute:02d}:00 PM EDT"
+
+def make_match(match_id, line, over="-110", under="-110", status_id=2, home_ml="+150"):
+    """Live match with one O/U line and a money line"""
+    return {
+        "match_id": match_id, "status_id": status_id,
+        "full_time_result": {"home": home_ml, "draw": "+240", "away": "+180"},
+        "spread": {"home": "-105", "away": "-115", "handicap": -0.25},
+        "over_under": {"line_1": {"line": line, "over": over, "under": under}},
+    }
+
+def test_ring_buffer_keeps_the_last_k_changes():
+    """Only changed readings are stored, oldest dropped once K is reached"""
+    tracker = OddsTracker(readings=4)
+    for minute, line in enumerate([2.5, 2.5, 2.75, 3.0, 3.0, 3.25, 3.5]):
+        tracker.update([make_match("m1", line)], fetch_time(minute))
+    assert [value for _, value in tracker.readings("m1")] == [2.75, 3.0, 3.25, 3.5]
+    assert [value for _, value in tracker.readings("m1", "ml_home")] == [150.0] * 4
+    assert tracker.readings("unknown") == []
+
+def test_readings_are_stamped_in_eastern_time():
+    """generated_at is read as Eastern time, the same clock the alerts use"""
+    tracker = OddsTracker()
+    tracker.update([make_match("m1", 3.0)], "05/28/2025 11:05:04 PM EDT")
+    assert tracker.readings("m1") == [(1748487904.0, 3.0)]
+
+def test_main_line_is_the_most_balanced():
+    """The line with over / under closest to even is tracked"""
+    match = make_match("m1", 2.5, over="-250", under="+190")
+    match["over_under"]["line_2"] = {"line": 3.0, "over": "-105", "under": "-115"}
+    match["over_under"]["line_3"] = {"line": 3.5, "over": "+160", "under": "-200"}
+    assert main_line(MatchView(match)) == (3.0, -105.0, -115.0)
+    assert main_line(MatchView(make_match("m2", 2.5, over=None, under=None))) == (2.5, None, None)
+
+def test_movement_queries_respect_the_window():
+    """Crossing 3.0 and a 0.5 shift are found within the window, not outside it"""
+    tracker = OddsTracker()
+    for minute, (line_1, line_2) in enumerate([(2.5, 2.75), (2.75, 2.75), (3.0, 3.0), (3.25, 3.0)]):
+        tracker.update([make_match("up", line_1), make_match("flat", line_2)], fetch_time(minute * 5))
+
+    assert tracker.movement("up", window_seconds=600) == {"start": 2.75, "current": 3.25, "low": 2.75, "high": 3.25}
+    assert tracker.crossed("up", 3.0, window_seconds=600) == "up"
+    assert tracker.crossed("flat", 3.0, window_seconds=60) is None
+    assert tracker.line_moves(0.5, window_seconds=900) == [("up", 2.5, 3.25)]
+    assert tracker.line_moves(0.5, window_seconds=300) == []
+
+def test_finished_and_removed_matches_are_evicted():
+    """Status 7 / 8 and matches that left the feed are dropped"""
+    tracker = OddsTracker()
+    tracker.update([make_match("a", 3.0), make_match("b", 3.0), make_match("c", 3.0)], fetch_time(0))
+    summary = tracker.update([make_match("a", 3.0, status_id=8)], fetch_time(1), removed=["b"])
+    assert summary == {"recorded": 0, "evicted": 2}
+    assert "a" not in tracker and "b" not in tracker and "c" in tracker
+
+def test_memory_budget_caps_tracked_matches():
+    """The least recently updated match goes once the budget is full"""
+    tracker = OddsTracker(readings=16, memory_budget_mb=0.01)
+    limit = tracker.max_matches
+    assert 0 < limit < 20
+    tracker.update([make_match(f"m{i}", 3.0) for i in range(limit)], fetch_time(0))
+    tracker.update([make_match("m0", 3.5), make_match("new", 3.0)], fetch_time(1))
+    assert len(tracker) == limit and tracker.evicted == 1
+    assert "m0" in tracker and "new" in tracker and "m1" not in tracker
+    assert tracker.memory_bytes() <= 0.01 * 1024 * 1024
+
+def test_alert_manager_feeds_the_tracker(tmp_path, monkeypatch):
+    """Each cycle feeds the changed matches and hands the tracker to alerts"""
+    monkeypatch.setattr(alert_manager, "_previous_hashes", {})
+    monkeypatch.setattr(alert_manager, "_tracked_match_ids", {})
+    monkeypatch.setattr(alert_manager, "_odds_tracker", OddsTracker())
+    monkeypatch.setattr(alert_manager, "_odds_tracker_loaded", True)
+    step5 = tmp_path / "step5.json"
+
+    for minute, line in enumerate([2.75, 3.25]):
+        matches = {"m1": make_match("m1", line), "m2": make_match("m2", 2.0)}
+        step5.write_text(json.dumps({"history": [{"generated_at": fetch_time(minute), "matches": matches}]}))
+        results = alert_manager.run_cycle({}, step5)
+        assert "_odds" in results
+
+    tracker = alert_manager.get_odds_tracker()
+    assert tracker.crossed("m1", 3.0, window_seconds=600) == "up"
+    assert len(tracker.readings("m2")) == 1
+
+def test_matches_leaving_the_feed_are_evicted_by_match_id(tmp_path, monkeypatch):
+    """step5 keys are not match ids: a match that left the feed is still dropped"""
+    monkeypatch.setattr(alert_manager, "_previous_hashes", {})
+    monkeypatch.setattr(alert_manager, "_tracked_match_ids", {})
+    monkeypatch.setattr(alert_manager, "_odds_tracker", OddsTracker())
+    monkeypatch.setattr(alert_manager, "_odds_tracker_loaded", True)
+    step5 = tmp_path / "step5.json"
+
+    for minute, keys in enumerate([["key_1", "key_2"], ["key_2"]]):
+        matches = {key: make_match(f"id_{key[-1]}", 3.0) for key in keys}
+        step5.write_text(json.dumps({"history": [{"generated_at": fetch_time(minute), "matches": matches}]}))
+        alert_manager.run_cycle({}, step5)
+
+    tracker = alert_manager.get_odds_tracker()
+    assert "id_1" not in tracker and "id_2" in tracker
+
+def test_throughput_thousands_of_live_matches():
+    """5000 live matches, 30 fetches with 30% moving: well above 50k match updates/s"""
+    rng = random.Random(0)
+    matches = {f"m{i}": make_match(f"m{i}", rng.choice([2.5, 2.75, 3.0, 3.25])) for i in range(5000)}
+    fetches = []
+    for minute in range(30):
+        for key in rng.sample(list(matches), 1500):
+            matches[key] = make_match(key, rng.choice([2.5, 2.75, 3.0, 3.25]), home_ml=f"{rng.randint(-200, 200):+d}")
+        fetches.append(build_match_views(matches))
+
+    tracker = OddsTracker(readings=16)
+    start = time.perf_counter()
+    for minute, views in enumerate(fetches):
+        tracker.update(views, fetch_time(minute))
+    seconds = time.perf_counter() - start
+    assert len(tracker) == 5000
+    assert 5000 * 30 / seconds > 50000
+
+    start = time.perf_counter()
+    tracker.line_moves(0.5, window_seconds=600)
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the cycle profiler
+==================================
+
+Checks the three output files of a profiled call and the 1-in-N sampling
+used by the daemon.
+"""
+
+import cProfile
+import pstats
+import sys
+from pathlib import Path
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+from profiling import CycleProfiler, collapsed_stacks, profile_call
+
+def leaf(n):
+    """Allocate and burn a little time"""
+    return [str(i) * 4 for i in range(n)]
+
+def cycle(n):
+    """Two calls into the same leaf"""
+    return len(leaf(n)) + len(leaf(n))
+
+def test_profile_call_writes_pstats_collapsed_and_allocations(tmp_path):
+    """pstats loads, collapsed stacks nest cycle -> leaf, allocation sites are listed"""
+    result = profile_call(tmp_path / "run", cycle, 20000)
+    assert result == 40000
+
+    stats = pstats.Stats(str(tmp_path / "run.pstats"))
+    assert any(name == "leaf" for _, _, name in stats.stats)
+
+    lines = (tmp_path / "run.collapsed").read_text().splitlines()
+    stacks = dict(line.rsplit(" ", 1) for line in lines)
+    assert any(":cycle:" in stack and ";test_profiling.py:leaf:" in stack for stack in stacks)
+    assert all(int(micros) > 0 for micros in stacks.values())
+
+    allocations = (tmp_path / "run.alloc.txt").read_text()
+    assert allocations.startswith("peak traced memory:")
+    assert "test_profiling.py" in allocations
+
+def test_collapsed_stacks_split_shared_callee():
+    """A leaf reached from two callers is attributed to both paths"""
+    def caller_a():
+        leaf(5000)
+
+    def caller_b():
+        leaf(5000)
+
+    profiler = cProfile.Profile()
+    profiler.runcall(lambda: (caller_a(), caller_b()))
+    stacks = collapsed_stacks(pstats.Stats(profiler))
+    leaf_paths = [stack for stack in stacks if ";test_profiling.py:leaf:" in stack]
+    assert any("caller_a" in stack for stack in leaf_paths)
+    assert any("caller_b" in stack for stack in leaf_paths)
+
+def test_cycle_profiler_samples_one_in_n(tmp_path):
+    """every=3 profiles cycles 3 and 6 only; no output dir never profiles"""
+    profiler = CycleProfiler(tmp_path, "daemon", every=3)
+    for _ in range(7):
+        assert profiler.run(cycle, 10) == 20
+    assert sorted(path.name.rsplit("_", 1)[1] for path in tmp_path.glob("*.pstats")) == ["3.pstats", "6.pstats"]
+
+    off = CycleProfiler(None, "daemon", every=1)
+    assert off.run(cycle, 10) == 20
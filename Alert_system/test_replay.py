@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for history replay
+==============================
+
+Replays a small multi-day step5 history through the real alerts and checks
+what fires, that state stays in memory, that the shared runners are left
+alone, that dedup TTL and the daily count follow the replayed fetch times
+and that day-split workers agree with a single pass.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+import alert_manager
+import replay
+
+def fetch(generated_at, ht_status, ht_home_score):
+    """One fetch: a live 3.5 match plus a half-time candidate"""
+    return {"generated_at": generated_at, "matches": {
+        "live_001": {"match_id": "live_001", "home_team": "A", "away_team": "B", "status_id": 2,
+                     "home_score": 0, "away_score": 0,
+                     "over_under": {"line_1": {"line": 3.5, "over": "-110", "under": "-110"}}},
+        "ht_002": {"match_id": "ht_002", "home_team": "C", "away_team": "D", "status_id": ht_status,
+                   "home_score": ht_home_score, "away_score": 0,
+                   "over_under": {"line_1": {"line": 3.0, "over": "-105", "under": "-115"}}},
+    }}
+
+def alert_dir_state():
+    """(path, size, mtime_ns) of every file in the alert directories"""
+    state = []
+    for module_path in alert_manager.discover_alerts().values():
+        for path in sorted(Path(module_path).parent.iterdir()):
+            if path.is_file():
+                stat = path.stat()
+                state.append((path, stat.st_size, stat.st_mtime_ns))
+    return state
+
+def shared_runner_state():
+    """Mode flags and resident state of the process's shared runners"""
+    state = {}
+    for name, module_path in alert_manager.discover_alerts().items():
+        runner = alert_manager.load_alert_module(module_path)
+        state[name] = (runner.resident, runner.persist_state, runner.console_echo, runner.fetch_clock,
+                       dict(runner._resident))
+    return state
+
+def write_history(tmp_path, history):
+    """step5.json holding history"""
+    step5 = tmp_path / "step5.json"
+    step5.write_text(json.dumps({"history": history}))
+    return step5
+
+@pytest.fixture
+def step5_history(tmp_path):
+    """Two-day history file"""
+    return write_history(tmp_path, [
+        fetch("05/28/2025 11:00:00 PM EDT", 2, 0),
+        fetch("05/28/2025 11:05:00 PM EDT", 3, 0),
+        fetch("05/29/2025 10:00:00 AM EDT", 3, 1),
+    ])
+
+def test_replay_fires_with_isolated_state(step5_history, tmp_path):
+    """Every fetch is replayed in order; nothing is written to disk and the shared runners are not touched"""
+    files, runners = alert_dir_state(), shared_runner_state()
+    result = replay.run_replay([step5_history])
+    assert alert_dir_state() == files
+    assert shared_runner_state() == runners
+
+    assert result["snapshots"] == 3
+    assert [(generated_at, name, match_id) for generated_at, name, match_id, *_ in result["fired"]] == [
+        ("05/28/2025 11:00:00 PM EDT", "ou_3", "live_001"),
+        ("05/28/2025 11:00:00 PM EDT", "ou_3", "ht_002"),
+        ("05/28/2025 11:05:00 PM EDT", "ou_3_no_score", "ht_002"),
+    ]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["step5.json"]
+
+def test_day_split_workers(step5_history):
+    """Per-day tasks in worker processes replay every snapshot"""
+    result = replay.run_replay([step5_history], split="day", workers=2)
+    assert result["tasks"] == 2
+    assert result["snapshots"] == 3
+    assert {row[0] for row in result["fired"]} >= {"05/29/2025 10:00:00 AM EDT"}
+
+def test_replay_clock_follows_the_fetches(tmp_path):
+    """Dedup keys expire and the daily count rolls over on generated_at, not the wall clock"""
+    history = []
+    for generated_at, over in [("05/28/2025 11:00:00 PM EDT", "-110"), ("05/28/2025 11:05:00 PM EDT", "-115"),
+                               ("05/30/2025 08:00:00 AM EDT", "-120"), ("05/30/2025 08:05:00 AM EDT", "-125")]:
+        entry = fetch(generated_at, 2, 0)
+        entry["matches"]["live_001"]["over_under"]["line_1"]["over"] = over
+        history.append(entry)
+    step5 = write_history(tmp_path, history)
+
+    result = replay.run_replay([step5], alert_names=["ou_3"])
+    # 33 hours later the 24 h TTL has evicted the key: the changed match fires again
+    # (ht_002 never changes, so the delta engine does not look at it again)
+    assert [(generated_at, match_id) for generated_at, _, match_id, *_ in result["fired"]] == [
+        ("05/28/2025 11:00:00 PM EDT", "live_001"),
+        ("05/28/2025 11:00:00 PM EDT", "ht_002"),
+        ("05/30/2025 08:05:00 AM EDT", "live_001"),
+    ]
+
+    (runner,) = replay.isolate_alerts(["ou_3"]).values()
+    snapshot = {"matches": history[0]["matches"], "generated_at": history[0]["generated_at"],
+                "fetch_stat": None, "catch_up": False}
+    assert len(runner.check_alert(snapshot)) == 2
+    store = runner._resident["processed_matches"][0]
+    assert store.meta["daily_count"] == {"date": "2025-05-28", "count": 2}
+    assert {first_seen for _, first_seen in store.entries.values()} == {1748487600.0}
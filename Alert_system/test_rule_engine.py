@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Test script for the rule engine
+===============================
+
+Checks that the shipped ou_3 / ou_3_no_score configs compile to rules that
+select exactly what the hand-written predicates selected, and exercises the
+criteria the old modules ignored (max_ou_line, odds thresholds).
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to path so we can import the shared module
+sys.path.append(str(Path(__file__).parent))
+
+from match_view import as_view
+from rule_engine import DEFAULT_MIN_OU_LINE, RuleIndex, compile_rule, evaluate_rules, validate_criteria
+
+ALERT_SYSTEM_DIR = Path(__file__).parent
+
+def mock_match(match_id, status_id, home_score, away_score, lines, ftr_home="-141"):
+    """Minimal match dict with the given status, score and O/U lines"""
+    return {
+        "match_id": match_id,
+        "status_id": status_id,
+        "home_score": home_score,
+        "away_score": away_score,
+        "full_time_result": {"home": ftr_home, "draw": "+285", "away": "+363"},
+        "over_under": {
+            f"line_{i}": {"line": line, "over": "-110", "under": "+100"} for i, line in enumerate(lines)
+        },
+    }
+
+def mock_matches():
+    """Mix of statuses, scores and lines including edge cases"""
+    return {
+        "a": mock_match("a", 2, 1, 0, [2.5, 3.5]),
+        "b": mock_match("b", 3, 0, 0, [3.0]),
+        "c": mock_match("c", 3, "0", None, [3.25, 4.0]),
+        "d": mock_match("d", 3, 1, 0, [3.0]),
+        "e": mock_match("e", 1, 0, 0, [3.5]),
+        "f": mock_match("f", 8, 2, 2, [3.5]),
+        "g": mock_match("g", 4, 0, 0, [2.75]),
+        "h": mock_match("h", 3, "x", 0, [3.5]),
+    }
+
+def load_shipped_rule(name):
+    """Compile the rule from Alert_system/<name>/<name>.json"""
+    config = json.loads((ALERT_SYSTEM_DIR / name / f"{name}.json").read_text())
+    return compile_rule(name, config)
+
+def test_shipped_configs_single_pass():
+    """Both alerts evaluated together in one pass give the legacy selections"""
+    rules = [load_shipped_rule("ou_3"), load_shipped_rule("ou_3_no_score")]
+    results = evaluate_rules(rules, mock_matches())
+
+    assert [m["match_id"] for m in results["ou_3"]["candidates"]] == ["a", "b", "c", "d", "h"]
+    assert [m["match_id"] for m in results["ou_3_no_score"]["candidates"]] == ["b", "c"]
+    assert results["ou_3"]["status_rejected"] == 2
+    assert results["ou_3"]["finished_match_ids"] == ["f"]
+
+def test_match_keys_match_legacy_format():
+    """Dedup keys keep the match_id_<lines>[_halftime] shape"""
+    matches = mock_matches()
+    assert load_shipped_rule("ou_3").match_key(matches["c"]) == "c_3.25|4.0"
+    assert load_shipped_rule("ou_3_no_score").match_key(matches["b"]) == "b_3.0_halftime"
+
+def test_max_line_and_odds_thresholds():
+    """max_ou_line and odds thresholds are applied, not ignored"""
+    rule = compile_rule("capped", {"criteria": {
+        "min_ou_line": 3.0,
+        "max_ou_line": 3.25,
+        "status_ids": [2, 3, 4],
+        "odds": [
+            {"market": "full_time_result", "side": "home", "max": -100},
+            {"market": "over_under", "side": "over", "max": -105},
+        ],
+    }})
+    matches = mock_matches()
+    matches["i"] = mock_match("i", 2, 0, 0, [3.0], ftr_home="+120")
+
+    selected = [m["match_id"] for m in matches.values() if rule.matches(m)]
+    assert selected == ["b", "c", "d"]
+    assert rule.match_key(matches["c"]) == "c_3.25"
+
+def test_total_goals():
+    """min_total / max_total bound the combined score"""
+    rule = compile_rule("goals", {"criteria": {"status_ids": [2, 3, 4], "score": {"min_total": 1, "max_total": 2}}})
+    selected = [m["match_id"] for m in mock_matches().values() if rule.matches(m)]
+    assert selected == ["a", "d"]
+
+def test_null_min_ou_line_uses_the_default(tmp_path):
+    """"min_ou_line": null compiles like a missing one; a non-number is rejected at load"""
+    from alert_runner import read_alert_config
+
+    rule = compile_rule("null_min", {"criteria": {"min_ou_line": None, "status_ids": [2, 3, 4]}})
+    assert rule.min_line == DEFAULT_MIN_OU_LINE
+    assert [m["match_id"] for m in mock_matches().values() if rule.matches(m)] == ["a", "b", "c", "d", "h"]
+    validate_criteria({"min_ou_line": None, "max_ou_line": 4})
+    for bad in ({"min_ou_line": "3.0"}, {"max_ou_line": True}):
+        with pytest.raises(ValueError):
+            validate_criteria(bad)
+    config_path = tmp_path / "bad.json"
+    config_path.write_text(json.dumps({"criteria": {"min_ou_line": "three"}}))
+    with pytest.raises(ValueError, match="min_ou_line"):
+        read_alert_config(config_path)
+
+def test_wildcard_rules_report_finished_matches():
+    """Without a status gate, finished matches that do not qualify are reported for eviction"""
+    rule = compile_rule("goals", {"criteria": {"score": {"min_total": 1, "max_total": 2}}})
+    matches = mock_matches()
+    matches["l"] = mock_match("l", 7, 1, 0, [3.0])
+    result = evaluate_rules([rule], matches)["goals"]
+    assert [view.match_id for view in result["candidates"]] == ["a", "d", "l"]
+    assert result["finished_match_ids"] == ["f"]
+
+def test_indexed_dispatch_matches_every_rule_on_every_match():
+    """The status / line index selects exactly what checking every rule selects"""
+    rng = random.Random(1)
+    rules = [load_shipped_rule("ou_3"), load_shipped_rule("ou_3_no_score")]
+    for i in range(60):
+        criteria = {"min_ou_line": rng.choice([2.0, 2.5, 3.0, 3.25, 3.5, 4.0])}
+        if i % 3:
+            criteria["status_ids"] = rng.sample([1, 2, 3, 4, 7, 8], rng.randint(1, 3))
+        if i % 4 == 0:
+            criteria["max_ou_line"] = criteria["min_ou_line"] + rng.choice([0, 0.25, 0.5])
+        if i % 5 == 0:
+            criteria["score"] = {"max_total": 1}
+        elif i % 7 == 0:
+            criteria["score"] = {"home": 0, "away": 0}
+        rules.append(compile_rule(f"rule_{i}", {"criteria": criteria}))
+    matches = mock_matches()
+    for i in range(200):
+        lines = sorted(rng.sample([1.5, 2.5, 2.75, 3.0, 3.25, 3.5, 4.0, 4.5], rng.randint(0, 3)))
+        matches[f"r{i}"] = mock_match(f"r{i}", rng.choice([1, 2, 3, 4, 7, 8, 9]), rng.randint(0, 2), 0, lines)
+
+    results = evaluate_rules(rules, matches)
+    for rule in rules:
+        rejected = [m for m in matches.values() if not rule.status_matches(as_view(m))]
+        assert [m["match_id"] for m in results[rule.name]["candidates"]] == \
+            [m["match_id"] for m in matches.values() if rule.matches(m)], rule.name
+        assert results[rule.name]["status_rejected"] == len(rejected)
+        # Finished matches the rule cannot alert on: status rejected, or not qualifying without a status gate
+        unusable = rejected if rule.status_ids is not None else [m for m in matches.values() if not rule.matches(m)]
+        assert results[rule.name]["finished_match_ids"] == \
+            [m["match_id"] for m in unusable if m["status_id"] in (7, 8)]
+
+    # A halftime match with a 3.0 line only meets rules that could take it
+    view = as_view(mock_match("x", 3, 0, 0, [3.0]))
+    met = RuleIndex(rules).rules_for(view)
+    assert "ou_3_no_score" in [rule.name for rule, _ in met]
+    assert all(rule.min_line <= 3.0 and rule.status_matches(view) for rule, _ in met)
+    assert len(met) < len(rules) // 2
+    # Score criteria are settled by dispatch: a 1-0 half-time never meets ou_3_no_score
+    scored = RuleIndex(rules).rules_for(as_view(mock_match("y", 3, 1, 0, [3.0])))
+    assert "ou_3_no_score" not in [rule.name for rule, _ in scored]
+    assert all(rule.score_predicate is None or rule.score_predicate(view) for rule, _ in met)
+
+def test_columnar_matches_dict_loop():
+    """The NumPy path selects exactly what evaluate_rules selects"""
+    pytest.importorskip("numpy")
+    from columnar import evaluate_rules_columnar
+
+    rules = [
+        load_shipped_rule("ou_3"),
+        load_shipped_rule("ou_3_no_score"),
+        compile_rule("capped", {"criteria": {
+            "min_ou_line": 3.0, "max_ou_line": 3.25, "status_ids": [2, 3, 4],
+            "odds": [{"market": "full_time_result", "side": "home", "max": -100},
+                     {"market": "over_under", "side": "over", "max": -105}],
+        }}),
+        compile_rule("goals", {"criteria": {"score": {"min_total": 1, "max_total": 2}}}),
+    ]
+    matches = mock_matches()
+    matches["i"] = mock_match("i", 2, 0, 0, [3.0], ftr_home="+120")
+    matches["j"] = mock_match("j", 3, 0, 0, [0, 3.5])
+    matches["k"] = {"match_id": "k", "status_id": 2}
+    matches["l"] = mock_match("l", 7, 1, 0, [3.0])
+
+    expected = evaluate_rules(rules, matches)
+    actual = evaluate_rules_columnar(rules, matches)
+    for rule in rules:
+        assert [m["match_id"] for m in actual[rule.name]["candidates"]] == \
+            [m["match_id"] for m in expected[rule.name]["candidates"]]
+        assert actual[rule.name]["status_rejected"] == expected[rule.name]["status_rejected"]
+        assert actual[rule.name]["finished_match_ids"] == expected[rule.name]["finished_match_ids"]
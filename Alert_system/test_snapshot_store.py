@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the snapshot store
+==================================
+
+Converts synthetic step5.json histories into a store and checks that every
+step5_reader function returns the same through the store, that a fetch is
+read with one pread of its own bytes, and that a crashed append is repaired.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add the current directory to path so we can import the shared modules
+sys.path.append(str(Path(__file__).parent))
+
+import snapshot_store
+import step5_reader
+from snapshot_store import SnapshotStore, convert_step5
+
+def make_history(days=2, per_day=3):
+    """Fetches over several days, with escapes and unicode in the strings"""
+    history = []
+    for day in range(days):
+        for minute in range(per_day):
+            generated_at = f"05/{28 + day}/2025 11:0{minute}:00 PM EDT"
+            match = {"match_id": f"m{day}{minute}", "home_team": 'Équipe "A"\n', "status_id": 2,
+                     "over_under": {"line_1": {"line": 3.0 + minute, "over": "-110"}}}
+            history.append({"generated_at": generated_at, "matches": {match["match_id"]: match}})
+    return history
+
+def converted(tmp_path, history):
+    """(legacy step5.json, store directory) holding the same history"""
+    legacy = tmp_path / "step5.json"
+    legacy.write_text(json.dumps({"history": history, "last_updated": "x"}, indent=2, ensure_ascii=False))
+    store = tmp_path / "store"
+    assert convert_step5(legacy, store) == (len(history), 0)
+    return legacy, store
+
+def test_store_reads_like_the_legacy_file(tmp_path):
+    """Latest, peek, since, iteration and single-fetch reads agree with step5.json"""
+    history = make_history()
+    legacy, store = converted(tmp_path, history)
+    middle = history[2]["generated_at"]
+
+    for name, args in [("read_latest_snapshot", ()), ("peek_generated_at", ()), ("history_generated_at", ()),
+                       ("read_history_since", (middle,)), ("read_history_since", (middle, 2)),
+                       ("read_history_since", ("unknown", 4)), ("read_fetch", (middle,)), ("read_fetch", ("unknown",))]:
+        reader = getattr(step5_reader, name)
+        assert reader(store, *args) == reader(legacy, *args), name
+    select = lambda generated_at: generated_at.startswith("05/29")
+    assert list(step5_reader.iter_history_entries(store, select)) == history[3:]
+    assert step5_reader.watch_target(store) == store / snapshot_store.INDEX_NAME
+
+def test_segments_roll_daily_and_convert_is_incremental(tmp_path):
+    """One segment per fetch day; a second convert only adds the new fetches"""
+    history = make_history()
+    legacy, store = converted(tmp_path, history)
+    assert sorted(path.name for path in store.glob("*.ndjson")) == ["step5_20250528.ndjson", "step5_20250529.ndjson"]
+
+    history.append({"generated_at": "05/30/2025 00:01:00 AM EDT", "matches": {}})
+    legacy.write_text(json.dumps({"history": history}))
+    assert convert_step5(legacy, store) == (1, 6)
+    assert step5_reader.read_latest_snapshot(store) == ({}, "05/30/2025 00:01:00 AM EDT")
+
+def test_one_pread_per_fetch(tmp_path, monkeypatch):
+    """A historical fetch is exactly one pread of its own line"""
+    history = make_history(days=1, per_day=20)
+    _, store = converted(tmp_path, history)
+    reads = []
+    real_pread = snapshot_store.os.pread
+
+    def counting_pread(fd, length, offset):
+        reads.append(length)
+        return real_pread(fd, length, offset)
+
+    monkeypatch.setattr(snapshot_store.os, "pread", counting_pread)
+    entry = SnapshotStore(store).refresh().get(history[5]["generated_at"])
+    assert entry == history[5]
+    assert reads == [len(json.dumps(history[5], separators=(",", ":"), ensure_ascii=False).encode())]
+
+def test_crashed_append_is_repaired(tmp_path):
+    """Unindexed segment lines are indexed, a torn line is cut off, a torn index line is ignored"""
+    history = make_history(days=1, per_day=3)
+    store = SnapshotStore(tmp_path / "store")
+    for entry in history[:2]:
+        store.append(entry)
+
+    segment = store.directory / "step5_20250528.ndjson"
+    with open(segment, "a") as f:
+        f.write(json.dumps(history[2]) + "\n")  # crash before the index line
+        f.write('{"generated_at": "torn')        # crash mid-line
+    with open(store.index_path, "a") as f:
+        f.write('["torn')
+
+    reader = SnapshotStore(store.directory)
+    assert reader.generated_at_list() == [entry["generated_at"] for entry in history[:2]]
+    assert reader.latest() == history[1]
+
+    SnapshotStore(store.directory).append({"generated_at": "05/28/2025 11:09:00 PM EDT", "matches": {}})
+    assert reader.generated_at_list() == [entry["generated_at"] for entry in history] + ["05/28/2025 11:09:00 PM EDT"]
+    assert reader.get(history[2]["generated_at"]) == history[2]
+    assert segment.read_text().count("torn") == 0
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the step5 snapshot reader
+=========================================
+
+Writes synthetic step5.json files in every layout we have seen and checks
+that read_latest_snapshot() returns exactly what the original
+json.load + history[-1] logic returned.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add the current directory to path so we can import the shared module
+sys.path.append(str(Path(__file__).parent))
+
+import step5_reader
+from step5_reader import read_latest_snapshot
+
+def make_fetch(generated_at, num_matches=3):
+    """Create one mock fetch with awkward strings in it"""
+    matches = {}
+    for i in range(num_matches):
+        match_id = f"{generated_at}_m{i}"
+        matches[match_id] = {
+            "match_id": match_id,
+            "home_team": 'Team "Quoted" {A}',
+            "away_team": "Team \\ B }",
+            "status_id": 2,
+            "over_under": {"line_1": {"line": 3.0 + i, "over": "-110", "under": "-110"}},
+            "environment_summary": ["Wind: ] calm", "Temp: {72}"],
+        }
+    return {"generated_at": generated_at, "matches": matches}
+
+def expected_snapshot(data):
+    """Reference result using the original full-parse logic"""
+    if "history" in data and data["history"]:
+        latest = data["history"][-1]
+        return latest.get("matches", {}), latest.get("generated_at", "Unknown")
+    return data.get("matches", {}), data.get("generated_at", "Unknown")
+
+def check_layout(tmp_path, data, indent=None):
+    """Write data to disk and compare the reader with the reference"""
+    step5 = tmp_path / "step5.json"
+    step5.write_text(json.dumps(data, indent=indent, ensure_ascii=False))
+    assert read_latest_snapshot(step5) == expected_snapshot(data)
+
+def test_history_layouts(tmp_path):
+    """Last history entry is returned for compact, indented and trailing-key files"""
+    history = [make_fetch(f"05/28/2025 11:0{i}:00 PM EDT") for i in range(5)]
+    check_layout(tmp_path, {"history": history})
+    check_layout(tmp_path, {"history": history}, indent=2)
+    check_layout(tmp_path, {"history": history, "last_updated": "x", "count": 5, "meta": {"a": "}"}}, indent=2)
+    check_layout(tmp_path, {"meta": {"a": 1}, "history": history})
+
+def test_flat_and_empty_layouts(tmp_path):
+    """Flat layout and empty history fall back to the full document"""
+    check_layout(tmp_path, make_fetch("05/28/2025 11:05:04 PM EDT"), indent=2)
+    check_layout(tmp_path, {"history": [], "matches": {"a": {"match_id": "a"}}, "generated_at": "t"})
+    check_layout(tmp_path, {"history": []})
+
+def test_only_last_entry_is_decoded(tmp_path, monkeypatch):
+    """The bytes handed to the decoder are just the newest fetch"""
+    history = [make_fetch(f"fetch_{i}", num_matches=20) for i in range(50)]
+    step5 = tmp_path / "step5.json"
+    step5.write_text(json.dumps({"history": history}))
+
+    decoded_sizes = []
+    real_decode = step5_reader.decode
+
+    def counting_decode(raw):
+        decoded_sizes.append(len(raw))
+        return real_decode(raw)
+
+    monkeypatch.setattr(step5_reader, "decode", counting_decode)
+    matches, generated_at = read_latest_snapshot(step5)
+
+    assert generated_at == "fetch_49"
+    assert decoded_sizes == [len(json.dumps(history[-1]))]
+
+def test_iter_history_entries(tmp_path):
+    """Every entry is streamed oldest first; rejected entries are skipped undecoded"""
+    history = [make_fetch(f"05/2{i}/2025 11:00:00 PM EDT") for i in range(4)]
+    step5 = tmp_path / "step5.json"
+    for data in ({"history": history}, {"history": history, "last_updated": "x"}):
+        step5.write_text(json.dumps(data, indent=2))
+        assert list(step5_reader.iter_history_entries(step5)) == history
+
+    selected = step5_reader.iter_history_entries(step5, select=lambda generated_at: generated_at.startswith("05/22"))
+    assert list(selected) == [history[2]]
+
+    flat = make_fetch("05/28/2025 11:05:04 PM EDT")
+    step5.write_text(json.dumps(flat))
+    assert list(step5_reader.iter_history_entries(step5)) == [flat]
+
+def test_read_history_since(tmp_path):
+    """Only entries newer than the last processed fetch come back, capped at max_entries"""
+    history = [make_fetch(f"05/28/2025 11:0{i}:00 PM EDT") for i in range(6)]
+    step5 = tmp_path / "step5.json"
+    step5.write_text(json.dumps({"history": history, "last_updated": "x"}, indent=2))
+
+    assert step5_reader.read_history_since(step5, history[2]["generated_at"]) == (history[3:], 0)
+    assert step5_reader.read_history_since(step5, history[2]["generated_at"], max_entries=2) == (history[4:], 1)
+    assert step5_reader.read_history_since(step5, history[5]["generated_at"]) == ([], 0)
+    assert step5_reader.read_history_since(step5, "not in history", max_entries=3) == (history[3:], 3)